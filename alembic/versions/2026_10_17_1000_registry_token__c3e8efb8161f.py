@@ -0,0 +1,30 @@
+"""Shared registry token cache
+
+Revision ID: c3e8efb8161f
+Revises: 83598d4afaab
+Create Date: 2026-10-17 10:00:12.315902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8efb8161f'
+down_revision = '83598d4afaab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('registry_token',
+    sa.Column('gp_project_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('api_token', sa.String(), nullable=False),
+    sa.Column('expires_on', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('gp_project_id'),
+    prefixes=['UNLOGGED']
+    )
+
+
+def downgrade():
+    op.drop_table('registry_token')
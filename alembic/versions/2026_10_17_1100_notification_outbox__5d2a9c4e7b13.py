@@ -0,0 +1,42 @@
+"""Notification outbox
+
+Revision ID: 5d2a9c4e7b13
+Revises: c3e8efb8161f
+Create Date: 2026-10-17 11:00:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5d2a9c4e7b13'
+down_revision = 'c3e8efb8161f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_outbox',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('vacancy_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('channel', sa.BigInteger(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'DELIVERED', 'FAILED', name='deliverystatus'), nullable=False),
+    sa.Column('attempts', sa.SMALLINT(), nullable=False),
+    sa.Column('next_attempt_on', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('status_code', sa.SMALLINT(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_on', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('delivered_on', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_outbox_pending', 'notification_outbox', ['next_attempt_on'], unique=False,
+                    postgresql_where=sa.text("status = 'PENDING'"))
+
+
+def downgrade():
+    op.drop_index('ix_notification_outbox_pending', table_name='notification_outbox',
+                  postgresql_where=sa.text("status = 'PENDING'"))
+    op.drop_table('notification_outbox')
+    sa.Enum(name='deliverystatus').drop(op.get_bind(), checkfirst=False)
@@ -0,0 +1,35 @@
+"""Vacancy response keyset indexes
+
+Revision ID: 8b1f4e2a6c90
+Revises: 5d2a9c4e7b13
+Create Date: 2026-10-17 12:00:12.531904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1f4e2a6c90'
+down_revision = '5d2a9c4e7b13'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_vacancy_response_vacancy_id_created_on', ['vacancy_id', 'created_on', 'id']),
+    ('ix_vacancy_response_gp_user_id_created_on', ['gp_user_id', 'created_on', 'id']),
+    ('ix_vacancy_response_created_on', ['created_on', 'id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY doesn't lock writes of responses, but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'vacancy_response', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='vacancy_response', postgresql_concurrently=True)
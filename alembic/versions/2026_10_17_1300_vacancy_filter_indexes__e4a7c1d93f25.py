@@ -0,0 +1,39 @@
+"""Vacancy filter and sort indexes
+
+Revision ID: e4a7c1d93f25
+Revises: 8b1f4e2a6c90
+Create Date: 2026-10-17 13:00:27.884016
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c1d93f25'
+down_revision = '8b1f4e2a6c90'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_vacancy_gp_project_id_created_on', ['gp_project_id', 'created_on', 'id'], {}),
+    ('ix_vacancy_company_id_created_on', ['company_id', 'created_on', 'id'], {}),
+    ('ix_vacancy_profession_id_created_on', ['profession_id', 'created_on', 'id'], {}),
+    ('ix_vacancy_team_ids', ['team_ids'], {'postgresql_using': 'gin'}),
+    ('ix_vacancy_created_on', ['created_on', 'id'], {}),
+    ('ix_vacancy_updated_on', ['updated_on', 'id'], {}),
+    ('ix_vacancy_name', ['name', 'id'], {}),
+]
+
+
+def upgrade():
+    # CONCURRENTLY doesn't lock writes of vacancies, but can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, columns, kwargs in INDEXES:
+            op.create_index(name, 'vacancy', columns, unique=False, postgresql_concurrently=True, **kwargs)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.drop_index(name, table_name='vacancy', postgresql_concurrently=True)
@@ -0,0 +1,94 @@
+"""JSONB columns and applicant indexes
+
+Revision ID: a93d5b07e6f1
+Revises: e4a7c1d93f25
+Create Date: 2026-10-17 14:00:51.307262
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93d5b07e6f1'
+down_revision = 'e4a7c1d93f25'
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    'vacancy': ['requirements', 'conditions', 'contacts'],
+    'vacancy_response': ['data_response'],
+}
+APPLICANT_FIELDS = ['first_name', 'last_name', 'middle_name', 'email', 'phone']
+BATCH_SIZE = 5000
+
+
+def upgrade():
+    # Column is converted online: a JSONB copy is kept in sync by trigger while existing rows
+    # are copied in small batches, so the table is locked only for the final swap
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}_jsonb', postgresql.JSONB(), nullable=True))
+        assignments = ' '.join(f'NEW.{column}_jsonb := NEW.{column}::jsonb;' for column in columns)
+        op.execute(f"""
+            CREATE FUNCTION {table}_jsonb_sync() RETURNS trigger AS $$
+            BEGIN {assignments} RETURN NEW; END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_jsonb_sync BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE PROCEDURE {table}_jsonb_sync()
+        """)
+
+    with op.get_context().autocommit_block():
+        for table, columns in COLUMNS.items():
+            backfill(table, columns)
+
+    for table, columns in COLUMNS.items():
+        op.execute(f'LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE')
+        # rows written after their batch are already synced by trigger, this only catches stragglers
+        copy_rows(table, columns)
+        op.execute(f'DROP TRIGGER {table}_jsonb_sync ON {table}')
+        op.execute(f'DROP FUNCTION {table}_jsonb_sync()')
+        for column in columns:
+            op.drop_column(table, column)
+            op.alter_column(table, f'{column}_jsonb', new_column_name=column)
+
+    with op.get_context().autocommit_block():
+        for field in APPLICANT_FIELDS:
+            op.create_index(
+                f'ix_vacancy_response_{field}', 'vacancy_response', [sa.text(f"(data_response -> 0 ->> '{field}')")],
+                unique=False, postgresql_concurrently=True,
+            )
+
+
+def not_copied(columns):
+    return ' OR '.join(f'({column} IS NOT NULL AND {column}_jsonb IS NULL)' for column in columns)
+
+
+def copy_rows(table, columns, limit=None):
+    assignments = ', '.join(f'{column}_jsonb = {column}::jsonb' for column in columns)
+    rows = f'SELECT id FROM {table} WHERE {not_copied(columns)}'
+    if limit:
+        rows += f' LIMIT {limit} FOR UPDATE SKIP LOCKED'
+    return op.get_bind().execute(sa.text(f'UPDATE {table} SET {assignments} WHERE id IN ({rows})')).rowcount
+
+
+def backfill(table, columns):
+    # every batch commits on its own, row locks are held only for one batch
+    while copy_rows(table, columns, BATCH_SIZE):
+        pass
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for field in APPLICANT_FIELDS:
+            op.drop_index(f'ix_vacancy_response_{field}', table_name='vacancy_response', postgresql_concurrently=True)
+
+    for table, columns in COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column, type_=sa.JSON(), existing_type=postgresql.JSONB(),
+                postgresql_using=f'{column}::json',
+            )
@@ -0,0 +1,55 @@
+"""Applicant identity columns
+
+Revision ID: f2c86e1b4d37
+Revises: a93d5b07e6f1
+Create Date: 2026-10-17 15:00:08.642519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c86e1b4d37'
+down_revision = 'a93d5b07e6f1'
+branch_labels = None
+depends_on = None
+
+APPLICANT_FIELDS = ['first_name', 'last_name', 'middle_name', 'email', 'phone']
+INDEXES = [
+    ('ix_vacancy_response_first_name', [sa.text('lower(first_name)')]),
+    ('ix_vacancy_response_last_name', [sa.text('lower(last_name)')]),
+    ('ix_vacancy_response_middle_name', [sa.text('lower(middle_name)')]),
+    ('ix_vacancy_response_email', ['email']),
+    ('ix_vacancy_response_phone', ['phone']),
+]
+
+
+def upgrade():
+    # existing rows are filled by `python -m app.backfill_applicants`
+    op.add_column('vacancy_response', sa.Column('first_name', sa.String(length=150), nullable=True))
+    op.add_column('vacancy_response', sa.Column('last_name', sa.String(length=150), nullable=True))
+    op.add_column('vacancy_response', sa.Column('middle_name', sa.String(length=150), nullable=True))
+    op.add_column('vacancy_response', sa.Column('email', sa.String(length=254), nullable=True))
+    op.add_column('vacancy_response', sa.Column('phone', sa.String(length=16), nullable=True))
+
+    with op.get_context().autocommit_block():
+        # indexes on data_response->0->>field are replaced by indexes on columns with the same names
+        for field in APPLICANT_FIELDS:
+            op.drop_index(f'ix_vacancy_response_{field}', table_name='vacancy_response', postgresql_concurrently=True)
+        for name, columns in INDEXES:
+            op.create_index(name, 'vacancy_response', columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in INDEXES:
+            op.drop_index(name, table_name='vacancy_response', postgresql_concurrently=True)
+        for field in APPLICANT_FIELDS:
+            op.create_index(
+                f'ix_vacancy_response_{field}', 'vacancy_response', [sa.text(f"(data_response -> 0 ->> '{field}')")],
+                unique=False, postgresql_concurrently=True,
+            )
+
+    for field in APPLICANT_FIELDS:
+        op.drop_column('vacancy_response', field)
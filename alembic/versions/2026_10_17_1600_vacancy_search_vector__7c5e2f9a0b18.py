@@ -0,0 +1,43 @@
+"""Vacancy search vector
+
+Revision ID: 7c5e2f9a0b18
+Revises: f2c86e1b4d37
+Create Date: 2026-10-17 16:00:33.170482
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7c5e2f9a0b18'
+down_revision = 'f2c86e1b4d37'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce(name, '')), 'A')"
+    " || setweight(to_tsvector('russian', coalesce(short_description, '')), 'B')"
+    " || setweight(to_tsvector('russian', coalesce(responsibilities, '')), 'C')"
+    " || setweight(to_tsvector('russian', coalesce(full_description, '')), 'D')"
+)
+
+
+def upgrade():
+    # stored generated column rewrites vacancy table, writes wait until it is done
+    op.add_column(
+        'vacancy',
+        sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vacancy_search_vector', 'vacancy', ['search_vector'], unique=False,
+            postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vacancy_search_vector', table_name='vacancy', postgresql_concurrently=True)
+    op.drop_column('vacancy', 'search_vector')
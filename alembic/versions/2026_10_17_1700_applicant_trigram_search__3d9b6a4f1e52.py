@@ -0,0 +1,36 @@
+"""Applicant trigram search
+
+Revision ID: 3d9b6a4f1e52
+Revises: 7c5e2f9a0b18
+Create Date: 2026-10-17 17:00:19.405338
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9b6a4f1e52'
+down_revision = '7c5e2f9a0b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # filled for existing rows by `python -m app.backfill_applicants`
+    op.add_column('vacancy_response', sa.Column('applicant_search', sa.Text(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vacancy_response_applicant_search', 'vacancy_response', ['applicant_search'], unique=False,
+            postgresql_using='gin', postgresql_ops={'applicant_search': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_vacancy_response_applicant_search', table_name='vacancy_response', postgresql_concurrently=True
+        )
+    op.drop_column('vacancy_response', 'applicant_search')
@@ -0,0 +1,29 @@
+"""Vacancy skill match index
+
+Revision ID: b6e1d8c3a274
+Revises: 3d9b6a4f1e52
+Create Date: 2026-10-17 18:00:44.918350
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e1d8c3a274'
+down_revision = '3d9b6a4f1e52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_vacancy_skill_skill_id_vacancy_id', 'vacancy_skill', ['skill_id', 'vacancy_id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_vacancy_skill_skill_id_vacancy_id', table_name='vacancy_skill', postgresql_concurrently=True)
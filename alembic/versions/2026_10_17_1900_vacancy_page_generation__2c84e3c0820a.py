@@ -0,0 +1,28 @@
+"""Shared generations of cached vacancy pages
+
+Revision ID: 2c84e3c0820a
+Revises: b6e1d8c3a274
+Create Date: 2026-10-17 19:00:27.640518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2c84e3c0820a'
+down_revision = 'b6e1d8c3a274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('vacancy_page_generation',
+    sa.Column('gp_project_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('generation', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('gp_project_id')
+    )
+
+
+def downgrade():
+    op.drop_table('vacancy_page_generation')
@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import vacancies
+from app.api.endpoints import service, vacancies
 
 api_router = APIRouter()
 api_router.include_router(vacancies.router, prefix="/vacancies", tags=["vacancies"])
+api_router.include_router(service.router, prefix="/service", tags=["service"])
@@ -1,10 +1,73 @@
 from typing import AsyncGenerator
+from uuid import UUID
 
+from fastapi import Depends
+from fastapi.params import Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.errors import AuthorityError
+from app.schemas.auth import ServiceOperation
 from app.session import async_session
+from app.utils.singer import check_authority
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session checks out a DB connection only when DAL runs the first statement.
+    Authority dependencies are declared on the routes, so they are resolved
+    before this one and rejected requests never reach the pool.
+    """
     async with async_session() as session:
         yield session
+
+
+class AuthParams:
+    """
+    Signed query parameters shared by all endpoints
+    """
+
+    def __init__(
+        self,
+        project_id: UUID = Query(..., description="Project ID of service"),
+        service: ServiceOperation = Query(..., description="Type of operation"),
+        time: str = Query("", description="Timestamp, format is unix time"),
+        signature: str = Query("", description="Signature of data"),
+    ):
+        self.project_id = project_id
+        self.service = service
+        self.time = time
+        self.signature = signature
+
+
+async def authorize(params: AuthParams) -> AuthParams:
+    authority_error = await check_authority(
+        params.project_id, params.signature, data_fields=str(params.service.value), time=params.time
+    )
+    if authority_error:
+        raise AuthorityError(authority_error)
+    return params
+
+
+async def get_authority(params: AuthParams = Depends()) -> AuthParams:
+    return await authorize(params)
+
+
+async def get_vacancy_authority(vacancy_id: UUID, params: AuthParams = Depends()) -> AuthParams:
+    """
+    Declares vacancy_id too, so invalid id in path is rejected with 422 before signature check
+    """
+    return await authorize(params)
+
+
+async def get_vacancy_response_authority(vacancy_response_id: UUID, params: AuthParams = Depends()) -> AuthParams:
+    """
+    Declares vacancy_response_id too, so invalid id in path is rejected with 422 before signature check
+    """
+    return await authorize(params)
+
+
+async def get_delivery_authority(delivery_id: UUID, params: AuthParams = Depends()) -> AuthParams:
+    """
+    Declares delivery_id too, so invalid id in path is rejected with 422 before signature check
+    """
+    return await authorize(params)
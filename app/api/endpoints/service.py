@@ -0,0 +1,34 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api import deps
+from app.schemas.service import ServiceStatus
+from app.utils import notifications, singer
+from app.utils.matching_engine import MATCHING_ENGINE
+from app.utils.vacancy_cache import PAGE_CACHE, RESPONSE_CACHE, VACANCY_CACHE
+
+router = APIRouter()
+
+
+@router.get("/status", dependencies=[Depends(deps.get_authority)], response_model=ServiceStatus, status_code=200)
+async def get_service_status() -> Any:
+    """
+    Retrieves state of caches, circuit breakers and queues of remote services.
+    """
+    return {
+        "registry": {
+            "circuit_breaker": singer.REGISTRY_BREAKER.as_dict(),
+            "token_cache": singer.TOKEN_CACHE.as_dict(),
+        },
+        "notifications": {
+            "payload_cache": notifications.PAYLOAD_CACHE.as_dict(),
+            "dispatcher": notifications.SINORA_DISPATCHER.as_dict(),
+        },
+        "matching": MATCHING_ENGINE.as_dict(),
+        "vacancies": {
+            "vacancy_cache": VACANCY_CACHE.as_dict(),
+            "response_cache": RESPONSE_CACHE.as_dict(),
+            "page_cache": PAGE_CACHE.as_dict(),
+        },
+    }
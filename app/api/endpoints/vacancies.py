@@ -1,5 +1,6 @@
 import base64
-from typing import Any
+import logging
+from typing import Any, Optional
 from uuid import UUID
 import datetime
 
@@ -8,34 +9,40 @@ from fastapi.params import Query
 from pydantic import EmailStr, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
 from app.api import deps
 from app.api.message_manager import Message, MessageManager
 from app.db.dal import DAL
-from app.errors import VacancyNotFoundError
+from app.errors import InvalidCursorError, VacancyNotFoundError
 from app.schemas import vacancy as schemas
 from app.schemas.vacancy_api import \
     SortingOrder, SortingParam, VacancyPage, \
     ResponseSortingParam, VacancyResponsePage, UserResponsePage
-from app.schemas.vacancy_notify import PostTelegramVacancy
-from app.schemas.auth import ServiceOperation
+from app.schemas.vacancy_match import CandidateMatches, MatchBatch, MatchBatchResult, MatchProfile, \
+    VacancyMatchPage
+from app.schemas.vacancy_notify import NotificationDelivery, NotifyBatch, NotifyBatchItem, NotifyBatchResult, \
+    PostTelegramVacancy
 
-from app.utils.singer import check_authority, json_2_str, TIME_LIMIT
-from app.utils.notifications import post_to_telegram
+from app.core import config
+from app.utils.matching_engine import MATCHING_ENGINE
+from app.utils.notification_outbox import outbox_worker
+from app.utils.notifications import render_telegram_parameters, vacancy_parameters
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 EXAMPLE_UUID = UUID("3fa85f64-5717-4562-b3fc-2c963f66afa6")
 
 
-@router.post("/", response_model=schemas.Vacancy, status_code=201)
+@router.post(
+    "/",
+    dependencies=[Depends(deps.get_authority)],
+    response_model=schemas.Vacancy,
+    status_code=201,
+)
 async def create_vacancy(
     vacancy_create: schemas.CreateVacancy,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation  = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
     request: Request = Body(..., embed=False)
 ) -> Any:
@@ -53,18 +60,14 @@ async def create_vacancy(
     # data_fields = json_2_str(raw_body)
     # print("RAW", data_fields)
 
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    return await DAL(session).create_vacancy(vacancy_create)
+    vacancy = await DAL(session).create_vacancy(vacancy_create)
+    logger.info("Vacancy created", extra={"vacancy_id": str(vacancy.id)})
+    return vacancy
 
 
 @router.get(
     "/",
+    dependencies=[Depends(deps.get_authority)],
     response_model=VacancyPage,
     status_code=200,
     responses={
@@ -93,10 +96,6 @@ async def create_vacancy(
     },
 )
 async def get_vacancies(
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation  = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     page: int = Query(0, ge=0, description="Page number"),
     limit: int = Query(50, ge=1, le=50, description="Page size limit"),
     gp_project_id: UUID = Query(None, description="Project filter"),
@@ -106,6 +105,7 @@ async def get_vacancies(
     show_all: bool = Query(None, include_in_schema=False),
     sort_by: SortingParam = Query(SortingParam.none, description="Field to sort by"),
     sort_order: SortingOrder = Query(SortingOrder.asc),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
@@ -116,16 +116,146 @@ async def get_vacancies(
             status_code=400, content=MessageManager.get_invalid_filters_msg()
         )
 
-    # ***Check authority***
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
+    try:
+        result = await DAL(session).get_vacancies_page_json(
+            page, limit, gp_project_id, company_id, profession_id, team_id, sort_by, sort_order, cursor=cursor
+        )
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
+    if result:
+        return Response(content=result, media_type="application/json")
+    return JSONResponse(status_code=404, content=MessageManager.get_nothing_found_msg())
 
-    if authority_error:
-        return authority_error
-    # ***End check authority***
 
-    result = await DAL(session).get_vacancies_page(
-        page, limit, gp_project_id, company_id, profession_id, team_id, sort_by, sort_order
-    )
+@router.post(
+    "/match/",
+    dependencies=[Depends(deps.get_authority)],
+    response_model=VacancyMatchPage,
+    status_code=200,
+    responses={
+        404: {
+            "model": Message,
+            "content": {
+                "application/json": {"example": MessageManager.get_nothing_found_msg()}
+            },
+        },
+        400: {
+            "model": Message,
+            "content": {
+                "application/json": {"example": MessageManager.get_invalid_cursor_msg()}
+            },
+        },
+        419: {
+            "model": Message,
+            "content": {
+                "application/json": {
+                    "example": MessageManager.timeout_signature()
+                }
+            },
+        },
+    },
+)
+async def match_vacancies(
+    profile: MatchProfile,
+    page: int = Query(0, ge=0, description="Page number"),
+    limit: int = Query(50, ge=1, le=50, description="Page size limit"),
+    gp_project_id: UUID = Query(None, description="Project filter"),
+    profession_id: UUID = Query(None, description="Profession filter"),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
+    session: AsyncSession = Depends(deps.get_session),
+) -> Any:
+    """
+    Active vacancies ranked by how candidate skills cover their REQUIRED and DESIRED skills.
+    """
+    try:
+        result = await DAL(session).match_vacancies(
+            profile.skills, page, limit, gp_project_id, profession_id, cursor=cursor
+        )
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
+    if result.items:
+        return result
+    return JSONResponse(status_code=404, content=MessageManager.get_nothing_found_msg())
+
+
+@router.post(
+    "/match/batch",
+    dependencies=[Depends(deps.get_authority)],
+    response_model=MatchBatchResult,
+    status_code=200,
+    responses={
+        419: {
+            "model": Message,
+            "content": {
+                "application/json": {
+                    "example": MessageManager.timeout_signature()
+                }
+            },
+        },
+    },
+)
+async def match_vacancies_batch(
+    batch: MatchBatch,
+    gp_project_id: UUID = Query(..., description="Project of vacancies"),
+    top: int = Query(20, ge=1, le=100, description="Best vacancies returned for each candidate"),
+) -> Any:
+    """
+    Matches many candidates with active vacancies of project at once.
+    Result of each candidate is returned in the order of request.
+    """
+    profiles = [candidate.skills for candidate in batch.candidates]
+    matches = await MATCHING_ENGINE.match(gp_project_id, profiles, top)
+    return MatchBatchResult(items=[
+        CandidateMatches(id=candidate.id, matches=candidate_matches)
+        for candidate, candidate_matches in zip(batch.candidates, matches)
+    ])
+
+
+# Declared before /{vacancy_id}, otherwise "search" is taken for vacancy_id
+@router.get(
+    "/search/",
+    dependencies=[Depends(deps.get_authority)],
+    response_model=VacancyPage,
+    status_code=200,
+    responses={
+        404: {
+            "model": Message,
+            "content": {
+                "application/json": {"example": MessageManager.get_nothing_found_msg()}
+            },
+        },
+        400: {
+            "model": Message,
+            "content": {
+                "application/json": {"example": MessageManager.get_invalid_cursor_msg()}
+            },
+        },
+        419: {
+            "model": Message,
+            "content": {
+                "application/json": {
+                    "example": MessageManager.timeout_signature()
+                }
+            },
+        },
+    },
+)
+async def search_vacancies(
+    q: str = Query(..., min_length=1, max_length=256, description="Search query, web search syntax"),
+    page: int = Query(0, ge=0, description="Page number"),
+    limit: int = Query(50, ge=1, le=50, description="Page size limit"),
+    gp_project_id: UUID = Query(None, description="Project filter"),
+    company_id: UUID = Query(None, description="Company filter"),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
+    session: AsyncSession = Depends(deps.get_session),
+) -> Any:
+    """
+    Full-text search of vacancies by name, descriptions and responsibilities, most relevant first.
+    """
+    try:
+        result = await DAL(session).search_vacancies(q, page, limit, gp_project_id, company_id, cursor=cursor)
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
     if result.items:
         return result
     return JSONResponse(status_code=404, content=MessageManager.get_nothing_found_msg())
@@ -133,6 +263,7 @@ async def get_vacancies(
 
 @router.get(
     "/{vacancy_id}",
+    dependencies=[Depends(deps.get_vacancy_authority)],
     response_model=schemas.Vacancy,
     status_code=200,
     responses={
@@ -156,25 +287,14 @@ async def get_vacancies(
 )
 async def get_vacancy(
     vacancy_id: UUID,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation  = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a vacancy by id.
     """
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    result = await DAL(session).get_vacancy(vacancy_id)
+    result = await DAL(session).get_vacancy_json(vacancy_id)
     if result:
-        return result
+        return Response(content=result, media_type="application/json")
     return JSONResponse(
         status_code=404, content=MessageManager.get_vacancy_not_found_msg(vacancy_id)
     )
@@ -182,6 +302,7 @@ async def get_vacancy(
 
 @router.put(
     "/{vacancy_id}",
+    dependencies=[Depends(deps.get_vacancy_authority)],
     response_model=schemas.Vacancy,
     status_code=200,
     responses={
@@ -212,10 +333,6 @@ async def get_vacancy(
 async def edit_vacancy(
     vacancy_id: UUID,
     vacancy_edit: schemas.EditVacancy,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
@@ -226,13 +343,6 @@ async def edit_vacancy(
             status_code=400, content=MessageManager.get_ids_dont_match_msg()
         )
 
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
     result = await DAL(session).edit_vacancy(vacancy_edit)
     if result:
         return result
@@ -243,6 +353,7 @@ async def edit_vacancy(
 
 @router.delete(
     "/{vacancy_id}",
+    dependencies=[Depends(deps.get_vacancy_authority)],
     status_code=200,
     response_model=Message,
     responses={
@@ -274,24 +385,14 @@ async def edit_vacancy(
 )
 async def delete_vacancy(
     vacancy_id: UUID,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a vacancy by id.
     """
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
     try:
         await DAL(session).delete_vacancy(vacancy_id)
+        logger.info("Vacancy deleted", extra={"vacancy_id": str(vacancy_id)})
         return JSONResponse(
             status_code=200,
             content=MessageManager.get_successfully_deleted_msg(vacancy_id),
@@ -306,6 +407,7 @@ async def delete_vacancy(
 # Handle VacancyResponse
 @router.get(
     "/{vacancy_id}/responses/",
+    dependencies=[Depends(deps.get_authority)],
     response_model=VacancyResponsePage,
     status_code=200,
     responses={
@@ -326,32 +428,25 @@ async def delete_vacancy(
     },
 )
 async def get_vacancy_responses(
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     page: int = Query(0, ge=0, description="Page number"),
     limit: int = Query(50, ge=1, le=50, description="Page size limit"),
     vacancy_id: UUID = Query(None, description="Vacancy filter"),
     # show_all: bool = Query(None, include_in_schema=False),
     sort_by: ResponseSortingParam = Query(ResponseSortingParam.none, description="Field to sort by"),
     sort_order: SortingOrder = Query(SortingOrder.asc),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a list of existing vacancies.
     """
 
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    result = await DAL(session).get_vacancy_responses_page(
-        page, limit, vacancy_id, sort_by, sort_order
-    )
+    try:
+        result = await DAL(session).get_vacancy_responses_page(
+            page, limit, vacancy_id, sort_by, sort_order, cursor=cursor
+        )
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
     if result.items:
         return result
     return JSONResponse(status_code=404, content=MessageManager.get_nothing_responses_found_msg())
@@ -359,6 +454,7 @@ async def get_vacancy_responses(
 
 @router.post(
     "/responses/",
+    dependencies=[Depends(deps.get_authority)],
     response_model=schemas.VacancyResponse,
     status_code=201,
     responses={
@@ -390,41 +486,25 @@ async def get_vacancy_responses(
 )
 async def create_vacancy_response(
     vacancy_response_create: schemas.CreateVacancyResponse,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Creates new vacancy response.
     """
-    # *** Prepare data for sign ***
-    vacancy_data = await DAL(session).get_vacancy(vacancy_response_create.vacancy_id)
-    if not vacancy_data:
-        return JSONResponse(
-            status_code=404, content=MessageManager.get_vacancy_not_found_msg(vacancy_response_create.vacancy_id)
-        )
-    # *** END Prepare data for sign ***
-
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
     try:
-        return await DAL(session).create_vacancy_response(vacancy_response_create)
+        vacancy_response = await DAL(session).create_vacancy_response(vacancy_response_create)
     except VacancyNotFoundError:
         return JSONResponse(
             status_code=404,
             content=MessageManager.get_vacancy_not_found_msg(vacancy_response_create.vacancy_id),
         )
+    logger.info("Vacancy response created", extra={"vacancy_response_id": str(vacancy_response.id)})
+    return vacancy_response
 
 
 @router.get(
     "/responses/{vacancy_response_id}",
+    dependencies=[Depends(deps.get_vacancy_response_authority)],
     response_model=schemas.VacancyResponse,
     status_code=200,
     responses={
@@ -448,27 +528,16 @@ async def create_vacancy_response(
 )
 async def get_vacancy_response(
     vacancy_response_id: UUID,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a vacancy response by id.
     """
 
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    result = await DAL(session).get_vacancy_response(vacancy_response_id)
+    result = await DAL(session).get_vacancy_response_json(vacancy_response_id)
 
     if result:
-        return result
+        return Response(content=result, media_type="application/json")
     return JSONResponse(
         status_code=404, content=MessageManager.get_vacancy_response_not_found_msg(vacancy_response_id)
     )
@@ -476,6 +545,7 @@ async def get_vacancy_response(
 
 @router.get(
     "/responses/users/",
+    dependencies=[Depends(deps.get_authority)],
     response_model=VacancyResponsePage,
     status_code=200,
     responses={
@@ -504,10 +574,6 @@ async def get_vacancy_response(
     },
 )
 async def get_user_responses(
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     page: int = Query(0, ge=0, description="Page number"),
     limit: int = Query(50, ge=1, le=50, description="Page size limit"),
     gp_user_id: UUID = Query(None, description="User filter"),
@@ -519,26 +585,29 @@ async def get_user_responses(
     show_all: bool = Query(None, include_in_schema=False),
     sort_by: ResponseSortingParam = Query(ResponseSortingParam.none, description="Field to sort by"),
     sort_order: SortingOrder = Query(SortingOrder.asc),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
+    search: str = Query(
+        None, min_length=2, max_length=256,
+        description="Fuzzy search of applicant by name, email and phone, results go most similar first",
+    ),
+    threshold: float = Query(0.3, gt=0, le=1, description="Minimal similarity of applicant to search"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a list of existing user's responses.
     """
 
-    if not any([gp_user_id, first_name, last_name, middle_name, email, phone, show_all]):
+    if not any([gp_user_id, first_name, last_name, middle_name, email, phone, search, show_all]):
         return JSONResponse(
             status_code=400, content=MessageManager.get_invalid_filters_user_response_msg()
         )
-    # ***** Check authority ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    result = await DAL(session).get_user_responses_page(
-        page, limit, gp_user_id, first_name, last_name, middle_name, email, phone, sort_by, sort_order
-    )
+    try:
+        result = await DAL(session).get_user_responses_page(
+            page, limit, gp_user_id, first_name, last_name, middle_name, email, phone, sort_by, sort_order,
+            cursor=cursor, search=search, threshold=threshold,
+        )
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
     if result.items:
         return result
     return JSONResponse(status_code=404, content=MessageManager.get_user_responses_nothing_found_msg())
@@ -546,6 +615,7 @@ async def get_user_responses(
 
 @router.get(
     "/v2/responses/users/",
+    dependencies=[Depends(deps.get_authority)],
     response_model=UserResponsePage,
     status_code=200,
     responses={
@@ -574,10 +644,6 @@ async def get_user_responses(
     },
 )
 async def v2_get_user_responses(
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
     page: int = Query(0, ge=0, description="Page number"),
     limit: int = Query(50, ge=1, le=50, description="Page size limit"),
     gp_user_id: UUID = Query(None, description="User filter"),
@@ -589,42 +655,90 @@ async def v2_get_user_responses(
     show_all: bool = Query(None, include_in_schema=False),
     sort_by: ResponseSortingParam = Query(ResponseSortingParam.none, description="Field to sort by"),
     sort_order: SortingOrder = Query(SortingOrder.asc),
+    cursor: str = Query(None, description="next_cursor of previous page, page number is ignored with it"),
+    search: str = Query(
+        None, min_length=2, max_length=256,
+        description="Fuzzy search of applicant by name, email and phone, results go most similar first",
+    ),
+    threshold: float = Query(0.3, gt=0, le=1, description="Minimal similarity of applicant to search"),
     session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
     Retrieves a list of existing user's responses in one list.
     """
-    if not (gp_user_id or first_name or last_name or middle_name or email or phone or show_all):
+    if not (gp_user_id or first_name or last_name or middle_name or email or phone or search or show_all):
         return JSONResponse(
             status_code=400, content=MessageManager.get_invalid_filters_user_response_msg()
         )
 
-    # ***Check authority***
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***End check authority***
-
-    result = await DAL(session).v2_get_user_responses_page(
-        page, limit, gp_user_id, first_name, last_name, middle_name, email, phone, sort_by, sort_order
-    )
+    try:
+        result = await DAL(session).v2_get_user_responses_page(
+            page, limit, gp_user_id, first_name, last_name, middle_name, email, phone, sort_by, sort_order,
+            cursor=cursor, search=search, threshold=threshold,
+        )
+    except InvalidCursorError:
+        return JSONResponse(status_code=400, content=MessageManager.get_invalid_cursor_msg())
 
     if result.items:
         return result
     return JSONResponse(status_code=404, content=MessageManager.get_user_responses_nothing_found_msg())
 
 
+# Declared before /notify/{vacancy_id}, otherwise "batch" is taken for vacancy_id
+@router.post(
+    "/notify/batch",
+    dependencies=[Depends(deps.get_authority)],
+    response_model=NotifyBatchResult,
+    status_code=202,
+    responses={
+        419: {
+            "model": Message,
+            "content": {
+                "application/json": {
+                    "example": MessageManager.timeout_signature()
+                }
+            },
+        },
+    },
+)
+async def post_vacancies_to_telegram(
+    notify_batch: NotifyBatch,
+    session: AsyncSession = Depends(deps.get_session),
+) -> Any:
+    """
+    Queues posting several vacancies to Telegram channel using service SiNoRa.
+    Posts are rendered from vacancies stored in database and delivered in background,
+    result of each vacancy is returned in the order of request.
+    """
+    dal = DAL(session)
+    vacancies = await dal.get_vacancies_notify_fields(notify_batch.vacancy_ids)
+    payloads = {vacancy.id: vacancy_parameters(vacancy) for vacancy in vacancies}
+    notifications = await dal.create_notifications(config.settings.TELEGRAM_CHANNEL_ID_CLOVERI, payloads)
+    if notifications:
+        outbox_worker.wake()
+    deliveries = {notification.vacancy_id: notification for notification in notifications}
+    logger.info(
+        "Vacancies queued for Telegram",
+        extra={"queued": len(deliveries), "not_found": len(notify_batch.vacancy_ids) - len(deliveries)},
+    )
+    return NotifyBatchResult(items=[
+        NotifyBatchItem(vacancy_id=vacancy_id, status="queued", delivery=deliveries[vacancy_id])
+        if vacancy_id in deliveries else NotifyBatchItem(vacancy_id=vacancy_id, status="not_found")
+        for vacancy_id in notify_batch.vacancy_ids
+    ])
+
+
 @router.post(
     "/notify/{vacancy_id}",
-    response_model=Message,
-    status_code=200,
+    dependencies=[Depends(deps.get_vacancy_authority)],
+    response_model=NotificationDelivery,
+    status_code=202,
     responses={
-        200: {
+        404: {
             "model": Message,
             "content": {
                 "application/json": {
-                    "example": MessageManager.get_successfully_notify_msg(EXAMPLE_UUID)
+                    "example": MessageManager.get_vacancy_not_found_msg(EXAMPLE_UUID)
                 }
             },
         },
@@ -636,63 +750,75 @@ async def v2_get_user_responses(
                 }
             },
         },
-        422: {
+    },
+)
+async def post_vacancy_to_telegram(
+    vacancy_id: UUID,
+    vacancy_post: Optional[PostTelegramVacancy] = Body(None),
+    session: AsyncSession = Depends(deps.get_session),
+) -> Any:
+    """
+    Queues posting vacancy to Telegram channel using service SiNoRa.
+    Without body the post is rendered from the vacancy stored in database.
+    Post is delivered in background, its status is returned by /notify/deliveries/{delivery_id}.
+    """
+    dal = DAL(session)
+    if vacancy_post is None:
+        vacancy = await dal.get_vacancy_notify_fields(vacancy_id)
+        parameters = vacancy_parameters(vacancy) if vacancy else None
+    else:
+        parameters = render_telegram_parameters(vacancy_post) if await dal.vacancy_exists(vacancy_id) else None
+    if parameters is None:
+        return JSONResponse(
+            status_code=404,
+            content=MessageManager.get_vacancy_not_found_msg(vacancy_id),
+        )
+    notification = await dal.create_notification(vacancy_id, config.settings.TELEGRAM_CHANNEL_ID_CLOVERI, parameters)
+    outbox_worker.wake()
+    logger.info(
+        "Vacancy queued for Telegram",
+        extra={"vacancy_id": str(vacancy_id), "notification_id": str(notification.id)},
+    )
+    return notification
+
+
+@router.get(
+    "/notify/deliveries/{delivery_id}",
+    dependencies=[Depends(deps.get_delivery_authority)],
+    response_model=NotificationDelivery,
+    status_code=200,
+    responses={
+        404: {
             "model": Message,
             "content": {
                 "application/json": {
-                    "example": MessageManager.get_service_validation_error("SiNoRa", {'detail': 'string'})
+                    "example": MessageManager.get_delivery_not_found_msg(EXAMPLE_UUID)
                 }
             },
         },
-        503: {
+        419: {
             "model": Message,
             "content": {
                 "application/json": {
-                    "example": MessageManager.get_service_unavailable_msg("SiNoRa")
+                    "example": MessageManager.timeout_signature()
                 }
             },
         },
     },
 )
-async def post_vacancy_to_telegram(
-    vacancy_id: UUID,
-    vacancy_post: PostTelegramVacancy,
-    project_id: UUID = Query(..., description="Project ID of service"),
-    service: ServiceOperation = Query(..., description="Type of operation"),
-    time: str = Query("", description="Timestamp, format is unix time"),
-    signature: str = Query("", description="Signature of data"),
-    # session: AsyncSession = Depends(deps.get_session),
-    # request: Request = Body(..., embed=False)
+async def get_notification_delivery(
+    delivery_id: UUID,
+    session: AsyncSession = Depends(deps.get_session),
 ) -> Any:
     """
-    Posting vacancy to Telegram channel using service SiNoRa.
+    Retrieves status of posting vacancy to Telegram channel.
     """
-
-    # ***** Check authority Case 1 ******
-    authority_error = await check_authority(project_id, signature, data_fields=str(service.value), time=time)
-
-    if authority_error:
-        return authority_error
-    # ***** End Check authority ******
-
-    # *** Posting vacancy to Telegram ***
-    response = await post_to_telegram(vacancy_post)
-    if response["status_code"] == 200:
-        return JSONResponse(
-            status_code=200,
-            content=MessageManager.get_successfully_notify_msg(vacancy_id),
-        )
-    elif response["status_code"] == 422:
-        return JSONResponse(
-            status_code=422,
-            content=MessageManager.get_service_validation_error("SiNoRa", response),
-        )
-    else:
-        return JSONResponse(
-            status_code=503,
-            content=MessageManager.get_service_unavailable_msg("SiNoRa"),
-        )
-    # *** END Posting vacancy to Telegram ***
+    notification = await DAL(session).get_notification(delivery_id)
+    if notification:
+        return notification
+    return JSONResponse(
+        status_code=404, content=MessageManager.get_delivery_not_found_msg(delivery_id)
+    )
 
 # @router.put("/me", response_model=schemas.User)
 # async def update_user_me(
@@ -13,6 +13,7 @@ class MessageTypes(str, enum.Enum):
     NOT_FOUND = "not_found"
     VACANCY_DELETED = "deleted"
     INVALID_FILTERS = "invalid_filter"
+    INVALID_CURSOR = "invalid_cursor"
     SIGNATURE_DONT_MATCH = "invalid_signature"
     SERVICE_UNAVAILABLE = "service_unavailable"
     VACANCY_NOTIFY = "notified"
@@ -41,9 +42,11 @@ class MessageTexts(str, enum.Enum):
     INVALID_FILTERS_USER_RESPONSES = (
         "At least one of {gp_user_id, first_name, last_name, middle_name, email, phone} must be specified"
     )
+    INVALID_CURSOR = "Page cursor is invalid or was made for another sorting"
     INVALID_SIGNATURE = "Invalid signature"
     SERVICE_IS_UNAVAILABLE = "Remote service {} is unavailable for some reason "
     VACANCY_NOTIFIED = "Vacancy {} is successfully notified"
+    DELIVERY_NOT_FOUND = "Notification delivery {} is not found"
     SERVICE_VALIDATION_ERROR = "Remote service {} returned error: {}"
     AUTHENTICATION_TIMEOUT_ERROR = "Timeout signature {}"
 
@@ -93,6 +96,13 @@ class MessageManager:
             MessageTypes.VACANCY_DELETED,
         )
 
+    @staticmethod
+    def get_invalid_cursor_msg() -> Dict:
+        return MessageManager.make_message(
+            MessageTexts.INVALID_CURSOR,
+            MessageTypes.INVALID_CURSOR,
+        )
+
     @staticmethod
     def get_invalid_filters_msg() -> Dict:
         return MessageManager.make_message(
@@ -164,6 +174,13 @@ class MessageManager:
             MessageTypes.VACANCY_NOTIFY,
         )
 
+    @staticmethod
+    def get_delivery_not_found_msg(delivery_id: UUID) -> Dict:
+        return MessageManager.make_message(
+            MessageTexts.DELIVERY_NOT_FOUND.format(delivery_id),
+            MessageTypes.NOT_FOUND,
+        )
+
     @staticmethod
     def get_service_validation_error(service_name: str, error_detail: Dict) -> Dict:
         return MessageManager.make_message(
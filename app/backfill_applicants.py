@@ -0,0 +1,32 @@
+"""
+Fill normalized identity columns of existing vacancy responses.
+
+Run once after migration which adds the columns, it is safe to run again:
+    python -m app.backfill_applicants --batch-size 1000
+Every batch is committed on its own, so the table is never locked for long.
+"""
+import argparse
+import asyncio
+
+from app.db.dal import DAL
+from app.session import async_session
+
+
+async def main(batch_size: int) -> None:
+    last_id, batches = None, 0
+    while True:
+        async with async_session() as session:
+            batch_last_id = await DAL(session).backfill_applicant_identity(last_id, batch_size)
+        if batch_last_id is None:
+            break
+        last_id = batch_last_id
+        batches += 1
+        print(f"Backfilled {batches} batches of {batch_size} responses, last id {last_id}")
+    print("Backfill finished")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -35,6 +35,10 @@ class Settings(BaseSettings):
     ENVIRONMENT: Literal["DEV", "PYTEST", "STAGE", "PRODUCTION"]
     BACKEND_CORS_ORIGINS: Union[str, list[AnyHttpUrl]]
 
+    # LOGGING, share of records below WARNING which are written
+    LOG_LEVEL: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
+    LOG_SAMPLE_RATE: float = 1.0
+
     # PROJECT NAME, VERSION AND DESCRIPTION
     PROJECT_NAME: str = PYPROJECT_CONTENT["name"]
     VERSION: str = PYPROJECT_CONTENT["version"]
@@ -76,6 +80,32 @@ class Settings(BaseSettings):
     URL_REGISTRY_SERVICE: str = ""
     SINGER_DEBUG: bool = False
 
+    # Registry API token cache
+    TOKEN_CACHE_MAX_SIZE: int = 1024
+    TOKEN_CACHE_TTL: int = 3600
+    TOKEN_CACHE_NEGATIVE_TTL: int = 30
+    # Expired tokens are still served this long while Registry is unavailable
+    TOKEN_CACHE_STALE_TTL: int = 86400
+    # Share tokens between worker processes through UNLOGGED table registry_token
+    TOKEN_SHARED_STORE: bool = False
+    # Load tokens of all projects from vacancy table on startup and refresh them before expiry
+    TOKEN_PREWARM: bool = False
+    TOKEN_PREWARM_CONCURRENCY: int = 10
+    TOKEN_REFRESH_INTERVAL: int = 60
+    TOKEN_REFRESH_AHEAD: int = 300
+    # Save token cache to this file periodically and on shutdown, restore it on startup
+    TOKEN_SNAPSHOT_PATH: str = ""
+    TOKEN_SNAPSHOT_INTERVAL: int = 300
+
+    # Connections to Registry service
+    REGISTRY_CONNECT_TIMEOUT: float = 3.0
+    REGISTRY_READ_TIMEOUT: float = 5.0
+    REGISTRY_MAX_CONNECTIONS: int = 20
+    REGISTRY_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    # Registry is not called for RESET_TIMEOUT seconds after FAILURE_THRESHOLD failures in a row
+    REGISTRY_BREAKER_FAILURE_THRESHOLD: int = 5
+    REGISTRY_BREAKER_RESET_TIMEOUT: int = 30
+
     # SiNoRa notification's service
     URL_SINORA_NOTIFICATION: str = ""
     USER_UUID: str = ""
@@ -84,6 +114,64 @@ class Settings(BaseSettings):
     EVENT_CODE_NAME: str = ""
     TELEGRAM_CHANNEL_ID_CLOVERI: int = 0
 
+    # Delivery of notifications from outbox: batch is taken every POLL_INTERVAL seconds,
+    # a taken notification is hidden from other workers for LEASE seconds,
+    # retry delays grow from RETRY_BASE up to RETRY_MAX seconds
+    NOTIFY_POLL_INTERVAL: float = 5.0
+    NOTIFY_BATCH_SIZE: int = 20
+    NOTIFY_LEASE: int = 300
+    NOTIFY_MAX_ATTEMPTS: int = 8
+    NOTIFY_RETRY_BASE: float = 2.0
+    NOTIFY_RETRY_MAX: float = 600.0
+    # Notifications sent to SiNoRa at once, vacancies in one batch request
+    NOTIFY_CONCURRENCY: int = 5
+    NOTIFY_BATCH_MAX_VACANCIES: int = 100
+    # With DIGEST_WINDOW > 0 queued vacancies are posted once per window, one message per channel
+    # with up to DIGEST_MAX_VACANCIES vacancies, using SiNoRa template DIGEST_EVENT_CODE_NAME.
+    # Without DIGEST_EVENT_CODE_NAME digest mode is off
+    NOTIFY_DIGEST_WINDOW: int = 0
+    NOTIFY_DIGEST_MAX_VACANCIES: int = 30
+    NOTIFY_DIGEST_EVENT_CODE_NAME: str = ""
+    # Rendered SiNoRa messages of vacancies, a message is rendered again when vacancy is edited
+    NOTIFY_PAYLOAD_CACHE_SIZE: int = 512
+    NOTIFY_PAYLOAD_CACHE_TTL: int = 3600
+
+    # Messages per second sent to SiNoRa in total and to one Telegram channel, 0 is unlimited.
+    # BURST messages may be sent at once after a pause
+    SINORA_RATE: float = 20.0
+    SINORA_BURST: int = 20
+    SINORA_CHANNEL_RATE: float = 0.33
+    SINORA_CHANNEL_BURST: int = 3
+
+    # Connections to SiNoRa service
+    SINORA_CONNECT_TIMEOUT: float = 3.0
+    SINORA_READ_TIMEOUT: float = 10.0
+    SINORA_MAX_CONNECTIONS: int = 20
+    SINORA_MAX_KEEPALIVE_CONNECTIONS: int = 10
+
+    # Idle keep-alive connections to remote services are closed after this many seconds
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    # Matching of candidate skills with vacancies: weight of vacancy skill by its desirability,
+    # skill of EMPTY desirability weighs as DESIRED one
+    MATCH_REQUIRED_WEIGHT: float = 1.0
+    MATCH_DESIRED_WEIGHT: float = 0.5
+    # Skill of the highest priority (1000) weighs (1 + MATCH_PRIORITY_WEIGHT) times as much as one of priority 0
+    MATCH_PRIORITY_WEIGHT: float = 1.0
+    MATCH_MAX_SKILLS: int = 100
+    # Batch matching scores candidates with skill matrices of projects kept in memory
+    MATCH_BATCH_MAX_CANDIDATES: int = 1000
+    # Matrices of recently matched projects, a matrix is dropped MATRIX_CACHE_TTL seconds after it is built
+    MATCH_MATRIX_CACHE_SIZE: int = 32
+    MATCH_MATRIX_CACHE_TTL: int = 3600
+
+    # Serialized vacancies and vacancy responses read by id, an edited vacancy is read from DB again
+    VACANCY_CACHE_SIZE: int = 1024
+    VACANCY_RESPONSE_CACHE_SIZE: int = 1024
+    VACANCY_CACHE_TTL: int = 3600
+    # Pages of vacancy lists, all pages of a project are dropped when its vacancy is written
+    VACANCY_PAGE_CACHE_SIZE: int = 256
+
     # VALIDATORS
     @validator("BACKEND_CORS_ORIGINS")
     def _assemble_cors_origins(cls, cors_origins: Union[str, list[AnyHttpUrl]]):
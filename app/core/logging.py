@@ -0,0 +1,107 @@
+"""
+Logging of the application.
+
+Records of `app.*` loggers go through a queue: the request handling code only
+puts a record into the queue, a listener thread formats it as one JSON line and
+writes it to stderr. So writing logs never blocks the event loop.
+
+`LOG_LEVEL` gates records before they are built, `LOG_SAMPLE_RATE` lets through
+only a share of records below WARNING, warnings and errors are always kept.
+"""
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Optional
+
+from app.core import config
+
+LOGGER_NAME = "app"
+
+# Attributes every LogRecord has, the rest came from `extra`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        document.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document["exc_info"] = record.exc_text
+        return json.dumps(document, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through every record at WARNING and above and `rate` share of the rest
+    """
+
+    def __init__(self, rate: float, random_: Callable[[], float] = random.random):
+        super().__init__()
+        self.rate = rate
+        self._random = random_
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1 or self._random() < self.rate
+
+
+class LogQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # message and traceback are rendered here, objects they refer to may change before listener gets them
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class LoggingManager:
+    """
+    Attaches queue handler to `app` logger and runs the listener which writes records
+    """
+
+    def __init__(self):
+        self._handler: Optional[QueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+
+    def setup(self) -> None:
+        if self._listener is not None:
+            return
+        records = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(JSONFormatter())
+        self._handler = LogQueueHandler(records)
+        self._handler.addFilter(SamplingFilter(config.settings.LOG_SAMPLE_RATE))
+        self._listener = QueueListener(records, stream_handler)
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(config.settings.LOG_LEVEL)
+        logger.addHandler(self._handler)
+        logger.propagate = False
+        self._listener.start()
+
+    def shutdown(self) -> None:
+        if self._listener is None:
+            return
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.removeHandler(self._handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+        # writes records left in queue
+        self._listener.stop()
+        self._handler, self._listener = None, None
+
+
+logging_manager = LoggingManager()
@@ -1,24 +1,35 @@
-from typing import Optional
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
 from uuid import UUID
 
-from pydantic import EmailStr
+from pydantic import BaseModel, EmailStr
 from pydantic.types import List
-from sqlalchemy import asc, desc, update, func, cast, String, text, and_, exists
+from sqlalchemy import update, func, text, and_, exists, bindparam, literal, literal_column, Float, Integer, case, \
+    cast, column, type_coerce, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload, aliased, join
+from sqlalchemy.sql import Select
 
-from app.schemas.vacancy import CreateVacancy, EditVacancy
-from app.schemas.vacancy_skill import VacancySkillNested
-from app.schemas.vacancy_response import CreateVacancyResponse
+from app.schemas.vacancy import CreateVacancy, EditVacancy, Vacancy as VacancySchema
+from app.schemas.vacancy_skill import MAX_PRIORITY, VacancySkillNested
+from app.schemas.vacancy_response import CreateVacancyResponse, VacancyResponse as VacancyResponseSchema
 from app.schemas.user_response import UserResponse
+from app.schemas.shared import DeliveryStatus, SkillDesirability
+from app.schemas.vacancy_match import CandidateSkill, VacancyMatch, VacancyMatchPage
+from app.core import config
+from app.utils.matching import LEVEL_RANKS
+from app.utils.applicant import APPLICANT_FIELDS, NORMALIZERS, applicant_identity, normalize_name
+from app.utils.vacancy_cache import ALL_PROJECTS, PAGE_CACHE, RESPONSE_CACHE, VACANCY_CACHE
 
 
 from ..errors import VacancyNotFoundError
 from ..schemas.vacancy_api import SortingOrder, SortingParam, VacancyPage, ResponseSortingParam, VacancyResponsePage, \
     UserResponsePage
-from .models import Vacancy, VacancySkill, VacancyResponse
+from .pagination import Keyset
+from .models import Vacancy, VacancySkill, VacancyResponse, RegistryToken, NotificationOutbox, VacancyPageGeneration
 
 sorting_to_field_map = {
     SortingParam.none: None,
@@ -33,7 +44,56 @@ response_sorting_to_field_map = {
     ResponseSortingParam.created_on: VacancyResponse.created_on,
 }
 
-sorting_order_map = {SortingOrder.asc: asc, SortingOrder.desc: desc}
+
+# text search configuration of Vacancy.search_vector
+SEARCH_CONFIG = literal_column("'russian'::regconfig")
+
+
+def response_keyset(name: str, sorting: ResponseSortingParam, order: SortingOrder) -> Keyset:
+    """
+    Responses are always ordered by (created_on, id), sorting only chooses the direction
+    """
+    column = response_sorting_to_field_map[sorting]
+    return Keyset(
+        name,
+        VacancyResponse.id,
+        column if column is not None else VacancyResponse.created_on,
+        descending=order == SortingOrder.desc,
+    )
+
+
+def filter_user_responses(query, gp_user_id: Optional[UUID], **applicant):
+    """
+    Filter responses by user and by identity of applicant. Email and phone are normalized
+    as they are stored, names are compared case-insensitively
+    """
+    if gp_user_id:
+        query = query.filter(VacancyResponse.gp_user_id == gp_user_id)
+    for name in APPLICANT_FIELDS:
+        value = NORMALIZERS[name](applicant.get(name))
+        if not value:
+            continue
+        column = getattr(VacancyResponse, name)
+        if NORMALIZERS[name] is normalize_name:
+            query = query.filter(func.lower(column) == value.lower())
+        else:
+            query = query.filter(column == value)
+    return query
+
+
+def search_applicants(query, search: str) -> Tuple[Select, Keyset]:
+    """
+    Responses with applicant similar to `search`, most similar first.
+    `<%` is served by trigram index on applicant_search
+    """
+    rank = func.word_similarity(search, VacancyResponse.applicant_search, type_=Float).label("rank")
+    query = query.add_columns(rank).filter(literal(search).op("<%")(VacancyResponse.applicant_search))
+    return query, Keyset("applicant_search", VacancyResponse.id, rank, descending=True)
+
+
+def to_json(model: BaseModel) -> bytes:
+    # compact and unescaped, as JSONResponse renders it
+    return model.json(ensure_ascii=False, separators=(",", ":")).encode()
 
 
 class DAL:
@@ -50,6 +110,27 @@ class DAL:
         )
         return result.scalar()
 
+    async def get_vacancy_json(self, vacancy_id: UUID) -> Optional[bytes]:
+        """
+        Serialized vacancy, from cache unless vacancy was updated since it was cached
+        """
+        version = (await self.session.execute(select(Vacancy.updated_on).filter(Vacancy.id == vacancy_id))).first()
+        if version is None:
+            return None
+        cached = VACANCY_CACHE.get((vacancy_id, version.updated_on))
+        if cached is not None:
+            return cached
+        vacancy = await self.get_vacancy(vacancy_id)
+        if vacancy is None:
+            return None
+        body = to_json(VacancySchema.from_orm(vacancy))
+        VACANCY_CACHE.set((vacancy_id, vacancy.updated_on), body)
+        return body
+
+    async def get_gp_project_ids(self) -> List[UUID]:
+        result = await self.session.execute(select(Vacancy.gp_project_id).distinct())
+        return result.scalars().all()
+
     async def create_vacancy(self, vacancy_create: CreateVacancy) -> Vacancy:
         vacancy_dict = vacancy_create.dict()
         skills = vacancy_dict.pop("skills")
@@ -60,6 +141,7 @@ class DAL:
         for skill in skills:
             self.session.add(VacancySkill(**skill, vacancy_id=new_vacancy.id))
 
+        await self.bump_page_generations(vacancy_create.gp_project_id)
         await self.session.commit()
         # refresh linked models
         return await self.get_vacancy(new_vacancy.id)
@@ -68,6 +150,8 @@ class DAL:
         result = await self.get_vacancy(vacancy_edit.id)
         if not result:
             return None
+        VACANCY_CACHE.invalidate((vacancy_edit.id, result.updated_on))
+        gp_project_id = result.gp_project_id
 
         vacancy_dict = vacancy_edit.dict()
         vacancy_dict.pop("skills")
@@ -79,6 +163,8 @@ class DAL:
         for var, value in vacancy_dict.items():
             setattr(result, var, value)
         await self.session.execute(update(Vacancy).where(Vacancy.id == vacancy_edit.id))
+        # vacancy may be moved to another project
+        await self.bump_page_generations(gp_project_id, vacancy_edit.gp_project_id)
         await self.session.commit()
         return await self.get_vacancy(vacancy_edit.id)
 
@@ -116,7 +202,11 @@ class DAL:
         team_id: UUID,
         sorting: SortingParam,
         order: SortingOrder,
+        cursor: Optional[str] = None,
     ) -> VacancyPage:
+        """
+        Page after cursor, or page number `page` when there is no cursor
+        """
         query = select(Vacancy)
         if gp_project_id:
             query = query.filter(Vacancy.gp_project_id == gp_project_id)
@@ -126,15 +216,184 @@ class DAL:
             query = query.filter(Vacancy.profession_id == profession_id)
         if team_id:
             query = query.filter(Vacancy.team_ids.contains([team_id]))
+        # without sorting vacancies go in order of creation
         sorting_field = sorting_to_field_map[sorting]
-        sorting_order = sorting_order_map[order]
-        if sorting_field:
-            query = query.order_by(sorting_order(sorting_field))
+        keyset = Keyset(
+            "vacancies",
+            Vacancy.id,
+            sorting_field if sorting_field is not None else Vacancy.created_on,
+            descending=order == SortingOrder.desc,
+        )
+        query = query.options(selectinload(Vacancy.skills))
+
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit, scalars=True)
+        items, next_cursor = keyset.page(rows, limit)
+        return VacancyPage(items=items, page=page, limit=limit, next_cursor=next_cursor)
+
+    async def get_vacancies_page_json(
+        self,
+        page: int,
+        limit: int,
+        gp_project_id: UUID,
+        company_id: UUID,
+        profession_id: UUID,
+        team_id: UUID,
+        sorting: SortingParam,
+        order: SortingOrder,
+        cursor: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """
+        Serialized page of get_vacancies_page from cache, None when page has no vacancies
+        """
+        filters = (page, limit, company_id, profession_id, team_id, sorting, order, cursor)
+        generation = await self.get_page_generation(gp_project_id)
+        cached = PAGE_CACHE.get_entry(gp_project_id, generation, filters)
+        if cached is not None:
+            return cached.value
+        result = await self.get_vacancies_page(
+            page, limit, gp_project_id, company_id, profession_id, team_id, sorting, order, cursor=cursor
+        )
+        body = to_json(result) if result.items else None
+        PAGE_CACHE.set(gp_project_id, generation, filters, body)
+        return body
+
+    async def get_page_generation(self, gp_project_id: Optional[UUID]) -> int:
+        """
+        Generation of cached vacancy pages of project, of all projects for None
+        """
+        result = await self.session.execute(
+            select(VacancyPageGeneration.generation)
+            .filter(VacancyPageGeneration.gp_project_id == (gp_project_id or ALL_PROJECTS))
+        )
+        return result.scalar() or 0
+
+    async def bump_page_generations(self, *gp_project_ids: Optional[UUID]) -> None:
+        """
+        Make cached pages which may include vacancies of these projects unreachable, in the transaction
+        which writes the vacancies. Rows are locked in the same order by all writers, so they don't deadlock
+        """
+        scopes = sorted({gp_project_id or ALL_PROJECTS for gp_project_id in gp_project_ids} | {ALL_PROJECTS})
+        query = insert(VacancyPageGeneration).values(
+            [{"gp_project_id": scope, "generation": 1} for scope in scopes]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[VacancyPageGeneration.gp_project_id],
+            set_={"generation": VacancyPageGeneration.generation + 1},
+        )
+        await self.session.execute(query)
+
+    async def search_vacancies(
+        self,
+        q: str,
+        page: int,
+        limit: int,
+        gp_project_id: Optional[UUID],
+        company_id: Optional[UUID],
+        cursor: Optional[str] = None,
+    ) -> VacancyPage:
+        """
+        Vacancies matching web search query `q`, most relevant first
+        """
+        query_vector = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        rank = func.ts_rank(Vacancy.search_vector, query_vector, type_=Float).label("rank")
+        query = select(Vacancy, rank).filter(Vacancy.search_vector.op("@@")(query_vector))
+        if gp_project_id:
+            query = query.filter(Vacancy.gp_project_id == gp_project_id)
+        if company_id:
+            query = query.filter(Vacancy.company_id == company_id)
+        keyset = Keyset("vacancy_search", Vacancy.id, rank, descending=True)
+        query = query.options(selectinload(Vacancy.skills))
+
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit)
+        rows, next_cursor = keyset.page(rows, limit, key=lambda row: (row.rank, row.Vacancy.id))
+        return VacancyPage(items=[row.Vacancy for row in rows], page=page, limit=limit, next_cursor=next_cursor)
+
+    async def match_vacancies(
+        self,
+        skills: List[CandidateSkill],
+        page: int,
+        limit: int,
+        gp_project_id: Optional[UUID],
+        profession_id: Optional[UUID],
+        cursor: Optional[str] = None,
+    ) -> VacancyMatchPage:
+        """
+        Vacancies with at least one of candidate skills, best covered first. See app.utils.matching
+        """
+        profile = values(
+            column("skill_id", PG_UUID(as_uuid=True)), column("level_rank", Integer), name="profile"
+        ).data([(skill.skill_id, LEVEL_RANKS[skill.level]) for skill in skills])
+        matched = select(VacancySkill.vacancy_id).join(profile, VacancySkill.skill_id == profile.c.skill_id)
+
+        required = VacancySkill.desirability == SkillDesirability.REQUIRED
+        weight = case(
+            (required, literal(config.settings.MATCH_REQUIRED_WEIGHT, Float)),
+            else_=literal(config.settings.MATCH_DESIRED_WEIGHT, Float),
+        ) * (
+            1 + literal(config.settings.MATCH_PRIORITY_WEIGHT, Float) * func.coalesce(VacancySkill.priority, 0) / MAX_PRIORITY
+        )
+        vacancy_rank = case(LEVEL_RANKS, value=VacancySkill.level, else_=0)
+        coverage = case(
+            (profile.c.skill_id.is_(None), literal(0.0, Float)),
+            else_=func.least(1.0, cast(profile.c.level_rank + 1, Float) / (vacancy_rank + 1)),
+        )
+        scores = (
+            select(
+                VacancySkill.vacancy_id,
+                type_coerce(func.sum(weight * coverage) / func.sum(weight), Float).label("score"),
+                func.count(profile.c.skill_id).label("matched_skills"),
+                func.count().filter(and_(required, coverage < 1)).label("missing_required"),
+            )
+            .outerjoin(profile, VacancySkill.skill_id == profile.c.skill_id)
+            .filter(VacancySkill.vacancy_id.in_(matched))
+            .group_by(VacancySkill.vacancy_id)
+            .subquery()
+        )
+
+        query = select(Vacancy, scores.c.score, scores.c.matched_skills, scores.c.missing_required)
+        query = query.join(scores, scores.c.vacancy_id == Vacancy.id).filter(Vacancy.is_active.is_(True))
+        if gp_project_id:
+            query = query.filter(Vacancy.gp_project_id == gp_project_id)
+        if profession_id:
+            query = query.filter(Vacancy.profession_id == profession_id)
+        keyset = Keyset("vacancy_match", Vacancy.id, scores.c.score, descending=True)
         query = query.options(selectinload(Vacancy.skills))
-        query = query.offset(page * limit).limit(limit)
 
-        result = await self.session.execute(query)
-        return VacancyPage(items=result.scalars().all(), page=page, limit=limit)
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit)
+        rows, next_cursor = keyset.page(rows, limit, key=lambda row: (row.score, row.Vacancy.id))
+        items = [
+            VacancyMatch(
+                vacancy=row.Vacancy, score=row.score, matched_skills=row.matched_skills,
+                missing_required=row.missing_required,
+            )
+            for row in rows
+        ]
+        return VacancyMatchPage(items=items, page=page, limit=limit, next_cursor=next_cursor)
+
+    async def get_match_version(self, gp_project_id: UUID) -> Tuple:
+        """
+        Changes when a vacancy of project is created, edited or deleted
+        """
+        result = await self.session.execute(
+            select(func.count(Vacancy.id), func.max(Vacancy.updated_on))
+            .filter(Vacancy.gp_project_id == gp_project_id)
+        )
+        return tuple(result.one())
+
+    async def get_active_vacancy_skills(self, gp_project_id: UUID) -> List:
+        """
+        (vacancy_id, skill_id, desirability, priority, level) of skills of active vacancies of project
+        """
+        result = await self.session.execute(
+            select(
+                VacancySkill.vacancy_id, VacancySkill.skill_id, VacancySkill.desirability, VacancySkill.priority,
+                VacancySkill.level,
+            )
+            .join(Vacancy, Vacancy.id == VacancySkill.vacancy_id)
+            .filter(Vacancy.gp_project_id == gp_project_id, Vacancy.is_active.is_(True))
+            .order_by(VacancySkill.vacancy_id, VacancySkill.skill_id)
+        )
+        return result.all()
 
     async def delete_vacancy(self, vacancy_id: UUID) -> None:
         result = await self.session.execute(
@@ -145,7 +404,10 @@ class DAL:
         result = result.scalar_one_or_none()
         if not result:
             raise VacancyNotFoundError
+        VACANCY_CACHE.invalidate((vacancy_id, result.updated_on))
+        gp_project_id = result.gp_project_id
         await self.session.delete(result)
+        await self.bump_page_generations(gp_project_id)
         await self.session.commit()
 
     async def get_vacancy_response(self, vacancy_response_id: UUID) -> Optional[VacancyResponse]:
@@ -155,6 +417,25 @@ class DAL:
         )
         return result.scalar()
 
+    async def get_vacancy_response_json(self, vacancy_response_id: UUID) -> Optional[bytes]:
+        """
+        Serialized vacancy response, from cache while the response exists
+        """
+        version = (await self.session.execute(
+            select(VacancyResponse.created_on).filter(VacancyResponse.id == vacancy_response_id)
+        )).first()
+        if version is None:
+            return None
+        cached = RESPONSE_CACHE.get((vacancy_response_id, version.created_on))
+        if cached is not None:
+            return cached
+        vacancy_response = await self.get_vacancy_response(vacancy_response_id)
+        if vacancy_response is None:
+            return None
+        body = to_json(VacancyResponseSchema.from_orm(vacancy_response))
+        RESPONSE_CACHE.set((vacancy_response_id, vacancy_response.created_on), body)
+        return body
+
     async def create_vacancy_response(self, vacancy_response_create: CreateVacancyResponse) -> VacancyResponse:
         vacancy_response_dict = vacancy_response_create.dict()
 
@@ -175,6 +456,28 @@ class DAL:
 
         return await self.get_vacancy_response(new_vacancy_response.id)
 
+    async def backfill_applicant_identity(self, after_id: Optional[UUID], limit: int) -> Optional[UUID]:
+        """
+        Fill identity columns of a batch of responses after `after_id`,
+        return id of the last response of the batch or None when there are no more
+        """
+        query = select(VacancyResponse.id, VacancyResponse.data_response).order_by(VacancyResponse.id).limit(limit)
+        if after_id:
+            query = query.filter(VacancyResponse.id > after_id)
+        rows = (await self.session.execute(query)).all()
+        if not rows:
+            return None
+        table = VacancyResponse.__table__
+        identities = [{"response_id": row.id, **applicant_identity(row.data_response)} for row in rows]
+        await self.session.execute(
+            update(table)
+            .where(table.c.id == bindparam("response_id"))
+            .values({name: bindparam(name) for name in identities[0] if name != "response_id"}),
+            identities,
+        )
+        await self.session.commit()
+        return rows[-1].id
+
     async def get_vacancy_responses_page(
         self,
         page: int,
@@ -182,20 +485,16 @@ class DAL:
         vacancy_id: UUID,
         sorting: ResponseSortingParam,
         order: SortingOrder,
+        cursor: Optional[str] = None,
     ) -> VacancyResponsePage:
         query = select(VacancyResponse)
         if vacancy_id:
             query = query.filter(VacancyResponse.vacancy_id == vacancy_id)
 
-        sorting_field = response_sorting_to_field_map[sorting]
-
-        sorting_order = sorting_order_map[order]
-        if sorting_field:
-            query = query.order_by(sorting_order(sorting_field))
-        query = query.offset(page * limit).limit(limit)
-
-        result = await self.session.execute(query)
-        return VacancyResponsePage(items=result.scalars().all(), page=page, limit=limit)
+        keyset = response_keyset("vacancy_responses", sorting, order)
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit, scalars=True)
+        items, next_cursor = keyset.page(rows, limit)
+        return VacancyResponsePage(items=items, page=page, limit=limit, next_cursor=next_cursor)
 
     async def get_user_responses_page(
         self,
@@ -209,36 +508,30 @@ class DAL:
         phone: str,
         sorting: ResponseSortingParam,
         order: SortingOrder,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        threshold: float = 0.3,
     ) -> VacancyResponsePage:
+        """
+        With `search` responses are ordered by similarity of applicant to it instead of `sorting`
+        """
         query = select(VacancyResponse)
-        if gp_user_id:
-            query = query.filter(VacancyResponse.gp_user_id == gp_user_id)
-        if first_name:
-            first_name_value = f'"{first_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['first_name'], String) == first_name_value)
-        if last_name:
-            last_name_value = f'"{last_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['last_name'], String) == last_name_value)
-        if middle_name:
-            middle_name_value = f'"{middle_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['middle_name'], String) == middle_name_value)
-        if email:
-            email_value = f'"{email}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['email'], String) == email_value)
-        if phone:
-            phone_value = f'"{phone}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['phone'], String) == phone_value)
-
-        sorting_field = response_sorting_to_field_map[sorting]
-        sorting_order = sorting_order_map[order]
-
-        if sorting_field:
-            query = query.order_by(sorting_order(sorting_field))
-
-        query = query.offset(page * limit).limit(limit)
-
-        result = await self.session.execute(query)
-        return VacancyResponsePage(items=result.scalars().all(), page=page, limit=limit)
+        query = filter_user_responses(
+            query, gp_user_id, first_name=first_name, last_name=last_name, middle_name=middle_name,
+            email=email, phone=phone,
+        )
+        if search:
+            await self.set_similarity_threshold(threshold)
+            query, keyset = search_applicants(query, search)
+        else:
+            keyset = response_keyset("user_responses", sorting, order)
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit, scalars=not search)
+        if search:
+            rows, next_cursor = keyset.page(rows, limit, key=lambda row: (row.rank, row.VacancyResponse.id))
+            items = [row.VacancyResponse for row in rows]
+        else:
+            items, next_cursor = keyset.page(rows, limit)
+        return VacancyResponsePage(items=items, page=page, limit=limit, next_cursor=next_cursor)
 
     async def v2_get_user_responses_page(
         self,
@@ -252,7 +545,13 @@ class DAL:
         phone: str,
         sorting: ResponseSortingParam,
         order: SortingOrder,
+        cursor: Optional[str] = None,
+        search: Optional[str] = None,
+        threshold: float = 0.3,
     ) -> UserResponsePage:
+        """
+        With `search` responses are ordered by similarity of applicant to it instead of `sorting`
+        """
 
         query = select(VacancyResponse.id.label('id'),
                        VacancyResponse.created_on.label('created_on'),
@@ -264,39 +563,159 @@ class DAL:
                        )
         query = query.join(Vacancy, VacancyResponse.vacancy_id == Vacancy.id)
 
-        if gp_user_id:
-            query = query.filter(VacancyResponse.gp_user_id == gp_user_id)
-        if first_name:
-            first_name_value = f'"{first_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['first_name'], String) == first_name_value)
-        if last_name:
-            last_name_value = f'"{last_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['last_name'], String) == last_name_value)
-        if middle_name:
-            middle_name_value = f'"{middle_name}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['middle_name'], String) == middle_name_value)
-        if email:
-            email_value = f'"{email}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['email'], String) == email_value)
-        if phone:
-            phone_value = f'"{phone}"'
-            query = query.filter(cast(VacancyResponse.data_response[0]['phone'], String) == phone_value)
-
-        sorting_field = response_sorting_to_field_map[sorting]
-        sorting_order = sorting_order_map[order]
-
-        if sorting_field:
-            query = query.order_by(sorting_order(sorting_field))
-
-        query = query.offset(page * limit).limit(limit)
-
-        result = await self.session.execute(query)
+        query = filter_user_responses(
+            query, gp_user_id, first_name=first_name, last_name=last_name, middle_name=middle_name,
+            email=email, phone=phone,
+        )
+
+        if search:
+            await self.set_similarity_threshold(threshold)
+            query, keyset = search_applicants(query, search)
+        else:
+            keyset = response_keyset("v2_user_responses", sorting, order)
+        rows = await keyset.fetch(self.session, query, limit, cursor=cursor, offset=page * limit)
+        rows, next_cursor = keyset.page(rows, limit)
 
         user_responses = []
-        for row in result:
+        for row in rows:
             user_response = UserResponse(id=row.id, created_on=row.created_on, data_response=row.data_response,
                                          vacancy_id=row.vacancy_id, gp_user_id=row.gp_user_id, name=row.name,
                                          company_name=row.company_name)
             user_responses.append(user_response)
 
-        return UserResponsePage(items=user_responses, page=page, limit=limit)
+        return UserResponsePage(items=user_responses, page=page, limit=limit, next_cursor=next_cursor)
+
+    async def set_similarity_threshold(self, threshold: float) -> None:
+        """
+        Threshold of `<%` operator till the end of transaction
+        """
+        await self.session.execute(
+            select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+        )
+
+    async def get_registry_token(self, gp_project_id: UUID, min_ttl: int = 0) -> Optional[RegistryToken]:
+        result = await self.session.execute(
+            select(RegistryToken)
+            .filter(RegistryToken.gp_project_id == gp_project_id)
+            .filter(RegistryToken.expires_on > func.now() + timedelta(seconds=min_ttl))
+        )
+        return result.scalar()
+
+    async def save_registry_token(self, gp_project_id: UUID, api_token: str, ttl: int) -> None:
+        query = insert(RegistryToken).values(
+            gp_project_id=gp_project_id,
+            api_token=api_token,
+            expires_on=func.now() + timedelta(seconds=ttl),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[RegistryToken.gp_project_id],
+            set_={"api_token": query.excluded.api_token, "expires_on": query.excluded.expires_on},
+        )
+        await self.session.execute(query)
+        await self.session.commit()
+
+    async def vacancy_exists(self, vacancy_id: UUID) -> bool:
+        result = await self.session.execute(select(exists().where(Vacancy.id == vacancy_id)))
+        return result.scalar()
+
+    async def get_vacancy_notify_fields(self, vacancy_id: UUID):
+        """
+        Columns of vacancy used in SiNoRa message, without skills
+        """
+        vacancies = await self.get_vacancies_notify_fields([vacancy_id])
+        return vacancies[0] if vacancies else None
+
+    async def get_vacancies_notify_fields(self, vacancy_ids: List[UUID]) -> List:
+        result = await self.session.execute(
+            select(
+                Vacancy.id,
+                Vacancy.updated_on,
+                Vacancy.name,
+                Vacancy.company_name,
+                Vacancy.full_description,
+                Vacancy.contacts,
+                Vacancy.requirements,
+                Vacancy.conditions,
+                Vacancy.responsibilities,
+            ).filter(Vacancy.id.in_(vacancy_ids))
+        )
+        return result.all()
+
+    async def create_notification(self, vacancy_id: UUID, channel: int, payload: Dict) -> NotificationOutbox:
+        notifications = await self.create_notifications(channel, {vacancy_id: payload})
+        return notifications[0]
+
+    async def create_notifications(self, channel: int, payloads: Dict[UUID, Dict]) -> List[NotificationOutbox]:
+        """
+        Write notifications of several vacancies in one transaction
+        """
+        notifications = [
+            NotificationOutbox(vacancy_id=vacancy_id, channel=channel, payload=payload)
+            for vacancy_id, payload in payloads.items()
+        ]
+        self.session.add_all(notifications)
+        await self.session.commit()
+        return notifications
+
+    async def get_notification(self, notification_id: UUID) -> Optional[NotificationOutbox]:
+        result = await self.session.execute(
+            select(NotificationOutbox).filter(NotificationOutbox.id == notification_id)
+        )
+        return result.scalar()
+
+    async def claim_notifications(self, limit: int, lease: int) -> List:
+        """
+        Take due pending notifications. Other workers skip them for `lease` seconds,
+        so a notification of crashed worker is delivered again after lease
+        """
+        due = (
+            select(NotificationOutbox.id)
+            .filter(NotificationOutbox.status == DeliveryStatus.PENDING)
+            .filter(NotificationOutbox.next_attempt_on <= func.now())
+            .order_by(NotificationOutbox.next_attempt_on)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=NotificationOutbox.attempts + 1,
+                next_attempt_on=func.now() + timedelta(seconds=lease),
+            )
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.vacancy_id,
+                NotificationOutbox.channel,
+                NotificationOutbox.payload,
+                NotificationOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        notifications = result.all()
+        await self.session.commit()
+        return notifications
+
+    async def finish_notifications(
+        self,
+        notification_ids: List[UUID],
+        status: DeliveryStatus,
+        status_code: int,
+        last_error: Optional[str] = None,
+        retry_in: float = 0,
+    ) -> None:
+        """
+        Save result of delivery attempt, pending notifications are tried again in `retry_in` seconds
+        """
+        values = {"status": status, "status_code": status_code, "last_error": last_error}
+        if status == DeliveryStatus.DELIVERED:
+            values["delivered_on"] = func.now()
+        elif status == DeliveryStatus.PENDING:
+            values["next_attempt_on"] = func.now() + timedelta(seconds=retry_in)
+        await self.session.execute(
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(notification_ids))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
@@ -8,28 +8,45 @@ from typing import Any, cast
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     Date,
     DateTime,
     Enum,
     Float,
     ForeignKey,
+    Index,
     String,
     Text,
+    event,
+    text,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, SMALLINT, UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, SMALLINT, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.orm.decl_api import declarative_base
 from sqlalchemy.sql import func
 
-from app.schemas.shared import SkillDesirability, SkillLevel
+from app.schemas.shared import DeliveryStatus, SkillDesirability, SkillLevel
+from app.utils.applicant import applicant_identity
 
 Base = cast(Any, declarative_base())
 
 
 class Vacancy(Base):
     __tablename__ = "vacancy"
+    # filters and sorts of DAL.get_vacancies_page, (column, id) matches its keyset order
+    __table_args__ = (
+        Index("ix_vacancy_gp_project_id_created_on", "gp_project_id", "created_on", "id"),
+        Index("ix_vacancy_company_id_created_on", "company_id", "created_on", "id"),
+        Index("ix_vacancy_profession_id_created_on", "profession_id", "created_on", "id"),
+        Index("ix_vacancy_team_ids", "team_ids", postgresql_using="gin"),
+        Index("ix_vacancy_created_on", "created_on", "id"),
+        Index("ix_vacancy_updated_on", "updated_on", "id"),
+        Index("ix_vacancy_name", "name", "id"),
+        Index("ix_vacancy_search_vector", "search_vector", postgresql_using="gin"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(254))
     is_active = Column(Boolean, default=False)
@@ -39,8 +56,8 @@ class Vacancy(Base):
 
     positions = Column(SMALLINT, nullable=True)
 
-    requirements = Column(JSON, default=list)
-    conditions = Column(JSON, default=list)
+    requirements = Column(JSONB, default=list)
+    conditions = Column(JSONB, default=list)
     responsibilities = Column(Text, nullable=True)
 
     short_description = Column(Text, nullable=True)
@@ -53,7 +70,7 @@ class Vacancy(Base):
     contact_name = Column(String(150), nullable=True)
     contact_company = Column(String(150), nullable=True)
     contact_position = Column(String(150), nullable=True)
-    contacts = Column(JSON, default=list)
+    contacts = Column(JSONB, default=list)
 
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
@@ -88,6 +105,18 @@ class Vacancy(Base):
 
     comments = Column(Text, nullable=True)
 
+    # full-text search document, see DAL.search_vacancies. Name weighs most, full description least
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(name, '')), 'A')"
+            " || setweight(to_tsvector('russian', coalesce(short_description, '')), 'B')"
+            " || setweight(to_tsvector('russian', coalesce(responsibilities, '')), 'C')"
+            " || setweight(to_tsvector('russian', coalesce(full_description, '')), 'D')",
+            persisted=True,
+        ),
+    ))
+
     responses = relationship(
         "VacancyResponse",
         cascade="save-update, merge, delete, delete-orphan",
@@ -100,6 +129,10 @@ class Vacancy(Base):
 
 class VacancySkill(Base):
     __tablename__ = "vacancy_skill"
+    # vacancies by skill for matching, primary key serves skills of a vacancy
+    __table_args__ = (
+        Index("ix_vacancy_skill_skill_id_vacancy_id", "skill_id", "vacancy_id"),
+    )
     vacancy_id = Column(UUID(as_uuid=True), ForeignKey("vacancy.id"), primary_key=True)
     skill_id = Column(UUID(as_uuid=True), nullable=False, primary_key=True)
     skill_description = Column(String(150), nullable=True)
@@ -111,10 +144,87 @@ class VacancySkill(Base):
 
 class VacancyResponse(Base):
     __tablename__ = "vacancy_response"
+    # keyset pagination of response listings, see DAL.get_*_responses_page
+    __table_args__ = (
+        Index("ix_vacancy_response_vacancy_id_created_on", "vacancy_id", "created_on", "id"),
+        Index("ix_vacancy_response_gp_user_id_created_on", "gp_user_id", "created_on", "id"),
+        Index("ix_vacancy_response_created_on", "created_on", "id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     gp_project_id = Column(UUID(as_uuid=True), nullable=False)
     gp_company_id = Column(UUID(as_uuid=True), nullable=True)
     gp_user_id = Column(UUID(as_uuid=True), nullable=True)
     vacancy_id = Column(UUID(as_uuid=True), ForeignKey("vacancy.id"))
-    data_response = Column(JSON, default=list)
+    data_response = Column(JSONB, default=list)
+    created_on = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Normalized identity of the first applicant in data_response, see app.utils.applicant
+    first_name = Column(String(150), nullable=True)
+    last_name = Column(String(150), nullable=True)
+    middle_name = Column(String(150), nullable=True)
+    email = Column(String(254), nullable=True, index=True)
+    phone = Column(String(16), nullable=True, index=True)
+    # identity joined for fuzzy search, trigram index ix_vacancy_response_applicant_search
+    # is created by migration only, it needs pg_trgm extension
+    applicant_search = deferred(Column(Text, nullable=True))
+
+
+for _name in ("first_name", "last_name", "middle_name"):
+    Index(f"ix_vacancy_response_{_name}", func.lower(getattr(VacancyResponse, _name)))
+
+
+@event.listens_for(VacancyResponse, "before_insert")
+@event.listens_for(VacancyResponse, "before_update")
+def set_applicant_identity(mapper, connection, target: VacancyResponse) -> None:
+    for name, value in applicant_identity(target.data_response).items():
+        setattr(target, name, value)
+
+
+class RegistryToken(Base):
+    """
+    Registry API tokens shared by all worker processes.
+    UNLOGGED, because it is only a cache and may be lost on crash
+    """
+    __tablename__ = "registry_token"
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+    gp_project_id = Column(UUID(as_uuid=True), primary_key=True)
+    api_token = Column(String, nullable=False)
+    expires_on = Column(DateTime(timezone=True), nullable=False)
+
+
+class VacancyPageGeneration(Base):
+    """
+    Generation of cached vacancy pages of project, see app.utils.vacancy_cache.
+    Bumped in the transaction which writes a vacancy, so every worker process sees it.
+    Not UNLOGGED: generations lost on crash would start again and match pages cached before it
+    """
+    __tablename__ = "vacancy_page_generation"
+    gp_project_id = Column(UUID(as_uuid=True), primary_key=True)
+    generation = Column(BigInteger, nullable=False)
+
+
+class NotificationOutbox(Base):
+    """
+    Notifications for SiNoRa service. Written in the request transaction,
+    delivered by background worker with retries
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_pending", "next_attempt_on", postgresql_where=text("status = 'PENDING'")),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    vacancy_id = Column(UUID(as_uuid=True), nullable=False)
+    # Telegram chat id
+    channel = Column(BigInteger, nullable=False)
+    # Parameters of SiNoRa message template
+    payload = Column(JSON, nullable=False)
+    status = Column(Enum(DeliveryStatus), nullable=False, default=DeliveryStatus.PENDING)
+    attempts = Column(SMALLINT, nullable=False, default=0)
+    next_attempt_on = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Last answer of SiNoRa
+    status_code = Column(SMALLINT, nullable=True)
+    last_error = Column(Text, nullable=True)
     created_on = Column(DateTime(timezone=True), server_default=func.now())
+    delivered_on = Column(DateTime(timezone=True), nullable=True)
+
+    __mapper_args__ = {"eager_defaults": True}
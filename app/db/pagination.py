@@ -0,0 +1,171 @@
+"""
+Keyset (cursor) pagination.
+
+Next page starts after the last row of previous page, `WHERE (sort_key, id) > (last_key, last_id)`,
+instead of skipping rows with OFFSET, so every page costs the same. `id` breaks ties of equal
+sort keys, which also makes the order deterministic.
+
+Cursor is opaque for clients: JSON with key of the last row, signed with SECRET_KEY together
+with the name of the order, so it can't be forged or used with another sort.
+NULLs are ordered as Postgres does by default: last in ascending order, first in descending.
+The row comparison only sees rows with the same nullness of the sort key as the cursor, so the
+index seeks straight to it; rows of the NULL (or not NULL) part that follows are read with
+a second query once the first one runs out of rows.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core import config
+from app.errors import InvalidCursorError
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(config.settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _load_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+class Keyset:
+    """
+    Order of rows by `column` (or only by `id_column`) and `id_column` as tiebreaker
+    """
+
+    def __init__(self, name: str, id_column, column=None, descending: bool = False):
+        self.name = f"{name}:{column.key if column is not None else 'id'}:{'desc' if descending else 'asc'}"
+        self.id_column = id_column
+        self.column = column
+        self.descending = descending
+
+    def order_by(self) -> list:
+        if self.descending:
+            columns = [self.id_column.desc()]
+            if self.column is not None:
+                columns.insert(0, self.column.desc().nulls_first())
+        else:
+            columns = [self.id_column.asc()]
+            if self.column is not None:
+                columns.insert(0, self.column.asc().nulls_last())
+        return columns
+
+    def after(self, value: Any, last_id: UUID):
+        """
+        Condition of rows which go after the row with key (value, last_id) and have the same
+        nullness of `column`. It is a range of index on (column, id), see `rest` for the others
+        """
+        if self.column is None:
+            return self.id_column < last_id if self.descending else self.id_column > last_id
+        if value is None:
+            id_after = self.id_column < last_id if self.descending else self.id_column > last_id
+            return and_(self.column.is_(None), id_after)
+        key = tuple_(self.column, self.id_column)
+        return key < (value, last_id) if self.descending else key > (value, last_id)
+
+    def rest(self, value: Any):
+        """
+        Condition of rows which go after all rows with the same nullness of `column` as `value`,
+        None when there are no such rows: NULLs go first in descending order, last in ascending
+        """
+        if self.column is None:
+            return None
+        if self.descending:
+            return self.column.isnot(None) if value is None else None
+        return self.column.is_(None) if value is not None else None
+
+    def apply(self, query: Select, limit: int, cursor: Optional[str] = None, offset: int = 0) -> Select:
+        """
+        Order query and take one row more than limit, so `page` knows whether there is a next page.
+        Cursor has priority over offset
+        """
+        query = query.order_by(*self.order_by())
+        if cursor:
+            query = query.filter(self.after(*self.decode(cursor)))
+        elif offset:
+            query = query.offset(offset)
+        return query.limit(limit + 1)
+
+    async def fetch(
+        self,
+        session: AsyncSession,
+        query: Select,
+        limit: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        scalars: bool = False,
+    ) -> List:
+        """
+        Rows of `apply` for `page`, topped up with rows of `rest` when those after the cursor run out
+        """
+        result = await session.execute(self.apply(query, limit, cursor=cursor, offset=offset))
+        rows = result.scalars().all() if scalars else result.all()
+        if not cursor or len(rows) > limit:
+            return rows
+        rest = self.rest(self.decode(cursor)[0])
+        if rest is None:
+            return rows
+        query = query.filter(rest).order_by(*self.order_by()).limit(limit + 1 - len(rows))
+        result = await session.execute(query)
+        return rows + (result.scalars().all() if scalars else result.all())
+
+    def page(self, rows: List, limit: int, key: Optional[Callable] = None) -> Tuple[List, Optional[str]]:
+        """
+        Rows of page and cursor of the next page, if there is one.
+        `key` returns (value, id) of a row, by default they are attributes named as the columns
+        """
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        if key is not None:
+            return rows, self.encode(*key(rows[-1]))
+        last = rows[-1]
+        value = getattr(last, self.column.key) if self.column is not None else None
+        return rows, self.encode(value, getattr(last, self.id_column.key))
+
+    def encode(self, value: Any, last_id: UUID) -> str:
+        payload = json.dumps([self.name, _dump_value(value), str(last_id)])
+        token = base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+        return f"{token}.{_sign(payload)}"
+
+    def decode(self, cursor: str) -> Tuple[Any, UUID]:
+        try:
+            token, signature = cursor.rsplit(".", 1)
+            payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        except (ValueError, binascii.Error, UnicodeDecodeError) as exc:
+            raise InvalidCursorError(cursor) from exc
+        if not hmac.compare_digest(signature, _sign(payload)):
+            raise InvalidCursorError(cursor)
+        try:
+            name, value, last_id = json.loads(payload)
+            if name != self.name:
+                raise InvalidCursorError(cursor)
+            if self.column is not None:
+                value = _load_value(self.column, value)
+            return value, UUID(last_id)
+        except (ValueError, TypeError) as exc:
+            raise InvalidCursorError(cursor) from exc
@@ -5,3 +5,23 @@ class Error(Exception):
 
 class VacancyNotFoundError(Error):
     """Raised when vacancy with provided it doesn't exist"""
+
+
+class InvalidCursorError(Error):
+    """Raised when page cursor is damaged, forged or made for another sorting"""
+
+
+class RegistryUnavailableError(Error):
+    """Raised when Registry service can't give a definite answer about project"""
+
+
+class CircuitOpenError(Error):
+    """Raised when remote service is not called because its circuit breaker is open"""
+
+
+class AuthorityError(Error):
+    """Raised when request didn't pass signature check, holds response for client"""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
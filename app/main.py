@@ -4,9 +4,16 @@ Main FastAPI app instance declaration
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
 from app.api.api import api_router
 from app.core import config
+from app.core.logging import logging_manager
+from app.errors import AuthorityError
+from app.utils.http_clients import http_clients
+from app.utils.notification_outbox import outbox_worker
+from app.utils.token_refresher import token_refresher
 
 app = FastAPI(
     title=config.settings.PROJECT_NAME,
@@ -29,6 +36,28 @@ if config.settings.BACKEND_CORS_ORIGINS:
 
 app.include_router(api_router)
 
+
+@app.exception_handler(AuthorityError)
+async def authority_error_handler(request: Request, exc: AuthorityError) -> JSONResponse:
+    return exc.response
+
+
+@app.on_event("startup")
+async def startup() -> None:
+    logging_manager.setup()
+    await http_clients.startup()
+    await token_refresher.start()
+    await outbox_worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    await outbox_worker.stop()
+    await token_refresher.stop()
+    await http_clients.shutdown()
+    logging_manager.shutdown()
+
+
 if __name__ == "__main__":
     if config.settings.ENVIRONMENT == "STAGE":
         uvicorn.run("app.main:app", host="api.elbrus.skroy.ru", port=8001, reload=True, access_log=False)
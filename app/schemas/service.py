@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+
+from app.utils.circuit_breaker import CircuitState
+
+
+class CacheStatus(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    negative_hits: int
+    stale_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    hit_ratio: float
+
+
+class CircuitBreakerStatus(BaseModel):
+    name: str
+    state: CircuitState
+    consecutive_failures: int
+    rejected_calls: int
+    retry_in: float
+
+
+class RegistryStatus(BaseModel):
+    circuit_breaker: CircuitBreakerStatus
+    token_cache: CacheStatus
+
+
+class DispatcherStatus(BaseModel):
+    rate: float
+    channel_rate: float
+    channels: int
+    sent: int
+    delayed: int
+    queue_depth: int
+    max_queue_depth: int
+    total_wait: float
+    max_wait: float
+    average_wait: float
+
+
+class NotificationsStatus(BaseModel):
+    payload_cache: CacheStatus
+    dispatcher: DispatcherStatus
+
+
+class MatchingStatus(BaseModel):
+    projects: int
+    vacancies: int
+    bytes: int
+
+
+class VacanciesStatus(BaseModel):
+    vacancy_cache: CacheStatus
+    response_cache: CacheStatus
+    page_cache: CacheStatus
+
+
+class ServiceStatus(BaseModel):
+    registry: RegistryStatus
+    notifications: NotificationsStatus
+    matching: MatchingStatus
+    vacancies: VacanciesStatus
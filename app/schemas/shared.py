@@ -14,3 +14,9 @@ class SkillDesirability(str, enum.Enum):
     REQUIRED = "REQUIRED"
     DESIRED = "DESIRED"
     EMPTY = "EMPTY"
+
+
+class DeliveryStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    DELIVERED = "DELIVERED"
+    FAILED = "FAILED"
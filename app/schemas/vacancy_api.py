@@ -1,7 +1,7 @@
 import enum
-from typing import List
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .user_response import UserResponse
 from .vacancy import Vacancy
@@ -25,6 +25,7 @@ class VacancyPage(BaseModel):
     items: List[Vacancy]
     page: int
     limit: int
+    next_cursor: Optional[str] = Field(description="Cursor of the next page, null on the last page")
 
 
 class ResponseSortingParam(str, enum.Enum):
@@ -36,9 +37,11 @@ class VacancyResponsePage(BaseModel):
     items: List[VacancyResponse]
     page: int
     limit: int
+    next_cursor: Optional[str] = Field(description="Cursor of the next page, null on the last page")
 
 
 class UserResponsePage(BaseModel):
     items: List[UserResponse]
     page: int
     limit: int
+    next_cursor: Optional[str] = Field(description="Cursor of the next page, null on the last page")
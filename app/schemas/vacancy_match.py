@@ -0,0 +1,75 @@
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field, validator
+
+from app.core import config
+
+from .shared import SkillLevel
+from .vacancy import Vacancy
+from app.utils.matching import LEVEL_RANKS
+
+
+class CandidateSkill(BaseModel):
+    skill_id: UUID
+    level: SkillLevel = SkillLevel.EMPTY
+
+
+class MatchProfile(BaseModel):
+    skills: List[CandidateSkill] = Field(..., min_items=1, description="Skills of candidate")
+
+    @validator("skills")
+    def skills_limit(cls, v):
+        if len(v) > config.settings.MATCH_MAX_SKILLS:
+            raise ValueError(f"no more than {config.settings.MATCH_MAX_SKILLS} skills in one profile")
+        # the highest level of a repeated skill counts
+        skills = {}
+        for skill in v:
+            known = skills.get(skill.skill_id)
+            if known is None or LEVEL_RANKS[skill.level] > LEVEL_RANKS[known.level]:
+                skills[skill.skill_id] = skill
+        return list(skills.values())
+
+
+class VacancyMatch(BaseModel):
+    vacancy: Vacancy
+    score: float = Field(description="Weighted coverage of vacancy skills by candidate, from 0 to 1")
+    matched_skills: int = Field(description="Number of vacancy skills candidate has")
+    missing_required: int = Field(description="Number of REQUIRED vacancy skills not fully covered by candidate")
+
+
+class VacancyMatchPage(BaseModel):
+    items: List[VacancyMatch]
+    page: int
+    limit: int
+    next_cursor: Optional[str] = Field(description="Cursor of the next page, null on the last page")
+
+
+class MatchCandidate(MatchProfile):
+    id: Optional[str] = Field(description="Candidate ID of client, returned with matches as is")
+
+
+class MatchBatch(BaseModel):
+    candidates: List[MatchCandidate] = Field(..., min_items=1)
+
+    @validator("candidates")
+    def candidates_limit(cls, v):
+        if len(v) > config.settings.MATCH_BATCH_MAX_CANDIDATES:
+            raise ValueError(f"no more than {config.settings.MATCH_BATCH_MAX_CANDIDATES} candidates in one batch")
+        return v
+
+
+class SkillMatchResult(BaseModel):
+    vacancy_id: UUID
+    score: float = Field(description="Weighted coverage of vacancy skills by candidate, from 0 to 1")
+    matched_skills: int
+    missing_required: int
+
+
+class CandidateMatches(BaseModel):
+    id: Optional[str]
+    matches: List[SkillMatchResult]
+
+
+class MatchBatchResult(BaseModel):
+    items: List[CandidateMatches]
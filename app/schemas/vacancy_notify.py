@@ -6,6 +6,9 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, HttpUrl, validator
 
+from app.core import config
+
+from .shared import DeliveryStatus
 from .vacancy import ContactType, Contact, Conditions, Requirements
 from .vacancy_skill import CreateVacancySkillNested, VacancySkillNested
 
@@ -191,3 +194,38 @@ class VacancyNotify(BaseVacancyNotify):
 
 class PostTelegramVacancy(BaseVacancyNotify):
     skills: List[CreateVacancySkillNested] = Field(default_factory=list)
+
+
+class NotificationDelivery(BaseModel):
+    id: UUID = Field(description="Delivery ID")
+    vacancy_id: UUID
+    status: DeliveryStatus
+    attempts: int = Field(description="Number of attempts to deliver to SiNoRa service")
+    status_code: Optional[int] = Field(description="Status code of the last answer of SiNoRa service")
+    last_error: Optional[str]
+    created_on: Optional[datetime]
+    delivered_on: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
+class NotifyBatch(BaseModel):
+    vacancy_ids: List[UUID] = Field(..., min_items=1)
+
+    @validator("vacancy_ids")
+    def vacancy_ids_limit(cls, v):
+        if len(v) > config.settings.NOTIFY_BATCH_MAX_VACANCIES:
+            raise ValueError(f"no more than {config.settings.NOTIFY_BATCH_MAX_VACANCIES} vacancies in one batch")
+        # each vacancy is posted once
+        return list(dict.fromkeys(v))
+
+
+class NotifyBatchItem(BaseModel):
+    vacancy_id: UUID
+    status: str = Field(description="queued or not_found")
+    delivery: Optional[NotificationDelivery]
+
+
+class NotifyBatchResult(BaseModel):
+    items: List[NotifyBatchItem]
@@ -4,6 +4,8 @@ from pydantic import BaseModel, validator
 
 from .shared import SkillDesirability, SkillLevel
 
+MAX_PRIORITY = 1000
+
 
 class BaseVacancySkill(BaseModel):
     skill_id: UUID
@@ -17,8 +19,8 @@ class BaseVacancySkill(BaseModel):
     def validate_smallint(cls, v, values, **kwargs):
         if v < 0:
             raise ValueError("priority must be a positive number")
-        if v > 1000:
-            raise ValueError("priority number is too large (max 1000)")
+        if v > MAX_PRIORITY:
+            raise ValueError(f"priority number is too large (max {MAX_PRIORITY})")
         return v
 
     class Config:
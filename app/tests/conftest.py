@@ -9,6 +9,7 @@ from app.core import config
 from app.db.models import Base
 from app.main import app
 from app.session import async_engine, async_session
+from app.utils.vacancy_cache import PAGE_CACHE
 from .fixtures import *  # noqa
 
 
@@ -46,6 +47,8 @@ async def test_db_setup():
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    # generations of pages start again in the new tables, pages of dropped vacancies must not be served
+    PAGE_CACHE.clear()
 
     return async_session
 
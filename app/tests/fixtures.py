@@ -1,6 +1,23 @@
 import pytest
 
 
+class FakeTimer:
+    """
+    Clock of caches, breakers and rate limiters which moves only when a test sets `now`
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
 @pytest.fixture()
 def empty_vacancy():
     return {
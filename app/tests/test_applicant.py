@@ -0,0 +1,37 @@
+import pytest
+
+from app.utils.applicant import applicant_identity, normalize_email, normalize_phone
+
+
+@pytest.mark.parametrize("phone, expected", [
+    ("87123456789", "+77123456789"),
+    ("79991112233", "+79991112233"),
+    ("+7 (999) 111-22-33", "+79991112233"),
+    ("9991112233", "+79991112233"),
+    ("+375291112233", "+375291112233"),
+    ("", None),
+    (None, None),
+])
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+
+def test_normalize_email():
+    assert normalize_email(" User@Example.COM ") == "user@example.com"
+    assert normalize_email("") is None
+
+
+def test_applicant_identity_takes_first_applicant():
+    identity = applicant_identity([
+        {"first_name": " Ivan ", "last_name": "Petrov", "middle_name": "", "email": "I@x.ru", "phone": "8 999 111 22 33"},
+        {"first_name": "Other"},
+    ])
+    assert identity == {
+        "first_name": "Ivan",
+        "last_name": "Petrov",
+        "middle_name": None,
+        "email": "i@x.ru",
+        "phone": "+79991112233",
+        "applicant_search": "Petrov Ivan i@x.ru +79991112233",
+    }
+    assert applicant_identity([]) == dict.fromkeys(identity)
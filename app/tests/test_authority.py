@@ -0,0 +1,40 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.api import deps
+from app.api.message_manager import MessageTexts
+from app.main import app
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def session_calls():
+    calls = []
+
+    async def get_session():
+        calls.append(True)
+        yield None
+
+    app.dependency_overrides[deps.get_session] = get_session
+    yield calls
+    app.dependency_overrides.pop(deps.get_session)
+
+
+async def test_unknown_project_is_rejected_before_session(client: AsyncClient, session_calls):
+    project_id = str(uuid.uuid4())
+    result = await client.get("/vacancies/?signature&show_all=1",
+                              params={"project_id": project_id, "service": "vacancies"})
+    assert result.status_code == 404
+    assert result.json()["detail"][0]["msg"] == MessageTexts.GP_PROJECT_ID_NOT_FOUND_OR_NOT_REGISTRY.format(
+        project_id)
+    assert session_calls == []
+
+
+async def test_expired_signature_is_rejected_before_session(client: AsyncClient, session_calls):
+    result = await client.delete(f"/vacancies/{uuid.uuid4()}?signature",
+                                 params={"project_id": str(uuid.uuid4()), "service": "vacancies", "time": "1"})
+    assert result.status_code == 419
+    assert session_calls == []
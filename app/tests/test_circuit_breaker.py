@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.errors import CircuitOpenError
+from app.utils.circuit_breaker import CircuitBreaker, CircuitState
+
+pytestmark = pytest.mark.asyncio
+
+
+async def succeed():
+    return "result"
+
+
+async def fail():
+    raise ValueError
+
+
+@pytest.fixture
+def breaker(timer):
+    return CircuitBreaker("Test", failure_threshold=2, reset_timeout=10, failure_exceptions=(ValueError,),
+                          timer=timer)
+
+
+async def test_circuit_opens_after_failures(breaker):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+    assert breaker.state == CircuitState.OPEN
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+    assert breaker.rejected_calls == 1
+
+
+async def test_success_resets_failures(breaker):
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    assert await breaker.call(succeed) == "result"
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_half_open_trial_closes_circuit(breaker, timer):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+    timer.now = 10
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert await breaker.call(succeed) == "result"
+    assert breaker.state == CircuitState.CLOSED
+
+
+async def test_half_open_trial_failure_opens_circuit(breaker, timer):
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            await breaker.call(fail)
+    timer.now = 10
+    with pytest.raises(ValueError):
+        await breaker.call(fail)
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.as_dict()["retry_in"] == 10
+
+
+async def test_service_status_requires_signature(client: AsyncClient):
+    result = await client.get("/service/status")
+    assert result.status_code == 422
+    result = await client.get("/service/status?signature",
+                              params={"project_id": str(uuid.uuid4()), "service": "vacancies", "time": "1"})
+    assert result.status_code == 419
+
+
+async def test_service_status(mock_signature_procedure, client: AsyncClient):
+    result = await client.get("/service/status?signature",
+                              params={"project_id": str(uuid.uuid4()), "service": "vacancies"})
+    assert result.status_code == 200
+    registry = result.json()["registry"]
+    assert registry["circuit_breaker"]["state"] == CircuitState.CLOSED
+    assert "hits" in registry["token_cache"]
+    dispatcher = result.json()["notifications"]["dispatcher"]
+    assert dispatcher["queue_depth"] == 0
@@ -4,7 +4,10 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.message_manager import MessageTexts, MessageTypes
+from app.db.dal import filter_user_responses
 from app.db.models import Vacancy, VacancyResponse
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
 
 # All test coroutines in file will be treated as marked (async allowed).
 pytestmark = pytest.mark.asyncio
@@ -205,3 +208,32 @@ async def test_get_user_response_404(mock_signature_procedure, client: AsyncClie
         "msg": MessageTexts.USER_RESPONSES_NOT_FOUND,
         "type": MessageTypes.NOT_FOUND
     }
+
+
+def test_applicant_filter_uses_normalized_columns():
+    query = filter_user_responses(select(VacancyResponse.id), None, email="User@Example.com", first_name="Ivan")
+    compiled = query.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "vacancy_response.email = " in sql
+    assert "lower(vacancy_response.first_name) = " in sql
+    assert set(compiled.params.values()) == {"user@example.com", "ivan"}
+
+
+async def test_get_user_response_normalized_identity(mock_signature_procedure, client: AsyncClient,
+                                                     session: AsyncSession, empty_vacancy: Dict,
+                                                     vacancy_response_full):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+
+    vacancy_response_full["vacancy_id"] = vacancy.id
+    session.add(VacancyResponse(**vacancy_response_full))
+    await session.commit()
+
+    for query in ["email=User@Example.COM", "phone=%2B7%20(712)%20345-67-89", "first_name=STRING"]:
+        response = await client.get(
+            f"/vacancies/responses/users/?signature&{query}",
+            params={"project_id": str(uuid.uuid4()), "service": "responses by user"}
+        )
+        assert response.status_code == 200, query
+        assert len(response.json()["items"]) == 1
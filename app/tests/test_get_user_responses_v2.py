@@ -2,8 +2,12 @@ import uuid
 from typing import Dict
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import asyncpg
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
 from app.api.message_manager import MessageTexts, MessageTypes
+from app.db.dal import search_applicants
 from app.db.models import Vacancy, VacancyResponse
 
 # All test coroutines in file will be treated as marked (async allowed).
@@ -207,3 +211,115 @@ async def test_get_user_response_404(mock_signature_procedure, client: AsyncClie
         "msg": MessageTexts.USER_RESPONSES_NOT_FOUND,
         "type": MessageTypes.NOT_FOUND
     }
+
+
+async def test_get_user_responses_cursor_pages(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                               empty_vacancy: Dict, vacancy_response_full):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+
+    vacancy_response_full["vacancy_id"] = vacancy.id
+    gp_user_id = vacancy_response_full["gp_user_id"]
+    for _ in range(5):
+        session.add(VacancyResponse(**{**vacancy_response_full, "id": uuid.uuid4()}))
+    await session.commit()
+
+    pages, cursor = [], None
+    while True:
+        params = {"project_id": str(uuid.uuid4()), "service": "responses by user", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"/vacancies/v2/responses/users/?signature&gp_user_id={gp_user_id}", params=params)
+        assert response.status_code == 200
+        pages.append(response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(items) for items in pages] == [2, 2, 1]
+    ids = [item["id"] for items in pages for item in items]
+    assert len(set(ids)) == 5
+
+
+async def test_get_user_responses_invalid_cursor(mock_signature_procedure, client: AsyncClient):
+    response = await client.get(
+        "/vacancies/v2/responses/users/?signature&gp_user_id=3fa85f64-5717-4562-b3fc-2c963f66afa6&cursor=forged",
+        params={"project_id": str(uuid.uuid4()), "service": "responses by user"}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0] == {
+        "msg": MessageTexts.INVALID_CURSOR,
+        "type": MessageTypes.INVALID_CURSOR
+    }
+
+
+@pytest.fixture
+async def pg_trgm(session: AsyncSession):
+    available = await session.scalar(text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'"))
+    if not available:
+        pytest.skip("pg_trgm extension is not available")
+    await session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await session.commit()
+
+
+@pytest.fixture
+async def applicants(session: AsyncSession, empty_vacancy: Dict, vacancy_response_full):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+    for first_name, last_name, email in [("Иван", "Иванов", "ivanov@mail.ru"),
+                                         ("Иван", "Иваненко", "ivanenko@mail.ru"),
+                                         ("Пётр", "Сидоров", "sidorov@mail.ru")]:
+        applicant = {**vacancy_response_full["data_response"][0],
+                     "first_name": first_name, "last_name": last_name, "email": email}
+        session.add(VacancyResponse(**{**vacancy_response_full, "id": uuid.uuid4(), "vacancy_id": vacancy.id,
+                                       "data_response": [applicant]}))
+    await session.commit()
+
+
+async def search_user_responses(client: AsyncClient, **params):
+    return await client.get(
+        "/vacancies/v2/responses/users/?signature",
+        params={"project_id": str(uuid.uuid4()), "service": "responses by user", **params},
+    )
+
+
+async def test_applicant_search_is_filled(session: AsyncSession, applicants):
+    result = await session.execute(select(VacancyResponse.applicant_search).order_by(VacancyResponse.applicant_search))
+    assert result.scalars().all()[0] == "Иваненко Иван string ivanenko@mail.ru +77123456789"
+
+
+def test_search_applicants_uses_trigram_operator():
+    query, keyset = search_applicants(select(VacancyResponse.id), "Ивонов")
+    sql = str(query.compile(dialect=asyncpg.dialect()))
+    assert "word_similarity(" in sql
+    assert " <%" in sql.split("WHERE")[1]
+    assert keyset.descending
+
+
+async def test_fuzzy_search_finds_misspelled_name(mock_signature_procedure, client: AsyncClient, pg_trgm,
+                                                  applicants):
+    response = await search_user_responses(client, search="Ивонов Иван")
+
+    assert response.status_code == 200
+    last_names = [item["data_response"][0]["last_name"] for item in response.json()["items"]]
+    assert last_names[:2] == ["Иванов", "Иваненко"]
+    assert "Сидоров" not in last_names
+
+
+async def test_fuzzy_search_threshold(mock_signature_procedure, client: AsyncClient, pg_trgm, applicants):
+    response = await search_user_responses(client, search="ivanov@mail.ru", threshold=1)
+
+    assert response.status_code == 200
+    assert [item["data_response"][0]["email"] for item in response.json()["items"]] == ["ivanov@mail.ru"]
+
+
+async def test_fuzzy_search_cursor_pages(mock_signature_procedure, client: AsyncClient, pg_trgm, applicants):
+    first = (await search_user_responses(client, search="mail.ru", limit=2)).json()
+    second = (await search_user_responses(client, search="mail.ru", limit=2, cursor=first["next_cursor"])).json()
+
+    assert len(first["items"]) == 2
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
@@ -7,8 +7,11 @@ from typing import Dict
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.message_manager import MessageTexts, MessageTypes
+from app.db.dal import DAL
 from app.db.models import Vacancy
+from app.schemas.vacancy_api import SortingOrder, SortingParam
 from app.session import async_session
+from app.tests.utils import captured_statements, explain
 
 pytestmark = pytest.mark.asyncio
 
@@ -189,3 +192,70 @@ class TestPaging:
             "msg": MessageTexts.VACANCIES_NOT_FOUND,
             "type": MessageTypes.NOT_FOUND,
         }
+
+    async def walk_pages(self, client: AsyncClient, query: str, limit: int):
+        items, cursor = [], None
+        while True:
+            params = {"project_id": str(uuid.uuid4()), "service": "vacancies", "limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            result = await client.get(f"/vacancies/?signature&{query}", params=params)
+            assert result.status_code == 200
+            page = result.json()
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items
+
+    @pytest.mark.parametrize("sort_by", ["none", "name", "profession", "created_on"])
+    @pytest.mark.parametrize("sort_order", ["asc", "desc"])
+    async def test_cursor_pages_match_single_page(self, client: AsyncClient, mock_signature_procedure,
+                                                  sort_by: str, sort_order: str):
+        query = f"sort_by={sort_by}&sort_order={sort_order}&company_id={self.company_id}"
+        items = await self.walk_pages(client, query, limit=4)
+        whole = await self.walk_pages(client, query, limit=50)
+        assert len(whole) == 33
+        assert [item["id"] for item in items] == [item["id"] for item in whole]
+
+    @pytest.mark.parametrize("sort_order", [SortingOrder.asc, SortingOrder.desc])
+    async def test_cursor_is_index_condition(self, session: AsyncSession, sort_order: SortingOrder):
+        dal = DAL(session)
+        first = await dal.get_vacancies_page(0, 4, None, self.company_id, None, None, SortingParam.created_on,
+                                             sort_order)
+        with captured_statements() as statements:
+            await dal.get_vacancies_page(0, 4, None, self.company_id, None, None, SortingParam.created_on,
+                                         sort_order, cursor=first.next_cursor)
+        plan = "\n".join(await explain(session, *statements[0]))
+        assert "ix_vacancy_company_id_created_on" in plan
+        index_cond = next(line for line in plan.splitlines() if "Index Cond" in line)
+        assert "ROW(created_on, id)" in index_cond
+
+    async def test_last_page_has_no_cursor(self, client: AsyncClient, mock_signature_procedure):
+        result = await client.get(
+            f"/vacancies/?signature&limit=4&team_id={self.team_id}",
+            params={"project_id": str(uuid.uuid4()), "service": "vacancies"}
+        )
+        assert result.status_code == 200
+        assert result.json()["next_cursor"] is None
+
+    async def test_invalid_cursor_returns_400(self, client: AsyncClient, mock_signature_procedure):
+        result = await client.get(
+            f"/vacancies/?signature&limit=4&sort_by=name&company_id={self.company_id}",
+            params={"project_id": str(uuid.uuid4()), "service": "vacancies"}
+        )
+        cursor = result.json()["next_cursor"]
+        token, signature = cursor.rsplit(".", 1)
+        for invalid_cursor in ["garbage", f"{token}.{'0' * len(signature)}"]:
+            result = await client.get(
+                f"/vacancies/?signature&limit=4&sort_by=name&company_id={self.company_id}",
+                params={"project_id": str(uuid.uuid4()), "service": "vacancies", "cursor": invalid_cursor}
+            )
+            assert result.status_code == 400
+            assert result.json()["detail"][0]["type"] == MessageTypes.INVALID_CURSOR
+
+        # cursor of one sorting can't be used with another
+        result = await client.get(
+            f"/vacancies/?signature&limit=4&sort_by=name&sort_order=desc&company_id={self.company_id}",
+            params={"project_id": str(uuid.uuid4()), "service": "vacancies", "cursor": cursor}
+        )
+        assert result.status_code == 400
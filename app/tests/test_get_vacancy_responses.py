@@ -4,7 +4,10 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.dal import DAL
 from app.db.models import Vacancy, VacancyResponse
+from app.schemas.vacancy_api import ResponseSortingParam, SortingOrder
+from app.tests.utils import captured_statements, explain
 
 # All test coroutines in file will be treated as marked (async allowed).
 pytestmark = pytest.mark.asyncio
@@ -85,3 +88,76 @@ async def test_get_invalid_vacancy_response(mock_signature_procedure, client: As
                                 params={"project_id": str(uuid.uuid4()), "service": "responses by vacancy"})
 
     assert response.status_code == 422
+
+
+async def add_responses(session: AsyncSession, vacancy_response_full: Dict, count: int) -> None:
+    # two responses per transaction share created_on, so id has to break the tie
+    for index in range(count):
+        session.add(VacancyResponse(**{**vacancy_response_full, "id": uuid.uuid4()}))
+        if index % 2:
+            await session.commit()
+    await session.commit()
+
+
+async def walk_responses(client: AsyncClient, url: str, limit: int):
+    items, cursor = [], None
+    while True:
+        params = {"project_id": str(uuid.uuid4()), "service": "responses by vacancy", "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(url, params=params)
+        assert response.status_code == 200
+        data = response.json()
+        items.extend(data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+async def test_get_vacancy_responses_cursor_pages(mock_signature_procedure, client: AsyncClient,
+                                                  session: AsyncSession, empty_vacancy: Dict,
+                                                  vacancy_response_full, sort_order: str):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+    vacancy_response_full["vacancy_id"] = vacancy.id
+    await add_responses(session, vacancy_response_full, 7)
+
+    url = f"/vacancies/{vacancy.id}/responses/?signature&vacancy_id={vacancy.id}&sort_order={sort_order}"
+    items = await walk_responses(client, url, limit=2)
+    whole = await walk_responses(client, url, limit=50)
+
+    assert len(whole) == 7
+    assert [item["id"] for item in items] == [item["id"] for item in whole]
+    created_on = [item["created_on"] for item in whole]
+    assert created_on == sorted(created_on, reverse=sort_order == "desc")
+
+
+@pytest.mark.parametrize("sort_order", [SortingOrder.asc, SortingOrder.desc])
+async def test_vacancy_responses_cursor_is_index_condition(session: AsyncSession, empty_vacancy: Dict,
+                                                           vacancy_response_full, sort_order: SortingOrder):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+    vacancy_response_full["vacancy_id"] = vacancy.id
+    await add_responses(session, vacancy_response_full, 5)
+
+    dal = DAL(session)
+    first = await dal.get_vacancy_responses_page(0, 2, vacancy.id, ResponseSortingParam.created_on, sort_order)
+    with captured_statements() as statements:
+        await dal.get_vacancy_responses_page(0, 2, vacancy.id, ResponseSortingParam.created_on, sort_order,
+                                             cursor=first.next_cursor)
+    plan = "\n".join(await explain(session, *statements[0]))
+    assert "ix_vacancy_response_vacancy_id_created_on" in plan
+    index_cond = next(line for line in plan.splitlines() if "Index Cond" in line)
+    assert "ROW(created_on, id)" in index_cond
+
+
+async def test_get_vacancy_responses_invalid_cursor(mock_signature_procedure, client: AsyncClient):
+    response = await client.get(
+        f"/vacancies/{uuid.uuid4()}/responses/?signature&cursor=forged",
+        params={"project_id": str(uuid.uuid4()), "service": "responses by vacancy"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["type"] == "invalid_cursor"
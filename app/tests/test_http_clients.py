@@ -0,0 +1,29 @@
+import httpx
+import pytest
+
+from app.core import config
+from app.utils.http_clients import REGISTRY, SINORA, HTTPClientManager
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_client_is_shared_between_calls():
+    manager = HTTPClientManager()
+    await manager.startup()
+    client = manager.get(REGISTRY)
+    assert manager.get(REGISTRY) is client
+    assert manager.get(SINORA) is not client
+    assert client.timeout.connect == config.settings.REGISTRY_CONNECT_TIMEOUT
+    assert client.timeout.read == config.settings.REGISTRY_READ_TIMEOUT
+    await manager.shutdown()
+    assert client.is_closed
+
+
+async def test_client_is_reopened_after_shutdown():
+    manager = HTTPClientManager()
+    client = manager.get(SINORA)
+    await manager.shutdown()
+    reopened = manager.get(SINORA)
+    assert isinstance(reopened, httpx.AsyncClient)
+    assert reopened is not client
+    await manager.shutdown()
@@ -0,0 +1,75 @@
+import io
+import json
+import logging
+from unittest.mock import AsyncMock, patch
+from uuid import UUID
+
+import pytest
+
+from app.core import config
+from app.core.logging import JSONFormatter, LoggingManager, SamplingFilter
+from app.utils import singer
+
+GP_PROJECT_ID = UUID("3fa85f64-5717-4562-b3fc-2c963f66afa6")
+
+
+def make_record(level: int, msg: str = "message", **extra) -> logging.LogRecord:
+    return logging.makeLogRecord({"name": "app.test", "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": msg, **extra})
+
+
+def test_sampling_filter_keeps_warnings_and_samples_the_rest():
+    sampling_filter = SamplingFilter(0.25, random_=iter([0.1, 0.5]).__next__)
+    assert sampling_filter.filter(make_record(logging.WARNING))
+    assert sampling_filter.filter(make_record(logging.INFO))
+    assert not sampling_filter.filter(make_record(logging.DEBUG))
+
+
+def test_json_formatter_writes_extra_fields():
+    line = JSONFormatter().format(make_record(logging.INFO, "Vacancy created", vacancy_id="42"))
+    document = json.loads(line)
+    assert document["level"] == "INFO"
+    assert document["message"] == "Vacancy created"
+    assert document["vacancy_id"] == "42"
+
+
+def test_logging_manager_writes_records_through_queue():
+    stream = io.StringIO()
+    manager = LoggingManager()
+    with patch("app.core.logging.sys.stderr", stream), \
+            patch.object(config.settings, "LOG_LEVEL", "INFO"), \
+            patch.object(config.settings, "LOG_SAMPLE_RATE", 1.0):
+        manager.setup()
+        logger = logging.getLogger("app.test")
+        logger.debug("not written")
+        logger.info("written %s", "once", extra={"gp_project_id": str(GP_PROJECT_ID)})
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        manager.shutdown()
+
+    documents = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [document["message"] for document in documents] == ["written once", "failed"]
+    assert documents[0]["gp_project_id"] == str(GP_PROJECT_ID)
+    assert "ValueError: boom" in documents[1]["exc_info"]
+
+
+def test_check_signs_does_not_log_when_debug_is_off():
+    with patch.object(singer.logger, "isEnabledFor", return_value=False), \
+            patch.object(singer.logger, "debug") as debug:
+        singer.check_signs("signature", GP_PROJECT_ID, "api_token", "vacancies")
+    debug.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_debug_invalid_signature_is_signed_once():
+    with patch.object(config.settings, "SINGER_DEBUG", True), \
+            patch.object(singer, "check_gp_project_id", AsyncMock(return_value="api_token")), \
+            patch.object(singer, "create_sign", wraps=singer.create_sign) as create_sign:
+        response = await singer.check_authority(GP_PROJECT_ID, "0" * 64, data_fields="vacancies")
+
+    assert response.status_code == 401
+    # one signature checked, one suggested to client
+    assert create_sign.call_count == 2
+    assert json.loads(response.body)["message_saggest"] == singer.sign_message(GP_PROJECT_ID, "vacancies")
@@ -0,0 +1,130 @@
+import uuid
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.db.models import Vacancy, VacancySkill
+from app.schemas.shared import SkillDesirability, SkillLevel
+from app.schemas.vacancy_match import MatchProfile
+from app.utils import matching
+
+PYTHON, SQL, DOCKER = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+PROFESSION_ID = uuid.uuid4()
+
+
+@pytest.fixture(autouse=True, scope="function")
+def _teardown(clean_db_on_setup):
+    yield
+
+
+def skill(skill_id, desirability: str, level: str, priority: int = 1) -> VacancySkill:
+    return VacancySkill(skill_id=skill_id, is_competence=True, skill_description=str(skill_id),
+                        desirability=desirability, level=level, priority=priority)
+
+
+@pytest.fixture
+async def vacancies(session: AsyncSession, empty_vacancy: Dict):
+    documents = {
+        "backend": [skill(PYTHON, "REQUIRED", "SENIOR"), skill(SQL, "DESIRED", "MIDDLE")],
+        "data": [skill(SQL, "REQUIRED", "SENIOR"), skill(PYTHON, "DESIRED", "JUNIOR")],
+        "devops": [skill(DOCKER, "REQUIRED", "MIDDLE")],
+    }
+    for name, skills in documents.items():
+        session.add(Vacancy(**{
+            **empty_vacancy, "name": name, "profession_id": PROFESSION_ID, "is_active": True, "skills": skills,
+        }))
+    await session.commit()
+
+
+async def match(client: AsyncClient, skills, **params):
+    return await client.post(
+        "/vacancies/match/?signature",
+        params={"project_id": str(uuid.uuid4()), "service": "vacancies", **params},
+        json={"skills": [{"skill_id": str(skill_id), "level": level} for skill_id, level in skills]},
+    )
+
+
+def test_coverage_of_lower_level():
+    assert matching.coverage(SkillLevel.SENIOR, SkillLevel.MIDDLE) == 1
+    assert matching.coverage(SkillLevel.JUNIOR, SkillLevel.SENIOR) == 3 / 5
+    assert matching.coverage(None, SkillLevel.EMPTY) == 0
+
+
+def test_priority_raises_weight(monkeypatch):
+    monkeypatch.setattr(config.settings, "MATCH_PRIORITY_WEIGHT", 1.0)
+    desired = matching.desirability_weight(SkillDesirability.DESIRED, 0)
+    assert matching.desirability_weight(SkillDesirability.DESIRED, None) == desired
+    assert matching.desirability_weight(SkillDesirability.DESIRED, 500) == pytest.approx(1.5 * desired)
+    assert matching.desirability_weight(SkillDesirability.REQUIRED, 1000) == pytest.approx(
+        2 * matching.desirability_weight(SkillDesirability.REQUIRED, 0))
+
+
+def test_profile_keeps_highest_level_of_repeated_skill():
+    profile = MatchProfile(skills=[{"skill_id": str(PYTHON), "level": "JUNIOR"},
+                                   {"skill_id": str(PYTHON), "level": "SENIOR"}])
+    assert [(skill.skill_id, skill.level) for skill in profile.skills] == [(PYTHON, SkillLevel.SENIOR)]
+
+
+@pytest.mark.asyncio
+async def test_match_ranks_by_weighted_coverage(mock_signature_procedure, client: AsyncClient, vacancies):
+    response = await match(client, [(PYTHON, "SENIOR"), (SQL, "JUNIOR")])
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    # devops has none of the skills
+    assert [item["vacancy"]["name"] for item in items] == ["backend", "data"]
+    backend = matching.score([
+        (SkillDesirability.REQUIRED, 1, SkillLevel.SENIOR, SkillLevel.SENIOR),
+        (SkillDesirability.DESIRED, 1, SkillLevel.MIDDLE, SkillLevel.JUNIOR),
+    ])
+    assert items[0]["score"] == pytest.approx(backend)
+    assert items[0]["matched_skills"] == 2
+    assert items[0]["missing_required"] == 0
+    assert items[1]["missing_required"] == 1
+
+
+@pytest.mark.asyncio
+async def test_match_cursor_pages(mock_signature_procedure, client: AsyncClient, vacancies):
+    skills = [(PYTHON, "EXPERT"), (SQL, "EXPERT"), (DOCKER, "EXPERT")]
+    first = (await match(client, skills, limit=2, profession_id=str(PROFESSION_ID))).json()
+    second = (await match(client, skills, limit=2, cursor=first["next_cursor"])).json()
+
+    assert [item["score"] for item in first["items"]] == [1, 1]
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_match_nothing_found(mock_signature_procedure, client: AsyncClient, vacancies):
+    response = await match(client, [(uuid.uuid4(), "EXPERT")])
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_match_weighs_skills_by_priority(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                               empty_vacancy: Dict):
+    skills = [skill(PYTHON, "DESIRED", "MIDDLE", priority=1000), skill(SQL, "DESIRED", "MIDDLE", priority=0)]
+    session.add(Vacancy(**{**empty_vacancy, "is_active": True, "skills": skills}))
+    await session.commit()
+
+    response = await match(client, [(PYTHON, "MIDDLE")])
+    expected = matching.score([
+        (SkillDesirability.DESIRED, 1000, SkillLevel.MIDDLE, SkillLevel.MIDDLE),
+        (SkillDesirability.DESIRED, 0, SkillLevel.MIDDLE, None),
+    ])
+    assert expected > 0.5
+    assert response.json()["items"][0]["score"] == pytest.approx(expected)
+
+
+@pytest.mark.asyncio
+async def test_match_skips_inactive_vacancies(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                              empty_vacancy: Dict):
+    session.add(Vacancy(**{**empty_vacancy, "skills": [skill(PYTHON, "REQUIRED", "MIDDLE")]}))
+    await session.commit()
+
+    response = await match(client, [(PYTHON, "EXPERT")])
+    assert response.status_code == 404
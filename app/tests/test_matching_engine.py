@@ -0,0 +1,122 @@
+import random
+import uuid
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Vacancy, VacancySkill
+from app.schemas.shared import SkillDesirability, SkillLevel
+from app.schemas.vacancy_match import CandidateSkill
+from app.utils import matching
+from app.utils.matching_engine import MatchingEngine, pack, score
+
+GP_PROJECT_ID = uuid.uuid4()
+PYTHON, SQL = uuid.uuid4(), uuid.uuid4()
+
+
+def test_score_matches_reference_formula():
+    rand = random.Random(7)
+    skill_ids = [uuid.uuid4() for _ in range(8)]
+    vacancies = {
+        uuid.uuid4(): [(skill_id, rand.choice(list(SkillDesirability)), rand.randint(0, 1000),
+                        rand.choice(list(SkillLevel)))
+                       for skill_id in rand.sample(skill_ids, 3)]
+        for _ in range(12)
+    }
+    matrix = pack("v1", [
+        (vacancy_id, skill_id, desirability, priority, level)
+        for vacancy_id, skills in vacancies.items() for skill_id, desirability, priority, level in skills
+    ])
+    profiles = [
+        [CandidateSkill(skill_id=skill_id, level=rand.choice(list(SkillLevel))) for skill_id in rand.sample(skill_ids, 4)]
+        for _ in range(5)
+    ]
+
+    for profile, matches in zip(profiles, score(matrix, profiles, top=12)):
+        levels = {skill.skill_id: skill.level for skill in profile}
+        expected = {
+            vacancy_id: matching.score([(desirability, priority, level, levels.get(skill_id))
+                                        for skill_id, desirability, priority, level in skills])
+            for vacancy_id, skills in vacancies.items()
+            if any(skill_id in levels for skill_id, *_ in skills)
+        }
+        assert {match.vacancy_id for match in matches} == set(expected)
+        for match in matches:
+            assert match.score == pytest.approx(expected[match.vacancy_id], abs=1e-6)
+        assert [match.score for match in matches] == sorted((match.score for match in matches), reverse=True)
+
+
+def test_matrix_grows_with_vacancy_skills():
+    rand = random.Random(7)
+    skill_ids = [uuid.uuid4() for _ in range(500)]
+    vacancy_skills = [
+        (vacancy_id, skill_id, SkillDesirability.REQUIRED, 1, SkillLevel.MIDDLE)
+        for vacancy_id in [uuid.uuid4() for _ in range(200)] for skill_id in rand.sample(skill_ids, 10)
+    ]
+    matrix = pack("v1", vacancy_skills)
+    # at most 3 cells per level of every vacancy skill, dense matrix would take 500 * 6 * 3 * 200 cells
+    assert matrix.packed.nnz <= len(vacancy_skills) * len(matching.LEVEL_RANKS) * 3
+    assert matrix.nbytes < len(vacancy_skills) * len(matching.LEVEL_RANKS) * 3 * 8 + matrix.packed.shape[0] * 8 + 1000
+
+
+def test_score_of_empty_project():
+    assert score(pack("v1", []), [[CandidateSkill(skill_id=PYTHON)]], top=5) == [[]]
+
+
+@pytest.fixture
+async def vacancies(clean_db_on_setup, session: AsyncSession, empty_vacancy: Dict):
+    skills = {
+        "backend": [(PYTHON, "REQUIRED", "SENIOR"), (SQL, "DESIRED", "JUNIOR")],
+        "analyst": [(SQL, "REQUIRED", "MIDDLE")],
+    }
+    for name, vacancy_skills in skills.items():
+        session.add(Vacancy(**{
+            **empty_vacancy, "name": name, "gp_project_id": GP_PROJECT_ID, "is_active": True,
+            "skills": [VacancySkill(skill_id=skill_id, is_competence=True, skill_description=name,
+                                    desirability=desirability, level=level, priority=1)
+                       for skill_id, desirability, level in vacancy_skills],
+        }))
+    await session.commit()
+
+
+async def match_batch(client: AsyncClient, candidates):
+    return await client.post(
+        "/vacancies/match/batch?signature",
+        params={"project_id": str(uuid.uuid4()), "service": "vacancies", "gp_project_id": str(GP_PROJECT_ID)},
+        json={"candidates": candidates},
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_match(mock_signature_procedure, client: AsyncClient, session: AsyncSession, vacancies):
+    candidates = [
+        {"id": "sql", "skills": [{"skill_id": str(SQL), "level": "MIDDLE"}]},
+        {"id": "nobody", "skills": [{"skill_id": str(uuid.uuid4()), "level": "EXPERT"}]},
+    ]
+    response = await match_batch(client, candidates)
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == ["sql", "nobody"]
+    assert [match["score"] for match in items[0]["matches"]] == [pytest.approx(1), pytest.approx(0.5 / 1.5)]
+    assert items[0]["matches"][1]["missing_required"] == 1
+    assert items[1]["matches"] == []
+
+    # deactivated vacancy is dropped from the matrix
+    analyst = items[0]["matches"][0]["vacancy_id"]
+    await session.execute(update(Vacancy).where(Vacancy.id == uuid.UUID(analyst)).values(is_active=False))
+    await session.commit()
+    response = await match_batch(client, candidates)
+    assert analyst not in [match["vacancy_id"] for match in response.json()["items"][0]["matches"]]
+
+
+@pytest.mark.asyncio
+async def test_engine_keeps_matrices_of_recent_projects(vacancies):
+    engine = MatchingEngine(max_size=1, ttl=60)
+    profiles = [[CandidateSkill(skill_id=SQL, level="MIDDLE")]]
+    assert len((await engine.match(GP_PROJECT_ID, profiles, top=5))[0]) == 2
+    assert await engine.match(uuid.uuid4(), profiles, top=5) == [[]]
+    assert engine.as_dict()["projects"] == 1
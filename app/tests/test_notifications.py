@@ -0,0 +1,292 @@
+import asyncio
+import json
+import uuid
+from typing import Dict
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import config
+from app.db.dal import DAL
+from app.db.models import NotificationOutbox, Vacancy
+from app.schemas.shared import DeliveryStatus
+from app.schemas.vacancy import CreateVacancy
+from app.schemas.vacancy_notify import PostTelegramVacancy
+from app.utils import notifications
+from app.utils.cache import TTLCache
+from app.utils.notification_outbox import OutboxWorker, digest_mode
+
+# All test coroutines in file will be treated as marked (async allowed).
+pytestmark = pytest.mark.asyncio
+
+AUTH_PARAMS = {"project_id": str(uuid.uuid4()), "service": "vacancies"}
+
+
+@pytest.fixture
+async def vacancy(session: AsyncSession, clean_db_on_setup) -> Vacancy:
+    vacancy = Vacancy(name="Example", positions=5, gp_project_id=str(uuid.uuid4()))
+    session.add(vacancy)
+    await session.commit()
+    return vacancy
+
+
+@pytest.fixture(autouse=True)
+def sinora_dispatcher():
+    dispatcher = notifications.SiNoRaDispatcher(rate=0, burst=1, channel_rate=0, channel_burst=1)
+    with patch.object(notifications, "SINORA_DISPATCHER", dispatcher):
+        yield dispatcher
+
+
+@pytest.fixture
+def sinora():
+    with patch("app.utils.notifications.send_to_sinora", AsyncMock(return_value={"status_code": 200})) as send:
+        yield send
+
+
+@pytest.fixture
+def payload_cache():
+    cache = TTLCache(max_size=10, ttl=60)
+    with patch.object(notifications, "PAYLOAD_CACHE", cache):
+        yield cache
+
+
+async def queue_notification(client: AsyncClient, vacancy_id, vacancy_post: Dict = None) -> Dict:
+    result = await client.post(f"/vacancies/notify/{vacancy_id}", json=vacancy_post, params=AUTH_PARAMS)
+    assert result.status_code == 202
+    return result.json()
+
+
+async def make_due(session: AsyncSession) -> None:
+    await session.execute(update(NotificationOutbox).values(next_attempt_on=NotificationOutbox.created_on))
+    await session.commit()
+
+
+async def test_notify_returns_delivery_id(mock_signature_procedure, client: AsyncClient, vacancy: Vacancy,
+                                          full_vacancy: Dict, sinora: AsyncMock):
+    delivery = await queue_notification(client, vacancy.id, full_vacancy)
+    assert delivery["vacancy_id"] == str(vacancy.id)
+    assert delivery["status"] == DeliveryStatus.PENDING
+    assert delivery["attempts"] == 0
+    sinora.assert_not_called()
+
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.status_code == 200
+    assert result.json()["status"] == DeliveryStatus.PENDING
+
+
+async def test_notify_unknown_vacancy(mock_signature_procedure, client: AsyncClient, clean_db_on_setup,
+                                      full_vacancy: Dict):
+    result = await client.post(f"/vacancies/notify/{uuid.uuid4()}", json=full_vacancy, params=AUTH_PARAMS)
+    assert result.status_code == 404
+
+
+async def test_unknown_delivery(mock_signature_procedure, client: AsyncClient, clean_db_on_setup):
+    result = await client.get(f"/vacancies/notify/deliveries/{uuid.uuid4()}", params=AUTH_PARAMS)
+    assert result.status_code == 404
+
+
+async def test_worker_delivers_notification(mock_signature_procedure, client: AsyncClient, vacancy: Vacancy,
+                                            full_vacancy: Dict, sinora: AsyncMock):
+    delivery = await queue_notification(client, vacancy.id, full_vacancy)
+
+    assert await OutboxWorker().deliver_due() == 1
+    body = sinora.call_args.args[0]
+    assert body["parameters"]["c_name"] == full_vacancy["name"]
+    assert body["message_recipients"] == [{"telegram_chat_id": config.settings.TELEGRAM_CHANNEL_ID_CLOVERI}]
+
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.json()["status"] == DeliveryStatus.DELIVERED
+    assert result.json()["attempts"] == 1
+    assert result.json()["delivered_on"]
+    # delivered notification is not sent again
+    assert await OutboxWorker().deliver_due() == 0
+
+
+async def test_worker_retries_unavailable_sinora(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                                 vacancy: Vacancy, full_vacancy: Dict, sinora: AsyncMock):
+    sinora.return_value = {"status_code": 503}
+    delivery = await queue_notification(client, vacancy.id, full_vacancy)
+
+    assert await OutboxWorker().deliver_due() == 1
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.json()["status"] == DeliveryStatus.PENDING
+    assert result.json()["status_code"] == 503
+    # next attempt is postponed
+    assert await OutboxWorker().deliver_due() == 0
+
+    sinora.return_value = {"status_code": 200}
+    await make_due(session)
+    assert await OutboxWorker().deliver_due() == 1
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.json()["status"] == DeliveryStatus.DELIVERED
+    assert result.json()["attempts"] == 2
+
+
+async def test_worker_fails_after_max_attempts(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                               vacancy: Vacancy, full_vacancy: Dict, sinora: AsyncMock):
+    sinora.return_value = {"status_code": 503}
+    delivery = await queue_notification(client, vacancy.id, full_vacancy)
+
+    with patch.object(config.settings, "NOTIFY_MAX_ATTEMPTS", 2):
+        for _ in range(2):
+            await make_due(session)
+            assert await OutboxWorker().deliver_due() == 1
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.json()["status"] == DeliveryStatus.FAILED
+    assert result.json()["attempts"] == 2
+
+
+async def test_worker_does_not_retry_rejected_notification(mock_signature_procedure, client: AsyncClient,
+                                                           vacancy: Vacancy, full_vacancy: Dict, sinora: AsyncMock):
+    sinora.return_value = {"status_code": 422, "detail": "invalid template"}
+    delivery = await queue_notification(client, vacancy.id, full_vacancy)
+
+    assert await OutboxWorker().deliver_due() == 1
+    result = await client.get(f"/vacancies/notify/deliveries/{delivery['id']}", params=AUTH_PARAMS)
+    assert result.json()["status"] == DeliveryStatus.FAILED
+    assert "invalid template" in result.json()["last_error"]
+
+
+async def test_notify_renders_stored_vacancy(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                             clean_db_on_setup, full_vacancy: Dict, payload_cache: TTLCache):
+    vacancy = Vacancy(**CreateVacancy(**full_vacancy).dict())
+    session.add(vacancy)
+    await session.commit()
+
+    delivery = await queue_notification(client, vacancy.id)
+    notification = await session.get(NotificationOutbox, uuid.UUID(delivery["id"]))
+    # same message as posted by client with the whole vacancy in body
+    expected = notifications.render_telegram_parameters(PostTelegramVacancy(**full_vacancy))
+    assert notification.payload == json.loads(json.dumps(expected))
+
+
+async def test_notify_payload_is_cached_until_vacancy_is_edited(mock_signature_procedure, client: AsyncClient,
+                                                                session: AsyncSession, vacancy: Vacancy,
+                                                                payload_cache: TTLCache):
+    await queue_notification(client, vacancy.id)
+    await queue_notification(client, vacancy.id)
+    assert payload_cache.stats.misses == 1
+    assert payload_cache.stats.hits == 1
+
+    await session.execute(
+        update(Vacancy).where(Vacancy.id == vacancy.id).values(updated_on=func.now() + func.make_interval(0, 0, 0, 1))
+    )
+    await session.commit()
+    await queue_notification(client, vacancy.id)
+    assert payload_cache.stats.misses == 2
+
+
+async def test_notify_without_body_unknown_vacancy(mock_signature_procedure, client: AsyncClient, clean_db_on_setup):
+    result = await client.post(f"/vacancies/notify/{uuid.uuid4()}", params=AUTH_PARAMS)
+    assert result.status_code == 404
+
+
+async def test_notify_batch(mock_signature_procedure, client: AsyncClient, session: AsyncSession, clean_db_on_setup,
+                            sinora: AsyncMock):
+    vacancies = [Vacancy(name=f"Vacancy {index}", gp_project_id=str(uuid.uuid4())) for index in range(3)]
+    session.add_all(vacancies)
+    await session.commit()
+    unknown_id = str(uuid.uuid4())
+    vacancy_ids = [str(vacancies[0].id), unknown_id, str(vacancies[1].id), str(vacancies[2].id), str(vacancies[0].id)]
+
+    result = await client.post("/vacancies/notify/batch", json={"vacancy_ids": vacancy_ids}, params=AUTH_PARAMS)
+    assert result.status_code == 202
+    items = result.json()["items"]
+    assert [item["vacancy_id"] for item in items] == vacancy_ids[:4]
+    assert [item["status"] for item in items] == ["queued", "not_found", "queued", "queued"]
+    assert items[1]["delivery"] is None
+    assert items[0]["delivery"]["status"] == DeliveryStatus.PENDING
+
+    assert await OutboxWorker().deliver_due() == 3
+    names = sorted(call.args[0]["parameters"]["c_name"] for call in sinora.call_args_list)
+    assert names == ["Vacancy 0", "Vacancy 1", "Vacancy 2"]
+
+
+async def test_notify_batch_limit(mock_signature_procedure, client: AsyncClient):
+    with patch.object(config.settings, "NOTIFY_BATCH_MAX_VACANCIES", 2):
+        result = await client.post(
+            "/vacancies/notify/batch",
+            json={"vacancy_ids": [str(uuid.uuid4()) for _ in range(3)]},
+            params=AUTH_PARAMS,
+        )
+    assert result.status_code == 422
+
+
+async def test_worker_limits_concurrent_sends(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                              clean_db_on_setup):
+    vacancies = [Vacancy(name=f"Vacancy {index}", gp_project_id=str(uuid.uuid4())) for index in range(5)]
+    session.add_all(vacancies)
+    await session.commit()
+    await client.post(
+        "/vacancies/notify/batch", json={"vacancy_ids": [str(vacancy.id) for vacancy in vacancies]}, params=AUTH_PARAMS
+    )
+
+    in_flight, max_in_flight = 0, 0
+
+    async def send(body):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"status_code": 200}
+
+    with patch("app.utils.notifications.send_to_sinora", send), \
+            patch.object(config.settings, "NOTIFY_CONCURRENCY", 2):
+        assert await OutboxWorker().deliver_due() == 5
+    assert max_in_flight == 2
+
+
+async def test_digest_sends_one_message_per_channel(mock_signature_procedure, session: AsyncSession,
+                                                    clean_db_on_setup, sinora: AsyncMock):
+    vacancies = [Vacancy(name=f"Vacancy {index}", gp_project_id=str(uuid.uuid4())) for index in range(3)]
+    session.add_all(vacancies)
+    await session.commit()
+    dal = DAL(session)
+    await dal.create_notifications(1, {vacancy.id: {"c_name": vacancy.name} for vacancy in vacancies[:2]})
+    await dal.create_notifications(2, {vacancies[2].id: {"c_name": vacancies[2].name}})
+
+    with patch.object(config.settings, "NOTIFY_DIGEST_EVENT_CODE_NAME", "digest"):
+        assert await OutboxWorker().deliver_digests() == 3
+    bodies = {call.args[0]["message_recipients"][0]["telegram_chat_id"]: call.args[0] for call in sinora.call_args_list}
+    assert len(sinora.call_args_list) == 2
+    assert bodies[1]["event_code"] == "digest"
+    assert bodies[1]["parameters"]["c_count"] == 2
+    assert sorted(item["c_name"] for item in bodies[1]["parameters"]["c_vacancies"]) == ["Vacancy 0", "Vacancy 1"]
+    assert bodies[2]["parameters"]["c_vacancies"] == [{"c_name": "Vacancy 2"}]
+
+    statuses = (await session.execute(select(NotificationOutbox.status))).scalars().all()
+    assert statuses == [DeliveryStatus.DELIVERED] * 3
+
+
+async def test_failed_digest_is_retried(mock_signature_procedure, session: AsyncSession, vacancy: Vacancy,
+                                        sinora: AsyncMock):
+    sinora.return_value = {"status_code": 503}
+    await DAL(session).create_notifications(1, {vacancy.id: {"c_name": vacancy.name}})
+
+    with patch.object(config.settings, "NOTIFY_DIGEST_EVENT_CODE_NAME", "digest"):
+        assert await OutboxWorker().deliver_digests() == 1
+    notification = (await session.execute(select(NotificationOutbox))).scalar()
+    assert notification.status == DeliveryStatus.PENDING
+    assert notification.attempts == 1
+
+
+async def test_digest_without_event_code_is_not_sent(mock_signature_procedure, session: AsyncSession,
+                                                     clean_db_on_setup, sinora: AsyncMock):
+    vacancies = [Vacancy(name=f"Vacancy {index}", gp_project_id=str(uuid.uuid4())) for index in range(2)]
+    session.add_all(vacancies)
+    await session.commit()
+    await DAL(session).create_notifications(1, {vacancy.id: {"c_name": vacancy.name} for vacancy in vacancies})
+
+    with patch.object(config.settings, "NOTIFY_DIGEST_WINDOW", 60), \
+            patch.object(config.settings, "NOTIFY_DIGEST_EVENT_CODE_NAME", ""):
+        assert not digest_mode()
+        assert await OutboxWorker().deliver_digests() == 2
+    bodies = [call.args[0] for call in sinora.call_args_list]
+    assert len(bodies) == 2
+    assert all(body["event_code"] == config.settings.EVENT_CODE_NAME for body in bodies)
+    assert sorted(body["parameters"]["c_name"] for body in bodies) == ["Vacancy 0", "Vacancy 1"]
+    assert all("c_vacancies" not in body["parameters"] for body in bodies)
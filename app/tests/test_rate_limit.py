@@ -0,0 +1,121 @@
+import asyncio
+import heapq
+from itertools import count
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.tests.fixtures import FakeTimer
+from app.utils.notifications import SiNoRaDispatcher
+from app.utils.rate_limit import TokenBucket
+
+
+class FakeClock(FakeTimer):
+    """
+    Timer whose sleeps end in order of their deadline, time jumps to the deadline of each one
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sleepers = []
+        self._order = count()
+        self._real_sleep = asyncio.sleep
+
+    async def sleep(self, delay: float) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + delay, next(self._order), future))
+        await future
+
+    async def run(self, coroutines) -> None:
+        tasks = [asyncio.create_task(coroutine) for coroutine in coroutines]
+        while True:
+            # let woken tasks run until they sleep again or finish
+            for _ in range(10):
+                await self._real_sleep(0)
+            if not self._sleepers:
+                break
+            deadline, _, future = heapq.heappop(self._sleepers)
+            self.now = max(self.now, deadline)
+            future.set_result(None)
+        await asyncio.gather(*tasks)
+
+
+@pytest.fixture
+def sinora():
+    with patch("app.utils.notifications.send_to_sinora", AsyncMock(return_value={"status_code": 200})) as send:
+        yield send
+
+
+@pytest.fixture
+def sleep():
+    with patch("app.utils.notifications.asyncio.sleep", AsyncMock()) as sleep:
+        yield sleep
+
+
+def test_bucket_allows_burst_then_rate(timer):
+    bucket = TokenBucket(rate=2, capacity=3, timer=timer)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # callers without token are served one by one at bucket rate
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_bucket_refills_up_to_capacity(timer):
+    bucket = TokenBucket(rate=1, capacity=2, timer=timer)
+    bucket.reserve()
+    bucket.reserve()
+    timer.now = 100
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+
+
+def test_unlimited_bucket(timer):
+    bucket = TokenBucket(rate=0, capacity=1, timer=timer)
+    assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_limits_each_channel(timer, sinora, sleep):
+    dispatcher = SiNoRaDispatcher(rate=100, burst=100, channel_rate=1, channel_burst=1, timer=timer)
+    await dispatcher.send(1, {"to": 1})
+    await dispatcher.send(2, {"to": 2})
+    sleep.assert_not_called()
+
+    await dispatcher.send(1, {"to": 1})
+    sleep.assert_awaited_once_with(1.0)
+    assert sinora.await_count == 3
+    stats = dispatcher.as_dict()
+    assert stats["sent"] == 3
+    assert stats["delayed"] == 1
+    assert stats["max_wait"] == 1.0
+    assert stats["channels"] == 2
+    assert stats["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_limits_all_channels(timer, sinora, sleep):
+    dispatcher = SiNoRaDispatcher(rate=1, burst=1, channel_rate=0, channel_burst=1, timer=timer)
+    await dispatcher.send(1, {})
+    await dispatcher.send(2, {})
+    sleep.assert_awaited_once_with(1.0)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_keeps_global_rate_with_busy_channel():
+    clock = FakeClock()
+    sent_at = []
+    send = AsyncMock(side_effect=lambda body: sent_at.append(clock.now) or {"status_code": 200})
+    dispatcher = SiNoRaDispatcher(rate=5, burst=5, channel_rate=1, channel_burst=1, timer=clock)
+    # one channel is busy with a long queue, posts to many other channels come at the same time
+    channels = [1] * 30 + list(range(2, 32))
+
+    with patch("app.utils.notifications.send_to_sinora", send), \
+            patch("app.utils.notifications.asyncio.sleep", clock.sleep):
+        await clock.run(dispatcher.send(channel, {}) for channel in channels)
+
+    assert len(sent_at) == len(channels)
+    per_second = {}
+    for moment in sent_at:
+        second = int(moment + 1e-9)
+        per_second[second] = per_second.get(second, 0) + 1
+    # burst is spent in the first second, after that no more than rate
+    assert per_second.pop(0) <= 5 + 5
+    assert max(per_second.values()) <= 5
@@ -0,0 +1,92 @@
+import uuid
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.message_manager import MessageTexts, MessageTypes
+from app.db.models import Vacancy
+
+# All test coroutines in file will be treated as marked (async allowed).
+pytestmark = pytest.mark.asyncio
+
+GP_PROJECT_ID = str(uuid.uuid4())
+
+
+@pytest.fixture(autouse=True, scope="function")
+def _teardown(clean_db_on_setup):
+    yield
+
+
+@pytest.fixture
+async def vacancies(session: AsyncSession, empty_vacancy: Dict):
+    documents = [
+        {"name": "Программист Python", "short_description": "Разработка сервисов"},
+        {"name": "Бухгалтер", "full_description": "Иногда помогает программистам с отчётами"},
+        {"name": "Аналитик", "responsibilities": "Программирование отчётов на Python"},
+        {"name": "Водитель", "short_description": "Перевозка грузов"},
+    ]
+    for document in documents:
+        session.add(Vacancy(**{**empty_vacancy, "gp_project_id": GP_PROJECT_ID, **document}))
+    await session.commit()
+
+
+async def search(client: AsyncClient, **params):
+    return await client.get(
+        "/vacancies/search/?signature",
+        params={"project_id": str(uuid.uuid4()), "service": "vacancies", **params},
+    )
+
+
+async def test_search_ranks_name_above_descriptions(mock_signature_procedure, client: AsyncClient, vacancies):
+    response = await search(client, q="программисты", gp_project_id=GP_PROJECT_ID)
+
+    assert response.status_code == 200
+    # russian stemming finds "программист" and "программистам", name weighs more than full description
+    assert [item["name"] for item in response.json()["items"]] == ["Программист Python", "Бухгалтер"]
+
+
+async def test_search_web_syntax(mock_signature_procedure, client: AsyncClient, vacancies):
+    response = await search(client, q="python -программист")
+
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == ["Аналитик"]
+
+
+async def test_search_cursor_pages(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                   empty_vacancy: Dict):
+    for i in range(7):
+        session.add(Vacancy(**{**empty_vacancy, "name": f"Курьер {i}", "short_description": "курьер " * (i % 3)}))
+    await session.commit()
+
+    whole = (await search(client, q="курьер")).json()["items"]
+    items, cursor = [], None
+    while True:
+        params = {"q": "курьер", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await search(client, **params)).json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(whole) == 7
+    assert [item["id"] for item in items] == [item["id"] for item in whole]
+
+
+async def test_search_nothing_found(mock_signature_procedure, client: AsyncClient, vacancies):
+    response = await search(client, q="космонавт")
+
+    assert response.status_code == 404
+    assert response.json()["detail"][0] == {
+        "msg": MessageTexts.VACANCIES_NOT_FOUND,
+        "type": MessageTypes.NOT_FOUND,
+    }
+
+
+async def test_search_requires_query(mock_signature_procedure, client: AsyncClient):
+    response = await search(client)
+
+    assert response.status_code == 422
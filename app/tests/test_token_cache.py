@@ -0,0 +1,224 @@
+import asyncio
+from unittest.mock import patch
+from uuid import UUID
+
+import pytest
+
+from app.core import config
+from app.errors import RegistryUnavailableError
+from app.utils import singer
+from app.utils.cache import TTLCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitState
+
+GP_PROJECT_ID = UUID("3fa85f64-5717-4562-b3fc-2c963f66afa6")
+
+
+@pytest.fixture
+def registry_url():
+    with patch.object(config.settings, "URL_REGISTRY_SERVICE", "http://registry/"):
+        yield
+
+
+@pytest.fixture
+def token_cache():
+    cache = TTLCache(max_size=10, ttl=60, negative_ttl=5, stale_ttl=600)
+    with patch.object(singer, "TOKEN_CACHE", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def registry_breaker():
+    breaker = CircuitBreaker(
+        "Registry", failure_threshold=2, reset_timeout=30, failure_exceptions=(RegistryUnavailableError,)
+    )
+    with patch.object(singer, "REGISTRY_BREAKER", breaker):
+        yield breaker
+
+
+def test_entry_expires_after_ttl(timer):
+    cache = TTLCache(max_size=10, ttl=60, timer=timer)
+    cache.set("key", "value")
+    timer.now = 59
+    assert cache.get("key") == "value"
+    timer.now = 60
+    assert cache.get("key") is None
+    assert cache.stats.hits == 1
+    assert cache.stats.expirations == 1
+
+
+def test_least_recently_used_is_evicted(timer):
+    cache = TTLCache(max_size=2, ttl=60, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+def test_negative_entry(timer):
+    cache = TTLCache(max_size=10, ttl=60, negative_ttl=5, timer=timer)
+    cache.set_negative("key")
+    assert cache.get_entry("key").negative
+    assert cache.get("key", "default") == "default"
+    timer.now = 5
+    assert cache.get_entry("key") is None
+    assert cache.stats.negative_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_check_gp_project_id_caches_token(registry_url, token_cache):
+    with patch.object(singer, "fetch_api_token", return_value="API_TOKEN") as fetch:
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) == "API_TOKEN"
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) == "API_TOKEN"
+    assert fetch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_check_gp_project_id_caches_unknown_project(registry_url, token_cache):
+    with patch.object(singer, "fetch_api_token", return_value=None) as fetch:
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) is False
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) is False
+    assert fetch.call_count == 1
+    assert token_cache.stats.negative_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_check_gp_project_id_does_not_cache_unavailable_registry(registry_url, token_cache):
+    with patch.object(singer, "fetch_api_token", side_effect=RegistryUnavailableError) as fetch:
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) is False
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) is False
+    assert fetch.call_count == 2
+    assert len(token_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_one_registry_call(registry_url, token_cache):
+    async def slow_fetch(gp_project_id):
+        await asyncio.sleep(0.01)
+        return "API_TOKEN"
+
+    with patch.object(singer, "fetch_api_token", side_effect=slow_fetch) as fetch:
+        results = await asyncio.gather(*[singer.check_gp_project_id(GP_PROJECT_ID) for _ in range(20)])
+    assert results == ["API_TOKEN"] * 20
+    assert fetch.call_count == 1
+    assert len(singer.REGISTRY_LOOKUPS) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_registry_failure(registry_url, token_cache):
+    async def failing_fetch(gp_project_id):
+        await asyncio.sleep(0.01)
+        raise RegistryUnavailableError
+
+    with patch.object(singer, "fetch_api_token", side_effect=failing_fetch) as fetch:
+        results = await asyncio.gather(*[singer.check_gp_project_id(GP_PROJECT_ID) for _ in range(20)])
+    assert results == [False] * 20
+    assert fetch.call_count == 1
+
+
+def test_expiring_keys(timer):
+    cache = TTLCache(max_size=10, ttl=60, negative_ttl=5, timer=timer)
+    cache.set("soon", "value", ttl=10)
+    cache.set("later", "value", ttl=100)
+    cache.set_negative("unknown")
+    cache.set("expired", "value", ttl=-1)
+    assert cache.expiring_keys(30) == ["soon"]
+    timer.now = 20
+    assert cache.expiring_keys(30) == []
+
+
+@pytest.mark.asyncio
+async def test_load_api_tokens(registry_url, token_cache):
+    gp_project_ids = [GP_PROJECT_ID, UUID("3fa85f64-0000-0000-0000-2c963f66afa6")]
+
+    async def fetch(gp_project_id):
+        return "API_TOKEN" if gp_project_id == GP_PROJECT_ID else None
+
+    with patch.object(singer, "fetch_api_token", side_effect=fetch):
+        assert await singer.load_api_tokens(gp_project_ids) == 1
+    with patch.object(singer, "fetch_api_token") as fetch_mock:
+        assert await singer.check_gp_project_id(gp_project_ids[0]) == "API_TOKEN"
+        assert await singer.check_gp_project_id(gp_project_ids[1]) is False
+    fetch_mock.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_refresh_expiring_api_tokens(registry_url, token_cache):
+    token_cache.set(str(GP_PROJECT_ID), "OLD_TOKEN", ttl=1)
+    with patch.object(singer, "fetch_api_token", return_value="NEW_TOKEN"):
+        assert await singer.refresh_expiring_api_tokens() == 1
+    assert token_cache.get(str(GP_PROJECT_ID)) == "NEW_TOKEN"
+
+
+@pytest.mark.asyncio
+async def test_expired_api_tokens_are_not_refreshed(registry_url, token_cache):
+    # expired but still stale-servable entry, nobody asked for it since
+    token_cache.set(str(GP_PROJECT_ID), "OLD_TOKEN", ttl=-1)
+    with patch.object(singer, "fetch_api_token", return_value="NEW_TOKEN") as fetch:
+        assert await singer.refresh_expiring_api_tokens() == 0
+    fetch.assert_not_called()
+    assert token_cache.get_stale(str(GP_PROJECT_ID)) == "OLD_TOKEN"
+
+
+def test_stale_entry(timer):
+    cache = TTLCache(max_size=10, ttl=60, stale_ttl=30, timer=timer)
+    cache.set("key", "value")
+    timer.now = 70
+    assert cache.get("key") is None
+    assert cache.get_stale("key") == "value"
+    timer.now = 90
+    assert cache.get_stale("key") is None
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_is_not_called_while_circuit_is_open(registry_url, token_cache, registry_breaker):
+    with patch.object(singer, "fetch_api_token", side_effect=RegistryUnavailableError) as fetch:
+        for _ in range(5):
+            assert await singer.check_gp_project_id(GP_PROJECT_ID) is False
+    assert fetch.call_count == 2
+    assert registry_breaker.state == CircuitState.OPEN
+    assert registry_breaker.rejected_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_token_is_served_and_revalidated(registry_url, token_cache):
+    token_cache.set(str(GP_PROJECT_ID), "OLD_TOKEN", ttl=-1)
+    with patch.object(singer, "fetch_api_token", return_value="NEW_TOKEN") as fetch:
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) == "OLD_TOKEN"
+        await asyncio.sleep(0)
+        assert await singer.check_gp_project_id(GP_PROJECT_ID) == "NEW_TOKEN"
+    assert fetch.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_token_is_served_while_registry_is_unavailable(registry_url, token_cache):
+    token_cache.set(str(GP_PROJECT_ID), "OLD_TOKEN", ttl=-1)
+    with patch.object(singer, "fetch_api_token", side_effect=RegistryUnavailableError):
+        for _ in range(5):
+            assert await singer.check_gp_project_id(GP_PROJECT_ID) == "OLD_TOKEN"
+            await asyncio.sleep(0)
+
+
+@pytest.fixture
+def shared_store():
+    with patch.object(config.settings, "TOKEN_SHARED_STORE", True):
+        yield
+
+
+@pytest.mark.asyncio
+async def test_shared_store_is_used_by_other_worker(registry_url, shared_store):
+    with patch.object(singer, "TOKEN_CACHE", TTLCache(max_size=10, ttl=3600)):
+        with patch.object(singer, "fetch_api_token", return_value="API_TOKEN") as fetch:
+            assert await singer.check_gp_project_id(GP_PROJECT_ID) == "API_TOKEN"
+    # another worker process starts with empty token cache
+    with patch.object(singer, "TOKEN_CACHE", TTLCache(max_size=10, ttl=3600)) as other_cache:
+        with patch.object(singer, "fetch_api_token", return_value="API_TOKEN") as other_fetch:
+            assert await singer.check_gp_project_id(GP_PROJECT_ID) == "API_TOKEN"
+    assert fetch.call_count == 1
+    other_fetch.assert_not_called()
+    assert 3500 < other_cache._data[str(GP_PROJECT_ID)].expires_at - other_cache._timer() <= 3600
@@ -0,0 +1,126 @@
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from app.core import config
+from app.utils import singer
+from app.utils.cache import TTLCache
+from app.utils.token_refresher import TokenRefresher
+from app.utils.token_snapshot import dump_snapshot, read_snapshot, restore_snapshot, write_snapshot
+
+GP_PROJECT_ID = "3fa85f64-5717-4562-b3fc-2c963f66afa6"
+OTHER_GP_PROJECT_ID = "0b6a3c8e-5f0d-4c1e-9d7a-2f8e1b3c4d5e"
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = str(tmp_path / "tokens.json")
+    with patch.object(config.settings, "TOKEN_SNAPSHOT_PATH", path):
+        yield path
+
+
+def new_cache():
+    return TTLCache(max_size=10, ttl=3600, negative_ttl=5, stale_ttl=600)
+
+
+def test_snapshot_round_trip(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token")
+    cache.set_negative(OTHER_GP_PROJECT_ID)
+    write_snapshot(snapshot_path, dump_snapshot(cache))
+
+    restored_cache = new_cache()
+    assert restore_snapshot(snapshot_path, restored_cache) == 1
+    assert restored_cache.get(GP_PROJECT_ID) == "api-token"
+    assert OTHER_GP_PROJECT_ID not in restored_cache
+
+
+def test_snapshot_readable_only_by_owner(snapshot_path):
+    write_snapshot(snapshot_path, dump_snapshot(new_cache()))
+    assert stat.S_IMODE(os.stat(snapshot_path).st_mode) == 0o600
+    assert os.listdir(os.path.dirname(snapshot_path)) == ["tokens.json"]
+
+
+def test_concurrent_writers_dont_share_temporary_file(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token")
+    document = dump_snapshot(cache)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: write_snapshot(snapshot_path, document), range(32)))
+
+    assert os.listdir(os.path.dirname(snapshot_path)) == ["tokens.json"]
+    assert restore_snapshot(snapshot_path, new_cache()) == 1
+
+
+def test_tampered_snapshot_is_ignored(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token")
+    document = json.loads(dump_snapshot(cache))
+    document["payload"] = document["payload"].replace("api-token", "forged-token")
+    with open(snapshot_path, "w") as file:
+        json.dump(document, file)
+
+    restored_cache = new_cache()
+    assert restore_snapshot(snapshot_path, restored_cache) == 0
+    assert GP_PROJECT_ID not in restored_cache
+
+
+def test_snapshot_signed_with_other_key_is_ignored(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token")
+    write_snapshot(snapshot_path, dump_snapshot(cache))
+    with patch.object(config.settings, "SECRET_KEY", "other-secret"):
+        assert read_snapshot(snapshot_path) == {}
+
+
+def test_missing_or_damaged_snapshot_is_ignored(snapshot_path):
+    assert restore_snapshot(snapshot_path, new_cache()) == 0
+    with open(snapshot_path, "w") as file:
+        file.write("{not json")
+    assert restore_snapshot(snapshot_path, new_cache()) == 0
+
+
+def test_expired_tokens_are_not_restored(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token", ttl=100)
+    cache.set(OTHER_GP_PROJECT_ID, "old-token", ttl=100)
+    document = dump_snapshot(cache)
+    write_snapshot(snapshot_path, document)
+
+    restored_cache = new_cache()
+    saved_at = json.loads(json.loads(document)["payload"])["saved_at"]
+    with patch("app.utils.token_snapshot.time.time", return_value=saved_at + 1000):
+        assert restore_snapshot(snapshot_path, restored_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_refresher_saves_snapshot_on_stop_and_restores_on_start(snapshot_path):
+    cache = new_cache()
+    cache.set(GP_PROJECT_ID, "api-token")
+    with patch.object(singer, "TOKEN_CACHE", cache), patch.object(config.settings, "TOKEN_PREWARM", False):
+        refresher = TokenRefresher()
+        await refresher.start()
+        await refresher.stop()
+    assert os.path.exists(snapshot_path)
+
+    restored_cache = new_cache()
+    with patch.object(singer, "TOKEN_CACHE", restored_cache), patch.object(config.settings, "TOKEN_PREWARM", False):
+        refresher = TokenRefresher()
+        await refresher.start()
+        assert restored_cache.get(GP_PROJECT_ID) == "api-token"
+        await refresher.stop()
+
+
+@pytest.mark.asyncio
+async def test_refresher_stops_when_snapshot_is_not_writable(tmp_path, caplog):
+    path = str(tmp_path / "missing" / "tokens.json")
+    with patch.object(singer, "TOKEN_CACHE", new_cache()), patch.object(config.settings, "TOKEN_PREWARM", False), \
+            patch.object(config.settings, "TOKEN_SNAPSHOT_PATH", path):
+        refresher = TokenRefresher()
+        await refresher.start()
+        await refresher.stop()
+    assert "Token cache snapshot is not saved" in caplog.text
@@ -0,0 +1,206 @@
+import uuid
+from typing import Dict
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.dal import DAL
+from app.db.models import Vacancy, VacancyResponse
+from app.schemas.vacancy import CreateVacancy, EditVacancy
+from app.session import async_session
+from app.utils.cache import CacheStats, GenerationCache
+from app.utils.vacancy_cache import PAGE_CACHE, RESPONSE_CACHE, VACANCY_CACHE
+
+# All test coroutines in file will be treated as marked (async allowed).
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True, scope="function")
+def _teardown(clean_db_on_setup):
+    yield
+
+
+async def get_vacancy(client: AsyncClient, vacancy_id):
+    return await client.get(f"/vacancies/{vacancy_id}?signature&gp_project_id={uuid.uuid4()}",
+                            params={"project_id": str(uuid.uuid4()), "service": "vacancies"})
+
+
+async def test_vacancy_read_from_cache(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                       empty_vacancy_with_skills: Dict):
+    vacancy = await DAL(session).create_vacancy(CreateVacancy(**empty_vacancy_with_skills))
+    first = await get_vacancy(client, vacancy.id)
+    hits = VACANCY_CACHE.stats.hits
+    second = await get_vacancy(client, vacancy.id)
+
+    assert second.status_code == 200
+    assert second.headers["content-type"] == "application/json"
+    assert VACANCY_CACHE.stats.hits == hits + 1
+    assert second.content == first.content
+    assert len(second.json()["skills"]) == len(empty_vacancy_with_skills["skills"])
+
+
+async def test_edited_vacancy_read_again(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                         empty_vacancy: Dict):
+    vacancy = await DAL(session).create_vacancy(CreateVacancy(**empty_vacancy))
+    await get_vacancy(client, vacancy.id)
+    assert (vacancy.id, vacancy.updated_on) in VACANCY_CACHE
+
+    edited = await client.put(f"/vacancies/{vacancy.id}?signature&gp_project_id={uuid.uuid4()}",
+                              json={**empty_vacancy, "id": str(vacancy.id), "name": "Edited"},
+                              params={"project_id": str(uuid.uuid4()), "service": "update vacancies"})
+    assert edited.status_code == 200
+    assert (vacancy.id, vacancy.updated_on) not in VACANCY_CACHE
+
+    result = await get_vacancy(client, vacancy.id)
+    assert result.json()["name"] == "Edited"
+    assert result.json()["updated_on"] == edited.json()["updated_on"]
+
+
+async def test_deleted_vacancy_not_served(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                          empty_vacancy: Dict):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+    assert (await get_vacancy(client, vacancy.id)).status_code == 200
+
+    deleted = await client.delete(f"/vacancies/{vacancy.id}?signature&gp_project_id={uuid.uuid4()}",
+                                  params={"project_id": str(uuid.uuid4()), "service": "vacancies"})
+    assert deleted.status_code == 200
+    assert (vacancy.id, vacancy.updated_on) not in VACANCY_CACHE
+    assert (await get_vacancy(client, vacancy.id)).status_code == 404
+
+
+async def test_vacancy_response_read_from_cache(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                                empty_vacancy: Dict, vacancy_response_full: Dict):
+    vacancy = Vacancy(**empty_vacancy)
+    session.add(vacancy)
+    await session.commit()
+    vacancy_response = VacancyResponse(**{**vacancy_response_full, "vacancy_id": vacancy.id})
+    session.add(vacancy_response)
+    await session.commit()
+    url = f"/vacancies/responses/{vacancy_response.id}?signature&gp_project_id={uuid.uuid4()}"
+    params = {"project_id": str(uuid.uuid4()), "service": "responses by vacancy"}
+
+    first = await client.get(url, params=params)
+    hits = RESPONSE_CACHE.stats.hits
+    second = await client.get(url, params=params)
+    assert second.status_code == 200
+    assert RESPONSE_CACHE.stats.hits == hits + 1
+    assert second.content == first.content
+    assert second.json()["data_response"] == vacancy_response_full["data_response"]
+
+    await session.delete(vacancy_response)
+    await session.commit()
+    assert (await client.get(url, params=params)).status_code == 404
+
+
+async def test_service_status_vacancy_caches(mock_signature_procedure, client: AsyncClient):
+    result = await client.get("/service/status?signature",
+                              params={"project_id": str(uuid.uuid4()), "service": "vacancies"})
+    assert result.status_code == 200
+    vacancies = result.json()["vacancies"]
+    assert vacancies["vacancy_cache"]["max_size"] == VACANCY_CACHE.max_size
+    assert "hit_ratio" in vacancies["response_cache"]
+    assert vacancies["page_cache"]["max_size"] == PAGE_CACHE.cache.max_size
+
+
+def test_hit_ratio():
+    assert CacheStats().hit_ratio == 0
+    assert CacheStats(hits=2, negative_hits=1, misses=1).hit_ratio == 0.75
+
+
+def test_generation_cache():
+    cache = GenerationCache(max_size=10, ttl=60)
+    cache.set("project", 0, "filters", b"page")
+    cache.set("other", 0, "filters", b"other page")
+    assert cache.get_entry("project", 0, "filters").value == b"page"
+    assert cache.get_entry("project", 1, "filters") is None
+    assert cache.get_entry("other", 0, "filters").value == b"other page"
+
+
+async def test_page_generations_are_shared(session: AsyncSession):
+    dal = DAL(session)
+    gp_project_id = uuid.uuid4()
+    assert await dal.get_page_generation(gp_project_id) == 0
+
+    await dal.bump_page_generations(gp_project_id, gp_project_id, None)
+    await session.commit()
+    await dal.bump_page_generations(gp_project_id)
+    await session.commit()
+    assert await dal.get_page_generation(gp_project_id) == 2
+    assert await dal.get_page_generation(None) == 2
+    assert await dal.get_page_generation(uuid.uuid4()) == 0
+
+
+async def get_page(client: AsyncClient, gp_project_id, company_id):
+    return await client.get(f"/vacancies/?signature&gp_project_id={gp_project_id}&company_id={company_id}",
+                            params={"project_id": str(uuid.uuid4()), "service": "vacancies"})
+
+
+async def test_vacancy_page_read_from_cache(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                            empty_vacancy: Dict):
+    company_id = str(uuid.uuid4())
+    vacancy = await DAL(session).create_vacancy(CreateVacancy(**{**empty_vacancy, "company_id": company_id}))
+    first = await get_page(client, vacancy.gp_project_id, company_id)
+    hits = PAGE_CACHE.cache.stats.hits
+    second = await get_page(client, vacancy.gp_project_id, company_id)
+
+    assert second.status_code == 200
+    assert PAGE_CACHE.cache.stats.hits == hits + 1
+    assert second.content == first.content
+    assert [item["id"] for item in second.json()["items"]] == [str(vacancy.id)]
+
+
+async def test_vacancy_page_dropped_on_write(mock_signature_procedure, client: AsyncClient, session: AsyncSession,
+                                             empty_vacancy: Dict):
+    company_id = str(uuid.uuid4())
+    vacancy_create = CreateVacancy(**{**empty_vacancy, "company_id": company_id})
+    gp_project_id = vacancy_create.gp_project_id
+    assert (await get_page(client, gp_project_id, company_id)).status_code == 404
+
+    dal = DAL(session)
+    vacancy = await dal.create_vacancy(vacancy_create)
+    created = await get_page(client, gp_project_id, company_id)
+    assert [item["id"] for item in created.json()["items"]] == [str(vacancy.id)]
+
+    await dal.edit_vacancy(EditVacancy(**{**vacancy_create.dict(), "id": vacancy.id, "name": "Edited"}))
+    edited = await get_page(client, gp_project_id, company_id)
+    assert edited.json()["items"][0]["name"] == "Edited"
+
+    # the vacancy is moved to another project
+    other_project_id = uuid.uuid4()
+    moved = {**vacancy_create.dict(), "id": vacancy.id, "gp_project_id": other_project_id}
+    await dal.edit_vacancy(EditVacancy(**moved))
+    assert (await get_page(client, gp_project_id, company_id)).status_code == 404
+    assert (await get_page(client, other_project_id, company_id)).status_code == 200
+
+    await dal.delete_vacancy(vacancy.id)
+    assert (await get_page(client, other_project_id, company_id)).status_code == 404
+
+
+async def test_vacancy_page_dropped_on_write_of_other_process(mock_signature_procedure, client: AsyncClient,
+                                                              session: AsyncSession, empty_vacancy: Dict):
+    company_id = str(uuid.uuid4())
+    vacancy = await DAL(session).create_vacancy(CreateVacancy(**{**empty_vacancy, "company_id": company_id}))
+    assert (await get_page(client, vacancy.gp_project_id, company_id)).status_code == 200
+
+    # another worker process writes the vacancy, only the generation in DB is shared with it
+    async with async_session() as other_session:
+        await other_session.execute(update(Vacancy).where(Vacancy.id == vacancy.id).values(name="Edited"))
+        await DAL(other_session).bump_page_generations(vacancy.gp_project_id)
+        await other_session.commit()
+    result = await get_page(client, vacancy.gp_project_id, company_id)
+    assert result.json()["items"][0]["name"] == "Edited"
+
+
+async def test_vacancy_page_of_all_projects_dropped_on_write(mock_signature_procedure, client: AsyncClient,
+                                                             session: AsyncSession, empty_vacancy: Dict):
+    company_id = str(uuid.uuid4())
+    url = f"/vacancies/?signature&company_id={company_id}"
+    params = {"project_id": str(uuid.uuid4()), "service": "vacancies"}
+    assert (await client.get(url, params=params)).status_code == 404
+
+    await DAL(session).create_vacancy(CreateVacancy(**{**empty_vacancy, "company_id": company_id}))
+    assert (await client.get(url, params=params)).status_code == 200
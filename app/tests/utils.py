@@ -1,6 +1,41 @@
 import random
 import string
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.session import async_engine
 
 
 def random_lower_string(length: int = 32) -> str:
     return "".join(random.choices(string.ascii_lowercase, k=length))
+
+
+@contextmanager
+def captured_statements():
+    """
+    SQL statements with their parameters, as they are sent to the database within the block
+    """
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def explain(session: AsyncSession, statement: str, parameters) -> List[str]:
+    """
+    Plan of statement. Test tables are small, so sequential scans are disabled
+    to see which index conditions the planner can use
+    """
+    connection = await session.connection()
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+    return [row[0] for row in result]
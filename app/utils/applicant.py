@@ -0,0 +1,55 @@
+"""
+Normalized identity of applicant, kept in columns of `vacancy_response` for search.
+
+Email is lowercased, phone is brought to E.164 with Russian rules: national
+`8XXXXXXXXXX` and bare ten digit numbers get country code 7. Names are only
+stripped, they are searched case-insensitively by `lower()` indexes.
+
+`applicant_search` joins all of them for fuzzy search by trigrams.
+"""
+import re
+from typing import Dict, List, Optional
+
+APPLICANT_FIELDS = ("first_name", "last_name", "middle_name", "email", "phone")
+# order of fields in `applicant_search`, as names are usually written
+SEARCH_FIELDS = ("last_name", "first_name", "middle_name", "email", "phone")
+
+
+def normalize_email(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    digits = re.sub(r"\D", "", value or "")
+    if not digits:
+        return None
+    if len(digits) == 11 and digits[0] in "78":
+        return f"+7{digits[1:]}"
+    if len(digits) == 10:
+        return f"+7{digits}"
+    return f"+{digits}"
+
+
+def normalize_name(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+NORMALIZERS = {
+    "first_name": normalize_name,
+    "last_name": normalize_name,
+    "middle_name": normalize_name,
+    "email": normalize_email,
+    "phone": normalize_phone,
+}
+
+
+def applicant_identity(data_response: Optional[List[Dict]]) -> Dict[str, Optional[str]]:
+    """
+    Identity columns of response from its first applicant
+    """
+    applicant = data_response[0] if data_response else {}
+    identity = {name: NORMALIZERS[name](applicant.get(name)) for name in APPLICANT_FIELDS}
+    search = " ".join(identity[name] for name in SEARCH_FIELDS if identity[name])
+    return {**identity, "applicant_search": search or None}
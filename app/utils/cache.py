@@ -0,0 +1,230 @@
+"""
+In-process caches used to keep hot data away from remote services.
+
+`TTLCache` is a bounded LRU map with a TTL per entry. Misses can be remembered
+as negative entries with their own (usually much shorter) TTL, so repeated
+lookups of unknown keys do not reach the upstream service every time.
+
+Positive entries can be kept `stale_ttl` seconds past expiry, so callers may
+serve them while the upstream service is unavailable (stale-while-revalidate).
+
+`GenerationCache` keeps results scoped by a key (e.g. project) and drops all results
+of a scope at once by bumping its generation counter.
+
+`SingleFlight` lets concurrent cache misses for the same key share one call
+to the upstream service instead of each making their own.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    negative_hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.negative_hits + self.misses
+        return (self.hits + self.negative_hits) / lookups if lookups else 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {**asdict(self), "hit_ratio": self.hit_ratio}
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    negative: bool = False
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and negative caching.
+    The least recently used entry is evicted when `max_size` is reached.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        negative_ttl: float = 0,
+        stale_ttl: float = 0,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.stats = CacheStats()
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.expires_at > self._timer()
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """
+        Return the live entry for key (positive or negative) or None
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        now = self._timer()
+        if entry.expires_at <= now:
+            if entry.negative or entry.expires_at + self.stale_ttl <= now:
+                del self._data[key]
+                self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if entry.negative:
+            self.stats.negative_hits += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        if entry is None or entry.negative:
+            return default
+        return entry.value
+
+    def get_stale(self, key: Hashable) -> Any:
+        """
+        Value of positive entry even if it expired, as long as it is within `stale_ttl`
+        """
+        entry = self._data.get(key)
+        if entry is None or entry.negative or entry.expires_at + self.stale_ttl <= self._timer():
+            return None
+        self.stats.stale_hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        self._put(key, CacheEntry(value, self._timer() + (self.ttl if ttl is None else ttl)))
+
+    def set_negative(self, key: Hashable) -> None:
+        """
+        Remember that key is unknown upstream for `negative_ttl` seconds
+        """
+        if self.negative_ttl > 0:
+            self._put(key, CacheEntry(None, self._timer() + self.negative_ttl, negative=True))
+
+    def expiring_keys(self, within: float) -> List[Hashable]:
+        """
+        Keys of live positive entries which expire in `within` seconds.
+        Expired entries are left to age out, so keys nobody asks for are not kept forever
+        """
+        now = self._timer()
+        return [
+            key for key, entry in self._data.items()
+            if not entry.negative and now < entry.expires_at <= now + within
+        ]
+
+    def export(self) -> List[Tuple[Hashable, Any, float]]:
+        """
+        Live and stale positive entries with seconds left to expiry (negative for stale ones)
+        """
+        now = self._timer()
+        return [
+            (key, entry.value, entry.expires_at - now)
+            for key, entry in self._data.items()
+            if not entry.negative and entry.expires_at + self.stale_ttl > now
+        ]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"size": len(self._data), "max_size": self.max_size, **self.stats.as_dict()}
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def _put(self, key: Hashable, entry: CacheEntry) -> None:
+        if self.max_size <= 0:
+            return
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+
+class GenerationCache:
+    """
+    TTLCache of results of a scope stored under the current generation of that scope.
+    Generations are kept by the caller, where writers of all processes can bump them:
+    a bump makes every result of the scope unreachable in O(1), the LRU evicts them later.
+    Readers take the generation before computing a result and store it under that generation,
+    so a result computed before a write is never stored as fresh.
+    """
+
+    def __init__(self, max_size: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.cache = TTLCache(max_size=max_size, ttl=ttl, timer=timer)
+
+    def get_entry(self, scope: Hashable, generation: int, key: Hashable) -> Optional[CacheEntry]:
+        return self.cache.get_entry((scope, generation, key))
+
+    def set(self, scope: Hashable, generation: int, key: Hashable, value: Any) -> None:
+        self.cache.set((scope, generation, key), value)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def as_dict(self) -> Dict[str, float]:
+        return self.cache.as_dict()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight call.
+    Every caller gets the result of that call, or its exception.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key) or self._start(key, func)
+        # a cancelled caller must not cancel the call other callers are waiting for
+        return await asyncio.shield(future)
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Run call in background unless the same call is already in flight
+        """
+        if key not in self._calls:
+            self._start(key, func)
+
+    def _start(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        future = asyncio.ensure_future(func())
+        self._calls[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # mark exception as retrieved even if every caller has gone away
+            future.exception()
@@ -0,0 +1,95 @@
+"""
+Circuit breaker for calls to remote services.
+
+After `failure_threshold` consecutive failures the circuit opens and calls fail
+fast with CircuitOpenError. When `reset_timeout` seconds have passed one trial
+call is let through (half-open): success closes the circuit, failure opens it again.
+"""
+import enum
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+from app.errors import CircuitOpenError
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = failure_exceptions
+        self._timer = timer
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._timer() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_progress:
+            self._trial_in_progress = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_in_progress = False
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = CircuitState.OPEN
+            self._opened_at = self._timer()
+
+    async def call(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.allow_request():
+            self.rejected_calls += 1
+            raise CircuitOpenError(self.name)
+        try:
+            result = await func()
+        except self.failure_exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            # call didn't say anything about remote service (e.g. cancelled), let next one try
+            self._trial_in_progress = False
+            raise
+        self.record_success()
+        return result
+
+    def as_dict(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "name": self.name,
+            "state": state.value,
+            "consecutive_failures": self._failures,
+            "rejected_calls": self.rejected_calls,
+            "retry_in": (
+                max(0.0, self._opened_at + self.reset_timeout - self._timer())
+                if state == CircuitState.OPEN else 0.0
+            ),
+        }
@@ -0,0 +1,66 @@
+"""
+Shared HTTP clients for remote services (Registry, SiNoRa).
+
+Clients are opened on application startup and closed on shutdown, so calls
+reuse keep-alive connections instead of making a new TCP/TLS handshake each
+time. Outside of the application (scripts, tests) a client is opened on first use.
+"""
+from typing import Dict
+
+import httpx
+
+from app.core import config
+
+REGISTRY = "registry"
+SINORA = "sinora"
+
+
+def _client_options(name: str) -> Dict:
+    settings = config.settings
+    if name == REGISTRY:
+        connect, read = settings.REGISTRY_CONNECT_TIMEOUT, settings.REGISTRY_READ_TIMEOUT
+        max_connections = settings.REGISTRY_MAX_CONNECTIONS
+        max_keepalive = settings.REGISTRY_MAX_KEEPALIVE_CONNECTIONS
+    elif name == SINORA:
+        connect, read = settings.SINORA_CONNECT_TIMEOUT, settings.SINORA_READ_TIMEOUT
+        max_connections = settings.SINORA_MAX_CONNECTIONS
+        max_keepalive = settings.SINORA_MAX_KEEPALIVE_CONNECTIONS
+    else:
+        raise ValueError(f"Unknown remote service {name}")
+    return {
+        "timeout": httpx.Timeout(read, connect=connect),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+class HTTPClientManager:
+    """
+    Keeps one pooled httpx.AsyncClient per remote service
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(**_client_options(name))
+            self._clients[name] = client
+        return client
+
+    async def startup(self) -> None:
+        for name in (REGISTRY, SINORA):
+            self.get(name)
+
+    async def shutdown(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HTTPClientManager()
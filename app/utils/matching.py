@@ -0,0 +1,55 @@
+"""
+Matching of candidate skill profile with skills of vacancies.
+
+Score of a vacancy is weighted coverage of its skills: every skill weighs by
+desirability (`MATCH_REQUIRED_WEIGHT`, `MATCH_DESIRED_WEIGHT`), raised with its priority
+up to (1 + `MATCH_PRIORITY_WEIGHT`) times for the highest one, and is covered
+by the candidate skill with the same id. Skill of enough level covers fully,
+lower level covers as (candidate rank + 1) / (vacancy rank + 1), a missing skill
+doesn't cover at all. Score goes from 0 to 1.
+"""
+from typing import Iterable, Optional
+
+from app.core import config
+from app.schemas.shared import SkillDesirability, SkillLevel
+from app.schemas.vacancy_skill import MAX_PRIORITY
+
+LEVEL_RANKS = {
+    SkillLevel.EMPTY: 0,
+    SkillLevel.INTERN: 1,
+    SkillLevel.JUNIOR: 2,
+    SkillLevel.MIDDLE: 3,
+    SkillLevel.SENIOR: 4,
+    SkillLevel.EXPERT: 5,
+}
+
+
+def desirability_weight(desirability: Optional[SkillDesirability], priority: Optional[int]) -> float:
+    if desirability == SkillDesirability.REQUIRED:
+        weight = config.settings.MATCH_REQUIRED_WEIGHT
+    else:
+        weight = config.settings.MATCH_DESIRED_WEIGHT
+    return weight * (1 + config.settings.MATCH_PRIORITY_WEIGHT * (priority or 0) / MAX_PRIORITY)
+
+
+def coverage(candidate_level: Optional[SkillLevel], vacancy_level: Optional[SkillLevel]) -> float:
+    """
+    Part of vacancy skill covered by candidate, `candidate_level` is None when candidate has no such skill
+    """
+    if candidate_level is None:
+        return 0.0
+    candidate_rank = LEVEL_RANKS[candidate_level]
+    vacancy_rank = LEVEL_RANKS[vacancy_level or SkillLevel.EMPTY]
+    return min(1.0, (candidate_rank + 1) / (vacancy_rank + 1))
+
+
+def score(pairs: Iterable) -> float:
+    """
+    Score of vacancy by (desirability, priority, vacancy level, candidate level or None) of its skills
+    """
+    total = covered = 0.0
+    for desirability, priority, vacancy_level, candidate_level in pairs:
+        weight = desirability_weight(desirability, priority)
+        total += weight
+        covered += weight * coverage(candidate_level, vacancy_level)
+    return covered / total if total else 0.0
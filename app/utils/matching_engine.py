@@ -0,0 +1,190 @@
+"""
+Vectorized matching of many candidates with active vacancies of a project.
+
+Vacancy skills of a project are packed into a matrix with a row per (skill, candidate level)
+and a column per vacancy: cell is the part of vacancy score which a candidate with the skill
+of that level gets, see app.utils.matching. Candidates are one-hot vectors over the same rows,
+so a batch of candidates is scored with one matrix multiply. Two more column blocks count
+matched skills and fully covered REQUIRED skills in the same multiply.
+
+A vacancy asks for a few of many skills of a project, so matrices are sparse (CSR): memory
+grows with the number of vacancy skills, not with skills times vacancies.
+
+Matrix of a project is rebuilt when its vacancies change: before scoring, version of the
+project (number of vacancies and the last update) is compared with version of the matrix.
+Matrices of `MATCH_MATRIX_CACHE_SIZE` recently matched projects are kept, each one for at most
+`MATCH_MATRIX_CACHE_TTL` seconds after it is built.
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Tuple
+from uuid import UUID
+
+import numpy as np
+from scipy import sparse
+
+from app.core import config
+from app.db.dal import DAL
+from app.schemas.shared import SkillDesirability
+from app.schemas.vacancy_match import CandidateSkill, SkillMatchResult
+from app.session import async_session
+from app.utils.cache import SingleFlight, TTLCache
+from app.utils.matching import LEVEL_RANKS, coverage, desirability_weight
+
+LEVELS = sorted(LEVEL_RANKS, key=LEVEL_RANKS.get)
+
+
+@dataclass
+class SkillMatrix:
+    version: Hashable
+    # first row of a skill, rows of its levels follow in order of rank
+    skill_rows: Dict[UUID, int]
+    vacancy_ids: List[UUID]
+    # (skills * levels, 3 * vacancies): score parts, matched skills, covered REQUIRED skills
+    packed: sparse.csr_matrix
+    required: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return len(self.vacancy_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.packed.data.nbytes + self.packed.indices.nbytes + self.packed.indptr.nbytes + self.required.nbytes
+
+
+def pack(version: Hashable, skills: Iterable[Tuple]) -> SkillMatrix:
+    """
+    Matrix of vacancy skills given as (vacancy_id, skill_id, desirability, priority, level)
+    """
+    skills = list(skills)
+    vacancy_columns: Dict[UUID, int] = {}
+    skill_rows: Dict[UUID, int] = {}
+    for vacancy_id, skill_id, *_ in skills:
+        vacancy_columns.setdefault(vacancy_id, len(vacancy_columns))
+        skill_rows.setdefault(skill_id, len(skill_rows) * len(LEVELS))
+
+    vacancies = len(vacancy_columns)
+    total_weight = np.zeros(vacancies, dtype=np.float32)
+    required = np.zeros(vacancies, dtype=np.float32)
+    rows, columns, values = [], [], []
+
+    def put(row: int, column: int, value: float) -> None:
+        if value:
+            rows.append(row)
+            columns.append(column)
+            values.append(value)
+
+    for vacancy_id, skill_id, desirability, priority, level in skills:
+        column, row = vacancy_columns[vacancy_id], skill_rows[skill_id]
+        weight = desirability_weight(desirability, priority)
+        total_weight[column] += weight
+        is_required = desirability == SkillDesirability.REQUIRED
+        required[column] += is_required
+        for rank, candidate_level in enumerate(LEVELS):
+            covered = coverage(candidate_level, level)
+            put(row + rank, column, weight * covered)
+            put(row + rank, vacancies + column, 1)
+            put(row + rank, 2 * vacancies + column, is_required and covered == 1)
+
+    rows, columns = np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)
+    values = np.array(values, dtype=np.float32)
+    in_score = columns < vacancies
+    values[in_score] /= np.maximum(total_weight, np.finfo(np.float32).tiny)[columns[in_score]]
+    packed = sparse.csr_matrix(
+        (values, (rows, columns)), shape=(len(skill_rows) * len(LEVELS), 3 * vacancies), dtype=np.float32
+    )
+    return SkillMatrix(version, skill_rows, list(vacancy_columns), packed, required)
+
+
+def candidates_matrix(matrix: SkillMatrix, profiles: List[List[CandidateSkill]]) -> sparse.csr_matrix:
+    indexes, rows = [], []
+    for index, skills in enumerate(profiles):
+        for skill in skills:
+            row = matrix.skill_rows.get(skill.skill_id)
+            # skills which no vacancy asks for don't change score
+            if row is not None:
+                indexes.append(index)
+                rows.append(row + LEVEL_RANKS[skill.level])
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (indexes, rows)),
+        shape=(len(profiles), matrix.packed.shape[0]), dtype=np.float32,
+    )
+
+
+def score(matrix: SkillMatrix, profiles: List[List[CandidateSkill]], top: int) -> List[List[SkillMatchResult]]:
+    """
+    Best `top` vacancies of every candidate with at least one matched skill, best covered first
+    """
+    vacancies = matrix.size
+    if not vacancies:
+        return [[] for _ in profiles]
+    result = (candidates_matrix(matrix, profiles) @ matrix.packed).toarray()
+    scores, matched, covered_required = (
+        result[:, :vacancies], result[:, vacancies:2 * vacancies], result[:, 2 * vacancies:]
+    )
+    missing_required = matrix.required - covered_required
+    # vacancies without matched skills go last whatever their score
+    ranks = np.where(matched > 0, scores, -1)
+    top = min(top, vacancies)
+    best = np.argpartition(-ranks, top - 1, axis=1)[:, :top]
+
+    matches = []
+    for index, columns in enumerate(best):
+        columns = columns[np.argsort(-ranks[index, columns], kind="stable")]
+        matches.append([
+            SkillMatchResult(
+                vacancy_id=matrix.vacancy_ids[column],
+                score=float(scores[index, column]),
+                matched_skills=int(round(matched[index, column])),
+                missing_required=int(round(missing_required[index, column])),
+            )
+            for column in columns
+            if matched[index, column] > 0
+        ])
+    return matches
+
+
+class MatchingEngine:
+    def __init__(self, max_size: int, ttl: float):
+        self._matrices = TTLCache(max_size=max_size, ttl=ttl)
+        self._flight = SingleFlight()
+
+    async def match(
+        self, gp_project_id: UUID, profiles: List[List[CandidateSkill]], top: int
+    ) -> List[List[SkillMatchResult]]:
+        matrix = await self.matrix(gp_project_id)
+        loop = asyncio.get_running_loop()
+        # multiply of a big batch takes a while, it must not block other requests
+        return await loop.run_in_executor(None, score, matrix, profiles, top)
+
+    async def matrix(self, gp_project_id: UUID) -> SkillMatrix:
+        async with async_session() as session:
+            version = await DAL(session).get_match_version(gp_project_id)
+        matrix = self._matrices.get(gp_project_id)
+        if matrix is not None and matrix.version == version:
+            return matrix
+        # concurrent batches of a changed project wait for one rebuild
+        return await self._flight.do((gp_project_id, version), lambda: self._build(gp_project_id, version))
+
+    def as_dict(self) -> Dict:
+        matrices = [matrix for _, matrix, _ in self._matrices.export()]
+        return {
+            "projects": len(matrices),
+            "vacancies": sum(matrix.size for matrix in matrices),
+            "bytes": sum(matrix.nbytes for matrix in matrices),
+        }
+
+    async def _build(self, gp_project_id: UUID, version: Hashable) -> SkillMatrix:
+        async with async_session() as session:
+            skills = await DAL(session).get_active_vacancy_skills(gp_project_id)
+        loop = asyncio.get_running_loop()
+        matrix = await loop.run_in_executor(None, pack, version, skills)
+        self._matrices.set(gp_project_id, matrix)
+        return matrix
+
+
+MATCHING_ENGINE = MatchingEngine(
+    max_size=config.settings.MATCH_MATRIX_CACHE_SIZE,
+    ttl=config.settings.MATCH_MATRIX_CACHE_TTL,
+)
@@ -0,0 +1,201 @@
+"""
+Delivery of notifications from outbox table `notification_outbox` to SiNoRa service.
+
+Endpoints only write a notification in their transaction, the worker takes due
+notifications in batches and sends them. When SiNoRa is unavailable a notification
+is tried again with exponential backoff, it is failed after `NOTIFY_MAX_ATTEMPTS`
+attempts or at once when SiNoRa rejects it as invalid (422).
+
+In digest mode (`NOTIFY_DIGEST_WINDOW`) notifications are collected for a window
+and the ones of a channel are sent as one digest message, so SiNoRa gets one call
+per channel and window instead of one per vacancy. Digest needs its own SiNoRa template
+`NOTIFY_DIGEST_EVENT_CODE_NAME`, without it notifications are delivered one by one.
+
+Up to `NOTIFY_CONCURRENCY` notifications of a batch are sent at once, at the rate
+allowed by SINORA_DISPATCHER. Notifications are claimed with SKIP LOCKED, so several
+worker processes deliver them side by side without sending one twice.
+"""
+import asyncio
+import json
+import logging
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from app.core import config
+from app.db.dal import DAL
+from app.schemas.shared import DeliveryStatus
+from app.session import async_session
+from app.utils import notifications
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int) -> float:
+    """
+    Seconds before next attempt: exponential backoff with jitter, so retries of many
+    notifications don't hit SiNoRa at the same moment
+    """
+    delay = min(config.settings.NOTIFY_RETRY_BASE * 2 ** (attempts - 1), config.settings.NOTIFY_RETRY_MAX)
+    return delay / 2 + random.random() * delay / 2
+
+
+def delivery_status(status_code: int, attempts: int) -> DeliveryStatus:
+    if status_code == 200:
+        return DeliveryStatus.DELIVERED
+    if status_code == 422 or attempts >= config.settings.NOTIFY_MAX_ATTEMPTS:
+        return DeliveryStatus.FAILED
+    return DeliveryStatus.PENDING
+
+
+def delivery_error(result: Dict) -> Optional[str]:
+    if result["status_code"] == 200:
+        return None
+    detail = {key: value for key, value in result.items() if key != "status_code"}
+    return json.dumps(detail, ensure_ascii=False, default=str) if detail else f"SiNoRa returned {result['status_code']}"
+
+
+def digest_mode() -> bool:
+    return config.settings.NOTIFY_DIGEST_WINDOW > 0 and bool(config.settings.NOTIFY_DIGEST_EVENT_CODE_NAME)
+
+
+class OutboxWorker:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        if config.settings.NOTIFY_DIGEST_WINDOW > 0 and not digest_mode():
+            logger.warning("NOTIFY_DIGEST_EVENT_CODE_NAME is not set, notifications are delivered without digest")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._deliver_forever())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def wake(self) -> None:
+        """
+        Deliver new notifications now instead of waiting for the next poll
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def deliver_due(self) -> int:
+        """
+        Deliver a batch of due notifications, return number of notifications tried
+        """
+        async with async_session() as session:
+            notifications = await DAL(session).claim_notifications(
+                config.settings.NOTIFY_BATCH_SIZE, config.settings.NOTIFY_LEASE
+            )
+        semaphore = asyncio.Semaphore(config.settings.NOTIFY_CONCURRENCY)
+
+        async def deliver(notification) -> DeliveryStatus:
+            async with semaphore:
+                return await self.deliver(notification)
+
+        await asyncio.gather(*[deliver(notification) for notification in notifications])
+        return len(notifications)
+
+    async def deliver(self, notification) -> DeliveryStatus:
+        body = notifications.build_telegram_body(notification.channel, notification.payload)
+        result = await notifications.SINORA_DISPATCHER.send(notification.channel, body)
+        status_code = result["status_code"]
+        status = delivery_status(status_code, notification.attempts)
+        await self._finish([notification.id], status, result, notification.attempts)
+        logger.info(
+            "Notification delivery attempt",
+            extra={
+                "notification_id": str(notification.id),
+                "vacancy_id": str(notification.vacancy_id),
+                "attempts": notification.attempts,
+                "status": status.value,
+                "status_code": status_code,
+            },
+        )
+        return status
+
+    async def deliver_digests(self) -> int:
+        """
+        Deliver due notifications as one digest per channel, return number of notifications tried
+        """
+        if not config.settings.NOTIFY_DIGEST_EVENT_CODE_NAME:
+            # template of one vacancy would get digest parameters
+            return await self.deliver_due()
+        async with async_session() as session:
+            claimed = await DAL(session).claim_notifications(
+                config.settings.NOTIFY_DIGEST_MAX_VACANCIES, config.settings.NOTIFY_LEASE
+            )
+        by_channel = defaultdict(list)
+        for notification in claimed:
+            by_channel[notification.channel].append(notification)
+        await asyncio.gather(*[
+            self.deliver_digest(channel, channel_notifications)
+            for channel, channel_notifications in by_channel.items()
+        ])
+        return len(claimed)
+
+    async def deliver_digest(self, channel: int, digest: List) -> None:
+        parameters = notifications.render_digest_parameters([notification.payload for notification in digest])
+        body = notifications.build_telegram_body(
+            channel, parameters, event_code=config.settings.NOTIFY_DIGEST_EVENT_CODE_NAME
+        )
+        result = await notifications.SINORA_DISPATCHER.send(channel, body)
+        status_code = result["status_code"]
+        # notifications of one digest may have been tried different number of times
+        by_status = defaultdict(list)
+        for notification in digest:
+            by_status[delivery_status(status_code, notification.attempts)].append(notification)
+        for status, status_notifications in by_status.items():
+            attempts = max(notification.attempts for notification in status_notifications)
+            await self._finish(
+                [notification.id for notification in status_notifications], status, result, attempts
+            )
+        logger.info(
+            "Digest delivery attempt",
+            extra={"channel": channel, "vacancies": len(digest), "status_code": status_code},
+        )
+
+    async def _finish(self, notification_ids: List, status: DeliveryStatus, result: Dict, attempts: int) -> None:
+        async with async_session() as session:
+            await DAL(session).finish_notifications(
+                notification_ids,
+                status,
+                result["status_code"],
+                last_error=delivery_error(result),
+                retry_in=retry_delay(attempts),
+            )
+
+    async def _deliver_forever(self) -> None:
+        while True:
+            if digest_mode():
+                await self._deliver_digests_once()
+                continue
+            self._wakeup.clear()
+            try:
+                # full batch means there may be more due notifications
+                while await self.deliver_due() == config.settings.NOTIFY_BATCH_SIZE:
+                    pass
+            except Exception:
+                logger.exception("Delivery of notifications failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), config.settings.NOTIFY_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver_digests_once(self) -> None:
+        # new notifications don't wake worker up, they wait for the end of window
+        await asyncio.sleep(config.settings.NOTIFY_DIGEST_WINDOW)
+        try:
+            while await self.deliver_digests() == config.settings.NOTIFY_DIGEST_MAX_VACANCIES:
+                pass
+        except Exception:
+            logger.exception("Delivery of digests failed")
+
+
+outbox_worker = OutboxWorker()
@@ -1,6 +1,9 @@
 import asyncio
 import json
-from typing import Union, Dict, List
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Union, Dict, List
 
 import httpx
 
@@ -8,6 +11,17 @@ from app.schemas.vacancy_notify import PostTelegramVacancy
 from app.schemas.vacancy import Contact, Requirements, Conditions
 
 from app.core import config
+from app.utils.cache import TTLCache
+from app.utils.http_clients import SINORA, http_clients
+from app.utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Rendered parameters of SiNoRa message by (vacancy_id, updated_on), edited vacancy gets a new key
+PAYLOAD_CACHE = TTLCache(
+    max_size=config.settings.NOTIFY_PAYLOAD_CACHE_SIZE,
+    ttl=config.settings.NOTIFY_PAYLOAD_CACHE_TTL,
+)
 
 
 def list_of_params_to_dict(list_: List[Union[Contact, Requirements, Conditions]]) -> Dict:
@@ -33,10 +47,7 @@ def list_of_params_to_dict(list_: List[Union[Contact, Requirements, Conditions]]
     return result
 
 
-async def post_to_telegram(vacancy_post: PostTelegramVacancy) -> Dict:
-    """
-    Function send post of vacancy to SiNoRa service, which send message to Telegram's chanelle.
-    """
+def sinora_is_configured() -> bool:
     params = [config.settings.URL_SINORA_NOTIFICATION,
               config.settings.USER_UUID,
               config.settings.PROJECT_UUID,
@@ -44,39 +55,204 @@ async def post_to_telegram(vacancy_post: PostTelegramVacancy) -> Dict:
               config.settings.EVENT_CODE_NAME,
               config.settings.TELEGRAM_CHANNEL_ID_CLOVERI,
               ]
-    if not all(params):
+    return all(params)
+
+
+def render_telegram_parameters(vacancy_post: PostTelegramVacancy) -> Dict:
+    """
+    Function render parameters of SiNoRa message template from vacancy
+    """
+    return {
+        "c_name": vacancy_post.name,
+        "c_company_name": vacancy_post.company_name,
+        "c_full_description": vacancy_post.full_description,
+        "c_contacts": list_of_params_to_dict(vacancy_post.contacts),
+        "c_requirements": list_of_params_to_dict(vacancy_post.requirements),
+        "c_conditions": list_of_params_to_dict(vacancy_post.conditions),
+        "c_responsibilities": vacancy_post.responsibilities,
+    }
+
+
+def render_vacancy_parameters(vacancy: Any) -> Dict:
+    """
+    Function render parameters of SiNoRa message template from vacancy stored in database,
+    where contacts, requirements and conditions are lists of dicts
+    """
+    conditions = {}
+    for index, condition in enumerate(vacancy.conditions or []):
+        parts = (condition.get("schedule"), condition.get("employment"), condition.get("other"))
+        conditions["condition_" + str(index)] = ", ".join(part for part in parts if part)
+    return {
+        "c_name": vacancy.name,
+        "c_company_name": vacancy.company_name,
+        "c_full_description": vacancy.full_description,
+        "c_contacts": {contact["type"]: contact["contact"] for contact in vacancy.contacts or []},
+        "c_requirements": {
+            requirement["experience"]: requirement["description"] for requirement in vacancy.requirements or []
+        },
+        "c_conditions": conditions,
+        "c_responsibilities": vacancy.responsibilities,
+    }
+
+
+def vacancy_parameters(vacancy: Any) -> Dict:
+    """
+    Cached parameters of SiNoRa message for vacancy stored in database
+    """
+    key = (vacancy.id, vacancy.updated_on)
+    parameters = PAYLOAD_CACHE.get(key)
+    if parameters is None:
+        parameters = render_vacancy_parameters(vacancy)
+        PAYLOAD_CACHE.set(key, parameters)
+    return parameters
+
+
+def render_digest_parameters(payloads: List[Dict]) -> Dict:
+    """
+    Function render parameters of SiNoRa digest template from parameters of vacancy posts
+    """
+    return {
+        "c_count": len(payloads),
+        "c_vacancies": payloads,
+    }
+
+
+def build_telegram_body(channel: int, parameters: Dict, event_code: str = "") -> Dict:
+    return {
+      "event_code": event_code or config.settings.EVENT_CODE_NAME,
+      "user_identifier": config.settings.USER_UUID,
+      "project_identifier": config.settings.PROJECT_UUID,
+      "message_recipients": [
+        {
+            'telegram_chat_id': channel,
+         }
+      ],
+      "parameters": parameters,
+    }
+
+
+async def send_to_sinora(body: Dict) -> Dict:
+    """
+    Function send message to SiNoRa service.
+    Return answer of SiNoRa with its status_code, status_code is 503 if SiNoRa is not available
+    """
+    if not sinora_is_configured():
+        logger.warning("SiNoRa service is not configured")
         return {"status_code": 503}
 
-    async with httpx.AsyncClient() as client:
-        url = config.settings.URL_SINORA_NOTIFICATION
-        headers = {
-            "Content-Type": "application/json"
-        }
-        body = {
-          "event_code": config.settings.EVENT_CODE_NAME,
-          "user_identifier": config.settings.USER_UUID,
-          "project_identifier": config.settings.PROJECT_UUID,
-          "message_recipients": [
-            {
-                'telegram_chat_id': config.settings.TELEGRAM_CHANNEL_ID_CLOVERI,
-             }
-          ],
-          "parameters": {
-              "c_name": vacancy_post.name,
-              "c_company_name": vacancy_post.company_name,
-              "c_full_description": vacancy_post.full_description,
-              "c_contacts": list_of_params_to_dict(vacancy_post.contacts),
-              "c_requirements": list_of_params_to_dict(vacancy_post.requirements),
-              "c_conditions": list_of_params_to_dict(vacancy_post.conditions),
-              "c_responsibilities": vacancy_post.responsibilities,
-          }
-        }
-        response = await client.post(url, headers=headers, json=body)
+    url = config.settings.URL_SINORA_NOTIFICATION
+    try:
+        response = await http_clients.get(SINORA).post(url, json=body)
+    except httpx.HTTPError as exc:
+        logger.warning("SiNoRa service is unavailable", extra={"error": repr(exc)})
+        return {"status_code": 503}
+    try:
         result = response.json()
-        result_dict = json.loads(result)
-        result_dict["status_code"] = response.status_code
+        # SiNoRa answers with JSON encoded string
+        result_dict = json.loads(result) if isinstance(result, str) else result
+    except ValueError:
+        result_dict = {}
+    if not isinstance(result_dict, dict):
+        result_dict = {"detail": result_dict}
+    result_dict["status_code"] = response.status_code
+    logger.info("Message sent to SiNoRa", extra={"status_code": response.status_code})
     return result_dict
 
+
+@dataclass
+class DispatcherStats:
+    sent: int = 0
+    delayed: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), "average_wait": self.total_wait / self.sent if self.sent else 0.0}
+
+
+class SiNoRaDispatcher:
+    """
+    Sends messages to SiNoRa service no faster than token buckets allow: one bucket
+    for all messages and one for each Telegram channel. A message which has no token
+    waits in queue for its turn instead of being rejected by SiNoRa or Telegram.
+    Limits are kept by each worker process
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        channel_rate: float,
+        channel_burst: int,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.stats = DispatcherStats()
+        self._timer = timer
+        self._bucket = TokenBucket(rate, burst, timer)
+        self._channel_buckets: Dict[int, TokenBucket] = {}
+
+    def _channel_bucket(self, channel: int) -> TokenBucket:
+        bucket = self._channel_buckets.get(channel)
+        if bucket is None:
+            bucket = TokenBucket(self.channel_rate, self.channel_burst, self._timer)
+            self._channel_buckets[channel] = bucket
+        return bucket
+
+    async def send(self, channel: int, body: Dict) -> Dict:
+        channel_wait = self._channel_bucket(channel).reserve()
+        await self._wait(channel_wait)
+        # token of all messages is taken only when channel lets the message go, otherwise messages
+        # held by a busy channel would spend tokens of other channels in advance
+        global_wait = self._bucket.reserve()
+        await self._wait(global_wait)
+        wait = channel_wait + global_wait
+        if wait > 0:
+            self.stats.delayed += 1
+        self.stats.sent += 1
+        self.stats.total_wait += wait
+        self.stats.max_wait = max(self.stats.max_wait, wait)
+        return await send_to_sinora(body)
+
+    async def _wait(self, delay: float) -> None:
+        if delay <= 0:
+            return
+        self.stats.queue_depth += 1
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.stats.queue_depth)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.stats.queue_depth -= 1
+
+    def as_dict(self) -> Dict:
+        return {
+            "rate": self._bucket.rate,
+            "channel_rate": self.channel_rate,
+            "channels": len(self._channel_buckets),
+            **self.stats.as_dict(),
+        }
+
+
+SINORA_DISPATCHER = SiNoRaDispatcher(
+    rate=config.settings.SINORA_RATE,
+    burst=config.settings.SINORA_BURST,
+    channel_rate=config.settings.SINORA_CHANNEL_RATE,
+    channel_burst=config.settings.SINORA_CHANNEL_BURST,
+)
+
+
+async def post_to_telegram(vacancy_post: PostTelegramVacancy) -> Dict:
+    """
+    Function send post of vacancy to SiNoRa service, which send message to Telegram's chanelle.
+    """
+    channel = config.settings.TELEGRAM_CHANNEL_ID_CLOVERI
+    body = build_telegram_body(channel, render_telegram_parameters(vacancy_post))
+    return await SINORA_DISPATCHER.send(channel, body)
+
+
 if __name__ == '__main__':
     def vacancy_skill():
         return {
@@ -0,0 +1,34 @@
+"""
+Token bucket rate limiter.
+
+The bucket holds up to `capacity` tokens and gets `rate` tokens per second.
+A caller reserves a token and waits the returned delay. Tokens may go below zero,
+so callers are served in the order of reservation without a lock or queue.
+"""
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, timer: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._timer = timer
+        self._tokens = self.capacity
+        self._updated = timer()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def reserve(self) -> float:
+        """
+        Take a token, return seconds to wait until it is available
+        """
+        if self.unlimited:
+            return 0.0
+        now = self._timer()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
@@ -3,21 +3,42 @@ import base64
 import datetime
 import hashlib
 import hmac
-from typing import Optional, Union
+import logging
+from typing import Iterable, Optional, Union
 from uuid import UUID
 import secrets
 
 import httpx
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.api.message_manager import MessageManager
 from starlette.responses import JSONResponse
 
 from app.core import config
+from app.db.dal import DAL
+from app.errors import CircuitOpenError, RegistryUnavailableError
+from app.session import async_session
+from app.utils.cache import SingleFlight, TTLCache
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.http_clients import REGISTRY, http_clients
 
-# This is  dict for save api_token as cache
-TOKEN_PROJECT_MAPPING = {
-    # "gp_project_id1": "API_TOKEN1",
-}
+logger = logging.getLogger(__name__)
+
+# Cache of api_token by gp_project_id, unknown projects are cached as negative entries
+TOKEN_CACHE = TTLCache(
+    max_size=config.settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=config.settings.TOKEN_CACHE_TTL,
+    negative_ttl=config.settings.TOKEN_CACHE_NEGATIVE_TTL,
+    stale_ttl=config.settings.TOKEN_CACHE_STALE_TTL,
+)
+REGISTRY_BREAKER = CircuitBreaker(
+    "Registry",
+    failure_threshold=config.settings.REGISTRY_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=config.settings.REGISTRY_BREAKER_RESET_TIMEOUT,
+    failure_exceptions=(RegistryUnavailableError,),
+)
+# Registry lookups in progress, concurrent misses of one project share a single request
+REGISTRY_LOOKUPS = SingleFlight()
 
 TIME_LIMIT = 180
 
@@ -38,40 +59,155 @@ def create_sign(key: str, message):
     return signing.hexdigest()
 
 
+async def fetch_api_token(gp_project_id: UUID) -> Optional[str]:
+    """
+    Request API token of gp_project_id from Registry service.
+    Return api token or None if Registry doesn't know the project,
+    raise RegistryUnavailableError if Registry didn't give an answer
+    """
+    url = config.settings.URL_REGISTRY_SERVICE + str(gp_project_id)
+    try:
+        response = await http_clients.get(REGISTRY).get(url)
+    except httpx.HTTPError as exc:
+        raise RegistryUnavailableError(str(exc)) from exc
+
+    # Handle response Registry service
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise RegistryUnavailableError(f"Registry service returned {response.status_code}")
+    data = response.json()
+    if not len(data['results']):
+        return None
+    dict_record_registry = data['results'][0]
+    return dict_record_registry.get('object_code') or None
+
+
+async def load_shared_api_token(gp_project_id: UUID) -> Optional[str]:
+    """
+    Take API token from the store shared by worker processes and put it into token cache.
+    Tokens which are about to be refreshed are skipped, so they are requested from Registry again
+    """
+    try:
+        async with async_session() as session:
+            registry_token = await DAL(session).get_registry_token(
+                gp_project_id, min_ttl=config.settings.TOKEN_REFRESH_AHEAD
+            )
+    except (SQLAlchemyError, OSError):
+        logger.warning("Shared token store is unavailable", exc_info=True)
+        return None
+    if registry_token is None:
+        return None
+    ttl = (registry_token.expires_on - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    TOKEN_CACHE.set(str(gp_project_id), registry_token.api_token, ttl=ttl)
+    return registry_token.api_token
+
+
+async def save_shared_api_token(gp_project_id: UUID, api_token: str) -> None:
+    try:
+        async with async_session() as session:
+            await DAL(session).save_registry_token(gp_project_id, api_token, config.settings.TOKEN_CACHE_TTL)
+    except (SQLAlchemyError, OSError):
+        logger.warning("Shared token store is unavailable", exc_info=True)
+
+
+async def lookup_api_token(gp_project_id: UUID) -> Optional[str]:
+    """
+    Request API token from shared token store or Registry service and store the answer in token cache.
+    Fail fast with RegistryUnavailableError while Registry circuit is open
+    """
+    if config.settings.TOKEN_SHARED_STORE:
+        api_token = await load_shared_api_token(gp_project_id)
+        if api_token:
+            return api_token
+
+    try:
+        api_token = await REGISTRY_BREAKER.call(lambda: fetch_api_token(gp_project_id))
+    except CircuitOpenError as exc:
+        raise RegistryUnavailableError(str(exc)) from exc
+    if api_token:
+        TOKEN_CACHE.set(str(gp_project_id), api_token)
+        if config.settings.TOKEN_SHARED_STORE:
+            await save_shared_api_token(gp_project_id, api_token)
+    else:
+        TOKEN_CACHE.set_negative(str(gp_project_id))
+    return api_token
+
+
 async def check_gp_project_id(gp_project_id: UUID) -> Optional[Union[bool, str]]:
     """
-    Check gp_project_id in local dict, request API token from Registry service.
+    Check gp_project_id in token cache, request API token from Registry service.
+    Expired token is returned at once and requested again in background.
     Return api token or False
     """
+    entry = TOKEN_CACHE.get_entry(str(gp_project_id))
+    if entry is not None:
+        return False if entry.negative else entry.value
 
-    if str(gp_project_id) not in TOKEN_PROJECT_MAPPING:
-
-        if config.settings.URL_REGISTRY_SERVICE:
-            url_registry = config.settings.URL_REGISTRY_SERVICE
-        else:
-            return False
-
-        async with httpx.AsyncClient() as client:
-            url = url_registry + str(gp_project_id)
-            headers = {
-                "Content-Type": "application/json"
-            }
-            response = await client.get(url, headers=headers)
-
-            # Handle response Registry service
-            if response.status_code == 200:
-                data = response.json()
-                if len(data['results']):
-                    dict_record_registry = data['results'][0]
-                    api_token = dict_record_registry.get('object_code', {})
-                    TOKEN_PROJECT_MAPPING[str(gp_project_id)] = api_token
-                else:
-                    return False
-                return api_token
-            else:
-                return False
-    else:
-        return TOKEN_PROJECT_MAPPING[str(gp_project_id)]
+    if not config.settings.URL_REGISTRY_SERVICE:
+        return False
+
+    stale_token = TOKEN_CACHE.get_stale(str(gp_project_id))
+    if stale_token:
+        REGISTRY_LOOKUPS.start(str(gp_project_id), lambda: lookup_api_token(gp_project_id))
+        return stale_token
+
+    try:
+        api_token = await REGISTRY_LOOKUPS.do(str(gp_project_id), lambda: lookup_api_token(gp_project_id))
+    except RegistryUnavailableError as exc:
+        logger.warning("Registry is unavailable", extra={"gp_project_id": str(gp_project_id), "error": str(exc)})
+        return False
+    return api_token or False
+
+
+async def load_api_tokens(gp_project_ids: Iterable[UUID]) -> int:
+    """
+    Request API tokens of projects from Registry service into token cache.
+    Return number of projects which got a token
+    """
+    semaphore = asyncio.Semaphore(config.settings.TOKEN_PREWARM_CONCURRENCY)
+
+    async def load(gp_project_id: UUID) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await REGISTRY_LOOKUPS.do(str(gp_project_id), lambda: lookup_api_token(gp_project_id))
+            except RegistryUnavailableError:
+                return None
+
+    if not config.settings.URL_REGISTRY_SERVICE:
+        return 0
+    api_tokens = await asyncio.gather(*[load(gp_project_id) for gp_project_id in gp_project_ids])
+    return sum(1 for api_token in api_tokens if api_token)
+
+
+async def refresh_expiring_api_tokens() -> int:
+    """
+    Request again API tokens which expire soon, so requests don't wait for Registry service
+    """
+    gp_project_ids = TOKEN_CACHE.expiring_keys(config.settings.TOKEN_REFRESH_AHEAD)
+    return await load_api_tokens(UUID(gp_project_id) for gp_project_id in gp_project_ids)
+
+
+def sign_message(project_id: UUID,
+                 data_fields: Optional[str] = "",
+                 items_id: Optional[str] = "",
+                 time: Optional[str] = "") -> str:
+    """
+    Message signed by client: not empty parts and SECRET_KEY joined with ":"
+    """
+    list_message = []
+    # Sort dict for original name key from endpoint
+    if project_id:
+        list_message.append(str(project_id))
+    if data_fields:
+        list_message.append(str(data_fields))  # original name from endpoint - service
+    if items_id:
+        list_message.append(str(items_id))
+    if time:
+        list_message.append(str(time))
+    if config.settings.SECRET_KEY:
+        list_message.append(config.settings.SECRET_KEY)
+    return ":".join(list_message)
 
 
 def check_signs(received_signature: str,
@@ -87,22 +223,13 @@ def check_signs(received_signature: str,
     *data_fields* - str of parameters from the query obtained by concatenating parameters into a single str
     *items_id*  - str of parameters from the path obtained by concatenating parameters into a single str
     """
-    # message = str(gp_project_id) + data_fields + items_id + time
-    message = ""
-    list_message =[]
-    # Sort dict for original name key from endpoint
-    if project_id:
-        list_message.append(str(project_id))
-    if data_fields:
-        list_message.append(str(data_fields)) # original name from endpoint - service
-    if items_id:
-        list_message.append(str(items_id))
-    if time:
-        list_message.append(str(time))
-    if config.settings.SECRET_KEY:
-        list_message.append(config.settings.SECRET_KEY)
-    message = ":".join(list_message)
-    print("MESSAGE: ", message)
+    message = sign_message(project_id, data_fields, items_id, time)
+    if logger.isEnabledFor(logging.DEBUG):
+        # message itself is not logged, it contains SECRET_KEY
+        logger.debug(
+            "Check signature",
+            extra={"gp_project_id": str(project_id), "data_fields": data_fields, "items_id": items_id, "time": time},
+        )
     signature = create_sign(api_token, message)
     return hmac.compare_digest(received_signature, signature)
 
@@ -117,6 +244,7 @@ async def check_authority(gp_project_id: UUID,
     """
 
     if time and (datetime.datetime.now().timestamp() - float(time)) > TIME_LIMIT:
+        logger.info("Signature timeout", extra={"gp_project_id": str(gp_project_id), "time": time})
         return JSONResponse(
             status_code=419, content=MessageManager.timeout_signature()
         )
@@ -124,57 +252,47 @@ async def check_authority(gp_project_id: UUID,
     api_token = await check_gp_project_id(gp_project_id)
 
     if not api_token:
+        logger.info("Unknown gp_project_id", extra={"gp_project_id": str(gp_project_id)})
         return JSONResponse(
             status_code=404,
             content=MessageManager.get_gp_project_id_nothing_found_msg_or_unavailable_registry(gp_project_id)
         )
-    else:
-        if not check_signs(received_signature, gp_project_id, api_token, data_fields=data_fields, items_id=items_id, time=time):
-            if config.settings.SINGER_DEBUG:
-                print(check_signs(received_signature, gp_project_id, api_token, data_fields=data_fields, items_id=items_id, time=time))
-                print('RETURN gp_project_id: ', gp_project_id)
-                print(f'RETURN STR data_field: {data_fields}')
-                print(f'RETURN STR items_id: {items_id}')
-                print(f'RETURN STR time: {time}')
-                print(f'RETURN STR now timestamp: {datetime.datetime.now().timestamp()}')
-                sign_status = 'API_TOKEN not found'
-                list_message_suggest = []
-                message_suggest = ""
-                if api_token:
-                    # Sort dict for original name key from endpoint
-                    if gp_project_id:
-                        list_message_suggest.append(str(gp_project_id))
-                    if data_fields:
-                        list_message_suggest.append(str(data_fields))  # original name from endpoint - service
-                    if items_id:
-                        list_message_suggest.append(str(items_id))
-                    if time:
-                        list_message_suggest.append(str(time))
-                    if config.settings.SECRET_KEY:
-                        list_message_suggest.append(config.settings.SECRET_KEY)
-                    message_suggest = ":".join(list_message_suggest)
-                    sign_status = create_sign(str(api_token), message_suggest)
-                print('Message: ', message_suggest)
-                print('Sign: ', sign_status)
-
-                returns = {
-                    "Error": "Invalid signature",
-                    "gp_project_id": f'{gp_project_id}',
-                    "str_data_field": f'{data_fields}',
-                    "str_items_id": f"{items_id}",
-                    "time_from_data": f"{time}",
-                    "now timestamp": f"{datetime.datetime.now().timestamp()}",
-                    "message_saggest": f"{message_suggest}",
-                    "Sign": sign_status
-                }
-                return JSONResponse(
-                    status_code=401, content=returns
-                )
-            else:
-                return JSONResponse(
-                    status_code=401, content=MessageManager.invalid_signature()
-                )
-    return None
+    if check_signs(received_signature, gp_project_id, api_token, data_fields=data_fields, items_id=items_id, time=time):
+        return None
+
+    logger.info("Invalid signature", extra={"gp_project_id": str(gp_project_id)})
+    if not config.settings.SINGER_DEBUG:
+        return JSONResponse(
+            status_code=401, content=MessageManager.invalid_signature()
+        )
+
+    # suggest the signature client should have sent
+    now_timestamp = datetime.datetime.now().timestamp()
+    message_suggest = sign_message(gp_project_id, data_fields, items_id, time)
+    sign_status = create_sign(str(api_token), message_suggest)
+    logger.debug(
+        "Invalid signature details",
+        extra={
+            "gp_project_id": str(gp_project_id),
+            "data_fields": data_fields,
+            "items_id": items_id,
+            "time": time,
+            "now_timestamp": now_timestamp,
+        },
+    )
+    returns = {
+        "Error": "Invalid signature",
+        "gp_project_id": f'{gp_project_id}',
+        "str_data_field": f'{data_fields}',
+        "str_items_id": f"{items_id}",
+        "time_from_data": f"{time}",
+        "now timestamp": f"{now_timestamp}",
+        "message_saggest": f"{message_suggest}",
+        "Sign": sign_status
+    }
+    return JSONResponse(
+        status_code=401, content=returns
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+"""
+Keeps Registry API tokens of known projects in the token cache.
+
+With `TOKEN_SNAPSHOT_PATH` the cache is restored from a snapshot on startup,
+saved every `TOKEN_SNAPSHOT_INTERVAL` seconds and once more on shutdown.
+
+With `TOKEN_PREWARM` tokens are loaded on startup for every gp_project_id from
+vacancy table, then a background task requests again the tokens which are
+about to expire.
+"""
+import asyncio
+import logging
+from typing import List
+
+from app.core import config
+from app.db.dal import DAL
+from app.session import async_session
+from app.utils import singer
+from app.utils.token_snapshot import dump_snapshot, restore_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRefresher:
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        if config.settings.TOKEN_SNAPSHOT_PATH:
+            restored = restore_snapshot(config.settings.TOKEN_SNAPSHOT_PATH, singer.TOKEN_CACHE)
+            logger.info("Token cache restored from snapshot", extra={"tokens": restored})
+            self._tasks.append(asyncio.create_task(self._save_snapshot_forever()))
+        if config.settings.TOKEN_PREWARM:
+            async with async_session() as session:
+                gp_project_ids = await DAL(session).get_gp_project_ids()
+            # tokens restored from snapshot are already in cache and don't go to Registry
+            loaded = await singer.load_api_tokens(
+                gp_project_id for gp_project_id in gp_project_ids if str(gp_project_id) not in singer.TOKEN_CACHE
+            )
+            logger.info("Tokens loaded from Registry", extra={"tokens": loaded})
+            self._tasks.append(asyncio.create_task(self._refresh_forever()))
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if tasks and config.settings.TOKEN_SNAPSHOT_PATH:
+            try:
+                await self.save_snapshot()
+            except OSError:
+                logger.warning("Token cache snapshot is not saved", exc_info=True)
+
+    async def save_snapshot(self) -> None:
+        document = dump_snapshot(singer.TOKEN_CACHE)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, write_snapshot, config.settings.TOKEN_SNAPSHOT_PATH, document)
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(config.settings.TOKEN_REFRESH_INTERVAL)
+            try:
+                await singer.refresh_expiring_api_tokens()
+            except Exception:
+                # keep refreshing, tokens stay in cache until they expire
+                logger.exception("Refresh of Registry tokens failed")
+
+    async def _save_snapshot_forever(self) -> None:
+        while True:
+            await asyncio.sleep(config.settings.TOKEN_SNAPSHOT_INTERVAL)
+            try:
+                await self.save_snapshot()
+            except OSError:
+                logger.warning("Token cache snapshot is not saved", exc_info=True)
+
+
+token_refresher = TokenRefresher()
@@ -0,0 +1,84 @@
+"""
+Snapshot of token cache on disk, so restarted workers come up with known tokens.
+
+Snapshot is a JSON document signed with SECRET_KEY. It is written to a temporary
+file readable only by owner and then renamed, so readers never see half of it.
+On restore the signature, format and expiry of every entry are checked,
+anything that doesn't pass is skipped.
+"""
+import hmac
+import json
+import os
+import tempfile
+import time
+from typing import Dict
+from uuid import UUID
+
+from app.core import config
+from app.utils.cache import TTLCache
+from app.utils.singer import create_sign
+
+SNAPSHOT_VERSION = 1
+
+
+def dump_snapshot(cache: TTLCache) -> str:
+    now = time.time()
+    entries = {
+        key: {"api_token": api_token, "expires_at": now + ttl}
+        for key, api_token, ttl in cache.export()
+    }
+    payload = json.dumps({"version": SNAPSHOT_VERSION, "saved_at": now, "entries": entries}, sort_keys=True)
+    return json.dumps({"payload": payload, "signature": create_sign(config.settings.SECRET_KEY, payload)})
+
+
+def write_snapshot(path: str, document: str) -> None:
+    # temporary file of its own for every writer, workers may save snapshot at the same time
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(document)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_snapshot(path: str) -> Dict[str, Dict]:
+    """
+    Return entries of snapshot or empty dict if snapshot is missing, damaged or signed with other key
+    """
+    try:
+        with open(path) as file:
+            document = json.load(file)
+        payload = document["payload"]
+        if not hmac.compare_digest(document["signature"], create_sign(config.settings.SECRET_KEY, payload)):
+            return {}
+        snapshot = json.loads(payload)
+    except (OSError, ValueError, TypeError, KeyError):
+        return {}
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return {}
+    entries = snapshot.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def restore_snapshot(path: str, cache: TTLCache) -> int:
+    """
+    Put tokens from snapshot into cache, return number of restored tokens
+    """
+    now = time.time()
+    restored = 0
+    for key, entry in read_snapshot(path).items():
+        try:
+            UUID(key)
+            api_token = entry["api_token"]
+            expires_at = float(entry["expires_at"])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            continue
+        if not api_token or not isinstance(api_token, str) or expires_at + cache.stale_ttl <= now:
+            continue
+        cache.set(key, api_token, ttl=min(expires_at - now, cache.ttl))
+        restored += 1
+    return restored
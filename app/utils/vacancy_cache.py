@@ -0,0 +1,33 @@
+"""
+Serialized vacancies and vacancy responses read by id, and pages of vacancy lists.
+
+Entries are keyed by (id, version): `updated_on` of vacancy, `created_on` of response as
+responses are never edited. Reader looks the version up first, so an edited or deleted
+record is never served, whichever process changed it. Writers of this process also drop
+the old entry at once instead of leaving it to the LRU.
+
+Pages are scoped by `gp_project_id` (None for pages of all projects) and keyed by their
+filters. Every write of a vacancy bumps generation of its project and of all projects in the
+same transaction, so pages which may include the vacancy are not read again by any process.
+Generations are kept in DB (`VacancyPageGeneration`), reader takes the current one per request.
+"""
+from uuid import UUID
+
+from app.core import config
+from app.utils.cache import GenerationCache, TTLCache
+
+VACANCY_CACHE = TTLCache(
+    max_size=config.settings.VACANCY_CACHE_SIZE,
+    ttl=config.settings.VACANCY_CACHE_TTL,
+)
+RESPONSE_CACHE = TTLCache(
+    max_size=config.settings.VACANCY_RESPONSE_CACHE_SIZE,
+    ttl=config.settings.VACANCY_CACHE_TTL,
+)
+PAGE_CACHE = GenerationCache(
+    max_size=config.settings.VACANCY_PAGE_CACHE_SIZE,
+    ttl=config.settings.VACANCY_CACHE_TTL,
+)
+
+# row of VacancyPageGeneration for pages of all projects
+ALL_PROJECTS = UUID(int=0)